@@ -0,0 +1,48 @@
+from logging.config import fileConfig
+from alembic import context
+from app import models  # noqa: F401 (registers the tables on Base.metadata)
+from app.database import Base, engine
+from app.services.search import FTS_TABLE
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # The FTS5 table and its shadow tables are created by migrations in raw SQL,
+    # outside the metadata; keep autogenerate from dropping them.
+    return not (type_ == "table" and name.startswith(FTS_TABLE))
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most things; batch mode recreates the table instead
+        render_as_batch=engine.dialect.name == "sqlite",
+        **kwargs,
+    )
+
+def run_migrations_offline():
+    _configure(url=engine.url.render_as_string(hide_password=False), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    # A caller (manage.py, tests) may pass its own connection.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,209 @@
+"""Baseline: the schema create_all produced before migrations
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Databases created by the app before migrations already have all of this;
+`python manage.py migrate` stamps them at this revision instead of running it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        sku, name, category, content='products', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, sku, name, category) VALUES (new.id, new.sku, new.name, new.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, sku, name, category) VALUES ('delete', old.id, old.sku, old.name, old.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF sku, name, category ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, sku, name, category) VALUES ('delete', old.id, old.sku, old.name, old.category);
+        INSERT INTO products_fts(rowid, sku, name, category) VALUES (new.id, new.sku, new.name, new.category);
+    END""",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String()),
+        sa.Column("role", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "suppliers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("contact_person", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("phone", sa.String()),
+        sa.Column("address", sa.Text()),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_suppliers_id", "suppliers", ["id"])
+    op.create_index("ix_suppliers_name", "suppliers", ["name"])
+
+    op.create_table(
+        "customers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String()),
+        sa.Column("phone", sa.String()),
+        sa.Column("address", sa.Text()),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_customers_id", "customers", ["id"])
+    op.create_index("ix_customers_name", "customers", ["name"])
+
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sku", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("category", sa.String()),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("stock_quantity", sa.Integer()),
+        sa.Column("min_stock_threshold", sa.Integer()),
+        sa.Column("supplier_id", sa.Integer()),
+        sa.ForeignKeyConstraint(["supplier_id"], ["suppliers.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+    op.create_index("ix_products_sku", "products", ["sku"], unique=True)
+    op.create_index("ix_products_name", "products", ["name"])
+    op.create_index("ix_products_category", "products", ["category"])
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("customer_id", sa.Integer()),
+        sa.Column("user_id", sa.Integer()),
+        sa.Column("total_amount", sa.Float()),
+        sa.Column("status", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["customer_id"], ["customers.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_orders_id", "orders", ["id"])
+
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer()),
+        sa.Column("product_id", sa.Integer()),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("price_at_time", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["order_id"], ["orders.id"]),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_order_items_id", "order_items", ["id"])
+
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer()),
+        sa.Column("change_type", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("notes", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_movements_id", "stock_movements", ["id"])
+
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("as_of", sa.DateTime(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("as_of", "product_id"),
+    )
+
+    op.create_table(
+        "sales_rollups",
+        sa.Column("grain", sa.String(8), nullable=False),
+        sa.Column("dimension", sa.String(16), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("grain", "dimension", "key", "bucket"),
+    )
+    op.create_index("ix_sales_rollups_grain_dimension_bucket", "sales_rollups", ["grain", "dimension", "bucket"])
+
+    op.create_table(
+        "resource_versions",
+        sa.Column("resource", sa.String(32), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("resource"),
+    )
+
+    stats = op.create_table(
+        "inventory_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("total_products", sa.Integer(), nullable=False),
+        sa.Column("total_stock_value", sa.Float(), nullable=False),
+        sa.Column("low_stock_items", sa.Integer(), nullable=False),
+        sa.Column("total_orders", sa.Integer(), nullable=False),
+        sa.Column("pending_orders", sa.Integer(), nullable=False),
+        sa.Column("total_revenue", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # The single dashboard row, starting from an empty database
+    op.bulk_insert(stats, [{
+        "id": 1, "total_products": 0, "total_stock_value": 0.0, "low_stock_items": 0,
+        "total_orders": 0, "pending_orders": 0, "total_revenue": 0.0,
+    }])
+
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(255), nullable=False),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("response_body", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "key"),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("products_fts_ai", "products_fts_ad", "products_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+    for table in (
+        "idempotency_keys", "inventory_stats", "resource_versions", "sales_rollups", "stock_snapshots",
+        "stock_movements", "order_items", "orders", "products", "customers", "suppliers", "users",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,42 @@
+"""Indexes for the hot queries: movement history and feed, order pages, item and supplier lookups
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 00:00:01
+
+if_not_exists: databases created by the app after these indexes were added
+to the models already have them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_hot_query_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_stock_movements_product_id_created_at", "stock_movements", ["product_id", "created_at"]),
+    ("ix_stock_movements_created_at", "stock_movements", ["created_at", "change_type", "product_id", "quantity"]),
+    ("ix_orders_created_at", "orders", ["created_at"]),
+    ("ix_orders_status_created_at", "orders", ["status", "created_at"]),
+    ("ix_orders_customer_id", "orders", ["customer_id"]),
+    ("ix_order_items_order_id", "order_items", ["order_id", "product_id", "quantity", "price_at_time"]),
+    ("ix_order_items_product_id", "order_items", ["product_id"]),
+    ("ix_products_supplier_id", "products", ["supplier_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    if op.get_bind().dialect.name == "sqlite":
+        # Fresh statistics, so the planner knows how selective the new indexes are
+        op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
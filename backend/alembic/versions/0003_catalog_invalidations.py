@@ -0,0 +1,33 @@
+"""Catalog invalidations: the channel between the workers' product caches
+
+Revision ID: 0003_catalog_invalidations
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-18 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_catalog_invalidations"
+down_revision: Union[str, None] = "0002_hot_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_invalidations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_catalog_invalidations_created_at", "catalog_invalidations", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_catalog_invalidations_created_at", table_name="catalog_invalidations")
+    op.drop_table("catalog_invalidations")
@@ -9,6 +9,67 @@ class Settings(BaseSettings):
 
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./inventory.db"
 
+    # In-process cache of decoded tokens and authenticated users
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # How long a response recorded under an Idempotency-Key can be replayed
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24
+
+    # Serve the product and order lists from column-projected rows encoded with
+    # orjson instead of ORM objects validated by the response models (app/services/listings.py)
+    FAST_LIST_RESPONSES: bool = True
+
+    # How long a process trusts its cached resource versions (the ETags of the
+    # catalog endpoints) before reading them again; bounds how long a change made
+    # by another worker process can go unnoticed.
+    ETAG_VERSION_TTL_SECONDS: float = 1.0
+
+    # In-process product catalog cache (app/services/catalog.py): product records by
+    # id and product id lists by category, bounded in entries and by the TTL. Other
+    # processes' changes arrive through the catalog_invalidations table, read at most
+    # every CATALOG_CACHE_POLL_SECONDS.
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_MAX_PRODUCTS: int = 50000
+    CATALOG_CACHE_MAX_LISTINGS: int = 256
+    CATALOG_CACHE_TTL_SECONDS: float = 300.0
+    CATALOG_CACHE_POLL_SECONDS: float = 0.5
+
+    # Request instrumentation (app/core/metrics.py): Prometheus metrics at /metrics,
+    # and requests slower than SLOW_REQUEST_MS logged with their SQL statements
+    METRICS_ENABLED: bool = True
+    SLOW_REQUEST_MS: float = 500.0
+    SLOW_REQUEST_MAX_STATEMENTS: int = 50
+
+    # Development check (app/core/query_plans.py): explain every statement and log
+    # those that scan one of the large tables end to end without an index
+    QUERY_PLAN_ADVISOR: bool = False
+    QUERY_PLAN_LARGE_TABLES: str = "products,orders,order_items,stock_movements,sales_rollups,stock_snapshots"
+
+    # Group commit: order and stock adjustment writes from concurrent requests are
+    # batched by one writer into a single transaction (see app/services/group_commit.py)
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_MAX_BATCH: int = 256
+    GROUP_COMMIT_WINDOW_MS: float = 2.0
+
+    # SQLite storage profile. "default" leaves SQLite as it is; "production" turns on
+    # WAL, applies the pragmas below on connect and splits the engines into a
+    # read-only pool for GET routes and a single BEGIN IMMEDIATE writer.
+    SQLITE_PROFILE: str = "default"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KIB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_READ_POOL_SIZE: int = 8
+
+    # Reorder suggestions (app/services/reorder.py): demand is measured over the
+    # lookback window; stock should cover lead time plus the review period, with
+    # safety stock for SERVICE_LEVEL_Z standard deviations of lead-time demand.
+    REORDER_LOOKBACK_DAYS: int = 90
+    REORDER_LEAD_TIME_DAYS: int = 7
+    REORDER_REVIEW_DAYS: int = 14
+    REORDER_SERVICE_LEVEL_Z: float = 1.65
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,219 @@
+"""Per-request database instrumentation and Prometheus metrics.
+
+MetricsMiddleware gives every HTTP request a RequestStats in a context
+variable. Engine events, registered once for every engine, add each SQL
+statement run on the request's behalf (directly, through `run_db` on the
+threadpool or through `AsyncSession.run_sync`) to it: query count, database
+time, rows returned or changed, and the statements themselves. When the
+request ends the numbers go into the histograms served at /metrics, and a
+request slower than SLOW_REQUEST_MS is logged with its statements.
+
+Writes applied by the group-commit writer thread run outside any request
+and are not attributed.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.cursor import CursorFetchStrategy
+from app.core.config import settings
+
+logger = logging.getLogger("app.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "rows", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.statements: List[Tuple[str, float]] = []
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+class _CountingFetch(CursorFetchStrategy):
+    # The default fetch strategy, counting the rows handed out for a request.
+    __slots__ = ("stats",)
+
+    def __init__(self, stats: RequestStats):
+        self.stats = stats
+
+    def fetchone(self, result, dbapi_cursor, hard_close=False):
+        row = super().fetchone(result, dbapi_cursor, hard_close)
+        if row is not None:
+            self.stats.rows += 1
+        return row
+
+    def fetchmany(self, result, dbapi_cursor, size=None):
+        rows = super().fetchmany(result, dbapi_cursor, size)
+        self.stats.rows += len(rows)
+        return rows
+
+    def fetchall(self, result, dbapi_cursor):
+        rows = super().fetchall(result, dbapi_cursor)
+        self.stats.rows += len(rows)
+        return rows
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    if len(stats.statements) < settings.SLOW_REQUEST_MAX_STATEMENTS:
+        stats.statements.append((statement, elapsed))
+    if context is not None and cursor.description is None:
+        # Writes: rows changed, where the driver reports it
+        stats.rows += max(cursor.rowcount, 0)
+    elif context is not None and type(context.cursor_fetch_strategy) is CursorFetchStrategy:
+        context.cursor_fetch_strategy = _CountingFetch(stats)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+class Registry:
+    """Per-process request metrics by (method, route)."""
+
+    HISTOGRAMS = (
+        ("http_request_duration_seconds", "Wall time of HTTP requests", LATENCY_BUCKETS),
+        ("http_request_db_duration_seconds", "Time spent in SQL per HTTP request", LATENCY_BUCKETS),
+        ("http_request_db_queries", "SQL statements per HTTP request", QUERY_BUCKETS),
+        ("http_request_db_rows", "Rows returned or changed by SQL per HTTP request", ROW_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.histograms: Dict[Tuple[str, str], List[Histogram]] = {}
+        # Set once the worker's startup hooks have run
+        self.startup_seconds: Optional[float] = None
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histograms = self.histograms.get((method, route))
+            if histograms is None:
+                histograms = self.histograms[(method, route)] = [
+                    Histogram(buckets) for _, _, buckets in self.HISTOGRAMS
+                ]
+            for histogram, value in zip(histograms, (seconds, stats.db_seconds, stats.queries, stats.rows)):
+                histogram.observe(value)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = [
+            "# HELP http_requests_total HTTP requests by route and status",
+            "# TYPE http_requests_total counter",
+        ]
+        with self._lock:
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            for index, (name, help_text, buckets) in enumerate(self.HISTOGRAMS):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, route), histograms in sorted(self.histograms.items()):
+                    histogram = histograms[index]
+                    labels = f'method="{method}",route="{route}"'
+                    cumulative = 0
+                    for bound, count in zip(buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    cumulative += histogram.counts[-1]
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+                    lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        if self.startup_seconds is not None:
+            lines += [
+                "# HELP app_startup_seconds Time from importing the app to the end of its startup hooks",
+                "# TYPE app_startup_seconds gauge",
+                f"app_startup_seconds {self.startup_seconds}",
+            ]
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+class MetricsMiddleware:
+    """ASGI middleware recording every HTTP request into `registry`."""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[object, str] = {}
+
+    def _route(self, scope) -> str:
+        # The router leaves the matched endpoint in the scope; report its path
+        # template, so /products/1 and /products/2 are one series.
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._routes:
+            app = scope.get("app")
+            for route in getattr(app, "routes", ()):
+                if getattr(route, "endpoint", None) is endpoint:
+                    self._routes[endpoint] = route.path
+                    break
+            else:
+                self._routes[endpoint] = getattr(endpoint, "__name__", "unknown")
+        return self._routes[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started
+            _current.reset(token)
+            route = self._route(scope)
+            registry.observe(scope["method"], route, status, seconds, stats)
+            if seconds * 1000 >= settings.SLOW_REQUEST_MS:
+                _log_slow(scope["method"], route, status, seconds, stats)
+
+def _log_slow(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    lines = [
+        f"Slow request {method} {route} -> {status}: {seconds * 1000:.1f} ms, "
+        f"{stats.queries} queries, {stats.db_seconds * 1000:.1f} ms in SQL, {stats.rows} rows"
+    ]
+    lines += [f"  {elapsed * 1000:8.2f} ms  {statement}" for statement, elapsed in stats.statements]
+    if stats.queries > len(stats.statements):
+        lines.append(f"  ... {stats.queries - len(stats.statements)} more statements")
+    logger.warning("\n".join(lines))
@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import String, and_, or_, type_coerce
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def paginate(
+    query: Query,
+    id_column,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    time_column=None,
+) -> Tuple[list, Optional[str]]:
+    """Keyset pagination: `id` ascending for catalogs, `(time_column, id)` descending for feeds.
+
+    Returns the page and an opaque cursor for the next one (None on the last page).
+    `skip` keeps working for callers that don't send a cursor.
+    """
+    if time_column is None:
+        query = query.order_by(id_column)
+        if cursor:
+            (last_id,) = decode_cursor(cursor, 1)
+            query = query.filter(id_column > last_id)
+        if skip and not cursor:
+            query = query.offset(skip)
+        items = query.limit(limit + 1).all()
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        return items, encode_cursor([items[-1].id])
+
+    # Timestamps are compared and encoded as the text the database stores.
+    # SQLite keeps DATETIME as text, and rows from server_default ("2024-01-01 10:00:00")
+    # and from Python ("2024-01-01 10:00:00.123456") only order consistently as text.
+    stored_time = type_coerce(time_column, String)
+    # Entity queries page their objects; column queries page their rows.
+    entity_query = len(query.column_descriptions) == 1
+    query = query.add_columns(stored_time).order_by(time_column.desc(), id_column.desc())
+    if cursor:
+        last_time, last_id = decode_cursor(cursor, 2)
+        query = query.filter(or_(
+            stored_time < last_time,
+            and_(stored_time == last_time, id_column < last_id),
+        ))
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    items = [row[0] if entity_query else row for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+    last_item, last_time = items[-1], rows[limit - 1][-1]
+    if isinstance(last_time, datetime):
+        # Drivers with a native timestamp type hand back datetimes even through type_coerce.
+        last_time = last_time.isoformat()
+    return items, encode_cursor([last_time, last_item.id])
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
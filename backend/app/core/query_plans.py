@@ -0,0 +1,86 @@
+"""Development check for full table scans (SQLite).
+
+With QUERY_PLAN_ADVISOR on, every SELECT, UPDATE and DELETE run on any
+engine is first explained with EXPLAIN QUERY PLAN on the same connection and
+parameters. Full scans of QUERY_PLAN_LARGE_TABLES that an index could avoid
+are logged (logger "app.query_plans") once per distinct statement and kept in
+`findings`, which the test suite asserts is empty for the endpoints it covers.
+
+A scan counts when the statement filters (WHERE), or when the whole table is
+sorted for one LIMIT page. Reading a table end to end on purpose (exports,
+rebuilds, aggregates over everything) does neither and is left alone.
+"""
+import logging
+import re
+import threading
+from typing import Dict, List, Set
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger("app.query_plans")
+
+_EXPLAINED = ("SELECT", "UPDATE", "DELETE", "WITH")
+# "FROM products AS products_1", "JOIN orders": plan steps name the alias
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+AS\s+(\w+))?", re.IGNORECASE)
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+_WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+_lock = threading.Lock()
+_seen: Set[str] = set()
+# statement -> the large tables it scans
+findings: Dict[str, List[str]] = {}
+
+def _large_tables() -> Set[str]:
+    return {name.strip() for name in settings.QUERY_PLAN_LARGE_TABLES.split(",") if name.strip()}
+
+def full_scans(statement: str, plan_details: List[str]) -> List[str]:
+    """Large tables scanned without need, from the detail column of EXPLAIN QUERY PLAN."""
+    sorts_everything = _LIMIT.search(statement) and any(
+        detail.startswith("USE TEMP B-TREE FOR ORDER BY") for detail in plan_details
+    )
+    if not (_WHERE.search(statement) or sorts_everything):
+        return []
+    aliases = {}
+    for table, alias in _TABLE_REFERENCE.findall(statement):
+        aliases[alias or table] = table
+    large = _large_tables()
+    scanned = []
+    for detail in plan_details:
+        match = _FULL_SCAN.match(detail)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            if table in large and table not in scanned:
+                scanned.append(table)
+    return scanned
+
+def reset():
+    with _lock:
+        _seen.clear()
+        findings.clear()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _explain(conn, cursor, statement, parameters, context, executemany):
+    if not settings.QUERY_PLAN_ADVISOR or executemany or conn.dialect.name != "sqlite":
+        return
+    if not statement.lstrip().upper().startswith(_EXPLAINED):
+        return
+    with _lock:
+        if statement in _seen:
+            return
+        _seen.add(statement)
+    # A cursor of its own, so the statement's cursor and SQLAlchemy's events are untouched
+    explain = conn.connection.dbapi_connection.cursor()
+    try:
+        explain.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        details = [row[3] for row in explain.fetchall()]
+    finally:
+        explain.close()
+    scanned = full_scans(statement, details)
+    if scanned:
+        with _lock:
+            findings[statement] = scanned
+        logger.warning(
+            "Full scan of %s:\n%s\nPlan:\n%s", ", ".join(scanned), statement, "\n".join(f"  {step}" for step in details)
+        )
@@ -0,0 +1,20 @@
+from typing import Any
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-encoded response for content already shaped like the response schema.
+
+    Returning it skips FastAPI's response_model validation and serialization, so
+    only hand it plain dicts and lists built to match the schema. UTC datetimes
+    are written with a "Z" suffix, as Pydantic does.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+def fast_json(content: Any, response: Response) -> FastJSONResponse:
+    """FastJSONResponse carrying the headers already set on the route's `response` (cursor, ETag)."""
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return FastJSONResponse(content, headers=headers)
@@ -0,0 +1,63 @@
+"""Schema versions, managed by the Alembic migrations in backend/alembic.
+
+`python manage.py migrate` runs `upgrade()` once per deploy, before the
+workers start. Workers only call `check()`: one read of alembic_version,
+no DDL, and no import of alembic itself, so they boot fast and can start
+side by side.
+"""
+import os
+from typing import Optional, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The schema create_all built before migrations existed
+BASELINE = "0001_baseline"
+# The newest revision in alembic/versions; bump it with every new migration
+# (tests/test_migrations.py checks that it matches).
+HEAD = "0003_catalog_invalidations"
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def head_revision() -> str:
+    """The head according to the migration scripts themselves."""
+    from alembic.script import ScriptDirectory
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(connection) -> Optional[str]:
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+def upgrade(bind: Engine) -> Tuple[Optional[str], str]:
+    """Migrate the database to head; returns the (before, after) revisions."""
+    from alembic import command
+    with bind.begin() as connection:
+        before = current_revision(connection)
+        config = alembic_config(connection)
+        if before is None and inspect(connection).has_table("products"):
+            # Created by create_all before migrations: it already has the baseline
+            command.stamp(config, BASELINE)
+        command.upgrade(config, "head")
+        return before, current_revision(connection)
+
+def check(bind: Engine) -> str:
+    """Raise SchemaOutOfDate unless the database is at the head revision."""
+    with bind.connect() as connection:
+        current = current_revision(connection)
+    if current != HEAD:
+        raise SchemaOutOfDate(
+            f"Database schema is at {current or 'no revision'} but this code needs {HEAD}; "
+            "run `python manage.py migrate` before starting the workers."
+        )
+    return current
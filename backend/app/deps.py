@@ -1,20 +1,62 @@
+import time
+from dataclasses import dataclass
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import DbSession, get_db, get_read_session, get_session, run_db
 from app.models import User, UserRole
 from app.schemas import TokenData
 from app.core.config import settings
 from app.core import security
+from app.core.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+@dataclass(frozen=True)
+class CurrentUser:
+    # Detached snapshot of the authenticated user, safe to share between requests.
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+
+# token -> user id, and user id -> CurrentUser. Invalidation below is per process:
+# with several workers, a change made through one worker reaches the others when
+# their entry expires, so AUTH_CACHE_TTL_SECONDS bounds how long a deactivated
+# user or old role can still be served elsewhere.
+token_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # Role changes and deactivation must take effect on the very next request.
+    invalidate_user(target.id)
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_user_write(orm_execute_state):
+    # Bulk UPDATE/DELETE statements skip the per-object events above and don't
+    # say which users they touched, so drop every cached user.
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if getattr(table, "name", None) == User.__tablename__:
+            user_cache.clear()
+
+def auth_cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+def _decode_token(token: str) -> int:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -25,21 +67,44 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    # Never keep a token around past its own expiry.
+    ttl = payload["exp"] - time.time() if "exp" in payload else None
+    token_cache.set(token, token_data.sub, ttl=ttl)
+    return token_data.sub
+
+def _load_user(db: Session, user_id) -> Optional[User]:
+    return db.query(User).filter(User.id == user_id).first()
+
+async def get_current_user(
+    db: DbSession = Depends(get_read_session), token: str = Depends(oauth2_scheme)
+) -> CurrentUser:
+    user_id = _decode_token(token)
+    current_user = user_cache.get(user_id)
+    if current_user is not None:
+        return current_user
+    user = await run_db(db, _load_user, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    current_user = CurrentUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+    )
+    user_cache.set(user_id, current_user)
+    return current_user
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+async def get_current_active_user(
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_active_admin(
-    current_user: User = Depends(get_current_user),
-) -> User:
+async def get_current_active_admin(
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
@@ -1,11 +1,18 @@
+import logging
+import time
+_import_started = time.perf_counter()  # app_startup_seconds counts from here
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from app.core import metrics, query_plans, schema  # noqa: F401 (registers the query plan advisor)
 from app.core.config import settings
-from app.database import engine, Base
-from app.routers import auth, products, suppliers, customers, orders, inventory, reports
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.database import async_engine, async_read_engine, read_engine
+from app.services import group_commit
+from app.routers import auth, products, suppliers, customers, orders, inventory, reports, exports
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -25,8 +32,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        # Prometheus scrape target; numbers are per worker process.
+        return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(products.router, prefix=f"{settings.API_V1_STR}/products", tags=["products"])
 app.include_router(suppliers.router, prefix=f"{settings.API_V1_STR}/suppliers", tags=["suppliers"])
@@ -34,6 +50,33 @@ app.include_router(customers.router, prefix=f"{settings.API_V1_STR}/customers",
 app.include_router(orders.router, prefix=f"{settings.API_V1_STR}/orders", tags=["orders"])
 app.include_router(inventory.router, prefix=f"{settings.API_V1_STR}/inventory", tags=["inventory"])
 app.include_router(reports.router, prefix=f"{settings.API_V1_STR}/reports", tags=["reports"])
+app.include_router(exports.router, prefix=f"{settings.API_V1_STR}/exports", tags=["exports"])
+
+@app.on_event("startup")
+def verify_schema():
+    # No DDL here: `python manage.py migrate` brings the schema to head before workers start.
+    revision = schema.check(read_engine)
+    logger.info("Database schema at %s", revision)
+
+@app.on_event("startup")
+def start_group_commit():
+    group_commit.start()
+
+@app.on_event("startup")
+def record_startup_time():
+    # Registered last, so this covers importing the app and the startup hooks above.
+    metrics.registry.startup_seconds = time.perf_counter() - _import_started
+    logger.info("Worker ready in %.0f ms", metrics.registry.startup_seconds * 1000)
+
+@app.on_event("shutdown")
+def stop_group_commit():
+    group_commit.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engines():
+    # Pooled aiosqlite connections each own a non-daemon thread; close them or the process never exits.
+    for pooled in {async_engine, async_read_engine} - {None}:
+        await pooled.dispose()
 
 @app.get("/")
 def root():
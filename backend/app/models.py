@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -51,7 +51,7 @@ class Product(Base):
     price = Column(Float, nullable=False)
     stock_quantity = Column(Integer, default=0)
     min_stock_threshold = Column(Integer, default=10)
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"))
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), index=True)
     
     supplier = relationship("Supplier", back_populates="products")
     stock_movements = relationship("StockMovement", back_populates="product")
@@ -64,23 +64,31 @@ class OrderStatus(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Orders by status and age
+        Index("ix_orders_status_created_at", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
     user_id = Column(Integer, ForeignKey("users.id")) # Who created the order
     total_amount = Column(Float, default=0.0)
     status = Column(String, default=OrderStatus.PENDING)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     customer = relationship("Customer", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        # Covers the item lookups of order pages, which read nothing else
+        Index("ix_order_items_order_id", "order_id", "product_id", "quantity", "price_at_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"))
-    product_id = Column(Integer, ForeignKey("products.id"))
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
     quantity = Column(Integer, nullable=False)
     price_at_time = Column(Float, nullable=False)
     
@@ -94,6 +102,12 @@ class StockMovementType(str, enum.Enum):
 
 class StockMovement(Base):
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        # A product's history and its point-in-time sums
+        Index("ix_stock_movements_product_id_created_at", "product_id", "created_at"),
+        # The feed by time, and covering for the demand window of reorder suggestions
+        Index("ix_stock_movements_created_at", "created_at", "change_type", "product_id", "quantity"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"))
@@ -103,3 +117,74 @@ class StockMovement(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     product = relationship("Product", back_populates="stock_movements")
+
+# Stock level of every product at the start of a day (UTC), taken by
+# `manage.py take-stock-snapshots`; point-in-time queries replay movements from here.
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+
+    as_of = Column(DateTime, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+
+# Sales per hour and per day: for all sales (dimension "total", empty key),
+# per product (key = product id) and per category. Maintained by order creation
+# through app/services/sales.py and read by the sales reports.
+class SalesRollup(Base):
+    __tablename__ = "sales_rollups"
+    __table_args__ = (
+        # Rankings over a range (top products, categories) read all keys of a grain
+        Index("ix_sales_rollups_grain_dimension_bucket", "grain", "dimension", "bucket"),
+    )
+
+    grain = Column(String(8), primary_key=True)  # hour, day
+    dimension = Column(String(16), primary_key=True)  # total, product, category
+    key = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    orders = Column(Integer, nullable=False, default=0)
+
+# Version counter per resource (products, suppliers, customers), incremented by
+# every transaction that changes it; the GET routes build their ETags from it.
+class ResourceVersion(Base):
+    __tablename__ = "resource_versions"
+
+    resource = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# Products changed by each committed transaction (NULL: the whole catalog), read
+# by the other worker processes to drop them from their catalog caches
+# (app/services/catalog.py). Rows older than the cache TTL are pruned.
+class CatalogInvalidation(Base):
+    __tablename__ = "catalog_invalidations"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+# Single-row table of dashboard aggregates, kept up to date by the mutating
+# routes through app/services/stats.py.
+class InventoryStats(Base):
+    __tablename__ = "inventory_stats"
+
+    id = Column(Integer, primary_key=True)
+    total_products = Column(Integer, nullable=False, default=0)
+    total_stock_value = Column(Float, nullable=False, default=0.0)
+    low_stock_items = Column(Integer, nullable=False, default=0)
+    total_orders = Column(Integer, nullable=False, default=0)
+    pending_orders = Column(Integer, nullable=False, default=0)
+    total_revenue = Column(Float, nullable=False, default=0.0)
+
+# Responses of mutating requests sent with an Idempotency-Key, so a retried
+# request is answered from here instead of running again.
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -2,19 +2,27 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app import deps, schemas
 from app.core import security
+from app.database import run_db
 from app.models import User
 
 router = APIRouter()
 
+def _get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
 @router.post("/login", response_model=schemas.Token)
-def login_access_token(
-    db: Session = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    db: deps.DbSession = Depends(deps.get_read_session), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await run_db(db, _get_user_by_email, form_data.username)
+    # bcrypt is deliberately slow; keep it off the event loop.
+    if not user or not await run_in_threadpool(
+        security.verify_password, form_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -29,5 +37,9 @@ def login_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/test-token", response_model=schemas.UserResponse)
-def test_token(current_user: User = Depends(deps.get_current_user)) -> Any:
+async def test_token(current_user: deps.CurrentUser = Depends(deps.get_current_user)) -> Any:
     return current_user
+
+@router.get("/cache-stats")
+async def auth_cache_stats(current_user: deps.CurrentUser = Depends(deps.get_current_active_admin)) -> Any:
+    return deps.auth_cache_stats()
@@ -1,61 +1,104 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app import deps, models, schemas
+from app.core.pagination import paginate, set_next_cursor
+from app.database import run_db
+from app.services import versions
 
 router = APIRouter()
 
+def _get_customer(db: Session, customer_id: int) -> models.Customer:
+    customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
+
+def _read_customers(db: Session, skip, limit, cursor):
+    return paginate(
+        db.query(models.Customer), models.Customer.id, limit, skip=skip, cursor=cursor
+    )
+
 @router.get("/", response_model=List[schemas.CustomerResponse])
-def read_customers(
+async def read_customers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    customers = db.query(models.Customer).offset(skip).limit(limit).all()
+    not_modified = await versions.conditional(request, response, db, versions.CUSTOMERS)
+    if not_modified:
+        return not_modified
+    customers, next_cursor = await run_db(db, _read_customers, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
     return customers
 
-@router.post("/", response_model=schemas.CustomerResponse)
-def create_customer(
-    customer: schemas.CustomerCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+@router.get("/{customer_id}", response_model=schemas.CustomerResponse)
+async def read_customer(
+    customer_id: int,
+    request: Request,
+    response: Response,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
+    not_modified = await versions.conditional(request, response, db, versions.CUSTOMERS)
+    if not_modified:
+        return not_modified
+    return await run_db(db, _get_customer, customer_id)
+
+def _create_customer(db: Session, customer: schemas.CustomerCreate):
     db_customer = models.Customer(**customer.model_dump())
     db.add(db_customer)
+    versions.bump(db, versions.CUSTOMERS)
     db.commit()
     db.refresh(db_customer)
     return db_customer
 
-@router.put("/{customer_id}", response_model=schemas.CustomerResponse)
-def update_customer(
-    customer_id: int,
-    customer_in: schemas.CustomerUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+@router.post("/", response_model=schemas.CustomerResponse)
+async def create_customer(
+    customer: schemas.CustomerCreate,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
-    
+    return await run_db(db, _create_customer, customer)
+
+def _update_customer(db: Session, customer_id: int, customer_in: schemas.CustomerUpdate):
+    customer = _get_customer(db, customer_id)
+
     update_data = customer_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(customer, field, value)
-    
+
     db.add(customer)
+    versions.bump(db, versions.CUSTOMERS)
     db.commit()
     db.refresh(customer)
     return customer
 
-@router.delete("/{customer_id}", response_model=schemas.CustomerResponse)
-def delete_customer(
+@router.put("/{customer_id}", response_model=schemas.CustomerResponse)
+async def update_customer(
     customer_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    customer_in: schemas.CustomerUpdate,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
+    return await run_db(db, _update_customer, customer_id, customer_in)
+
+def _delete_customer(db: Session, customer_id: int):
+    customer = _get_customer(db, customer_id)
+    deleted = schemas.CustomerResponse.model_validate(customer)
     db.delete(customer)
+    versions.bump(db, versions.CUSTOMERS)
     db.commit()
-    return customer
+    return deleted
+
+@router.delete("/{customer_id}", response_model=schemas.CustomerResponse)
+async def delete_customer(
+    customer_id: int,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    return await run_db(db, _delete_customer, customer_id)
@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from app import deps, models, schemas
+from app.database import ReadSessionLocal, read_engine
+from app.services import snapshots
+
+router = APIRouter()
+
+# Exports stream in keyset batches: each batch is its own short query
+# (WHERE id > :last ORDER BY id LIMIT :batch) and is written out before the
+# next one is read, so memory stays flat and no read transaction is held open
+# for the whole download.
+BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    schemas.FileFormat.NDJSON: "application/x-ndjson",
+    schemas.FileFormat.CSV: "text/csv",
+}
+
+PRODUCT_COLUMNS = ["id", "sku", "name", "category", "price", "stock_quantity", "min_stock_threshold", "supplier_id"]
+MOVEMENT_COLUMNS = ["id", "product_id", "sku", "change_type", "quantity", "notes", "created_at"]
+ORDER_COLUMNS = ["id", "customer_id", "user_id", "status", "total_amount", "created_at"]
+ORDER_ITEM_COLUMNS = ["item_id", "product_id", "sku", "quantity", "price_at_time"]
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _batches(stmt, id_column) -> Iterator[list]:
+    # The request's own session is closed before a streamed body is sent, so use a fresh one.
+    db = ReadSessionLocal()
+    try:
+        last_id = None
+        while True:
+            batch_stmt = stmt.order_by(id_column).limit(BATCH_SIZE)
+            if last_id is not None:
+                batch_stmt = batch_stmt.where(id_column > last_id)
+            rows = db.execute(batch_stmt).mappings().all()
+            db.rollback()  # end the read transaction between batches
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+    finally:
+        db.close()
+
+def _encode(batches: Iterator[Sequence[dict]], fmt: schemas.FileFormat, columns: List[str]) -> Iterator[str]:
+    if fmt == schemas.FileFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for rows in batches:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for rows in batches:
+            yield "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in rows)
+
+def _stream(chunks: Iterator[str], fmt: schemas.FileFormat, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow():%Y%m%d%H%M%S}.{fmt.value}"
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+def _time_range(stmt, column, start: Optional[datetime], end: Optional[datetime]):
+    # start <= created_at < end, in UTC, compared the way the timestamps are stored
+    created, bound = snapshots.created_column(read_engine, column)
+    if start:
+        stmt = stmt.where(created >= bound(snapshots.naive_utc(start)))
+    if end:
+        stmt = stmt.where(created < bound(snapshots.naive_utc(end)))
+    return stmt
+
+@router.get("/products")
+def export_products(
+    format: schemas.FileFormat = schemas.FileFormat.NDJSON,
+    category: Optional[str] = None,
+    product_id: Optional[int] = None,
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    Product = models.Product
+    stmt = select(*(getattr(Product, name) for name in PRODUCT_COLUMNS))
+    if category:
+        stmt = stmt.where(Product.category == category)
+    if product_id is not None:
+        stmt = stmt.where(Product.id == product_id)
+    return _stream(_encode(_batches(stmt, Product.id), format, PRODUCT_COLUMNS), format, "products")
+
+@router.get("/stock-movements")
+def export_stock_movements(
+    format: schemas.FileFormat = schemas.FileFormat.NDJSON,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    Movement = models.StockMovement
+    stmt = (
+        select(
+            Movement.id, Movement.product_id, models.Product.sku, Movement.change_type,
+            Movement.quantity, Movement.notes, Movement.created_at,
+        )
+        .outerjoin(models.Product, models.Product.id == Movement.product_id)
+    )
+    stmt = _time_range(stmt, Movement.created_at, start, end)
+    if product_id is not None:
+        stmt = stmt.where(Movement.product_id == product_id)
+    return _stream(_encode(_batches(stmt, Movement.id), format, MOVEMENT_COLUMNS), format, "stock-movements")
+
+def _orders_with_items(stmt) -> Iterator[List[dict]]:
+    Item = models.OrderItem
+    for orders in _batches(stmt, models.Order.id):
+        db = ReadSessionLocal()
+        try:
+            # One IN query per batch of orders for all their items.
+            item_rows = db.execute(
+                select(
+                    Item.order_id, Item.id.label("item_id"), Item.product_id, models.Product.sku,
+                    Item.quantity, Item.price_at_time,
+                )
+                .outerjoin(models.Product, models.Product.id == Item.product_id)
+                .where(Item.order_id.in_([order["id"] for order in orders]))
+                .order_by(Item.id)
+            ).mappings().all()
+        finally:
+            db.close()
+        items = {}
+        for item in item_rows:
+            items.setdefault(item["order_id"], []).append(
+                {name: item[name] for name in ORDER_ITEM_COLUMNS}
+            )
+        yield [dict(order, items=items.get(order["id"], [])) for order in orders]
+
+def _flatten_items(batches: Iterator[List[dict]]) -> Iterator[List[dict]]:
+    # CSV has no nesting: one line per order item, order columns repeated.
+    for orders in batches:
+        yield [
+            dict({name: order[name] for name in ORDER_COLUMNS}, **item)
+            for order in orders
+            for item in order["items"]
+        ]
+
+@router.get("/orders")
+def export_orders(
+    format: schemas.FileFormat = schemas.FileFormat.NDJSON,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    Order = models.Order
+    stmt = select(*(getattr(Order, name) for name in ORDER_COLUMNS))
+    stmt = _time_range(stmt, Order.created_at, start, end)
+    if product_id is not None:
+        stmt = stmt.where(Order.id.in_(
+            select(models.OrderItem.order_id).where(models.OrderItem.product_id == product_id)
+        ))
+    batches = _orders_with_items(stmt)
+    if format == schemas.FileFormat.CSV:
+        return _stream(_encode(_flatten_items(batches), format, ORDER_COLUMNS + ORDER_ITEM_COLUMNS), format, "orders")
+    return _stream(_encode(batches, format, ORDER_COLUMNS), format, "orders")
@@ -1,58 +1,177 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.orm import Session, joinedload
 from app import deps, models, schemas
+from app.core.pagination import paginate, set_next_cursor
+from app.database import run_db
+from app.core.config import settings
+from app.services import catalog, group_commit, reorder, snapshots
+from app.services import stock as stock_service
+from app.services.idempotency import IDEMPOTENCY_HEADER, Idempotency
 
 router = APIRouter()
 
+# Attempts before a batch that keeps racing other writers gives up with 409
+BATCH_RETRIES = 3
+
+def _read_stock_movements(db: Session, skip, limit, cursor):
+    movements, next_cursor = paginate(
+        db.query(models.StockMovement).options(joinedload(models.StockMovement.product)),
+        models.StockMovement.id,
+        limit,
+        skip=skip,
+        cursor=cursor,
+        time_column=models.StockMovement.created_at,
+    )
+    # Schema has product_name field; the product is joined in above.
+    for m in movements:
+        m.product_name = m.product.name if m.product else "Unknown"
+    return movements, next_cursor
+
 @router.get("/movements", response_model=List[schemas.StockMovementResponse])
-def read_stock_movements(
+async def read_stock_movements(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    movements = db.query(models.StockMovement).order_by(models.StockMovement.created_at.desc()).offset(skip).limit(limit).all()
-    # Populate product name manually if needed or rely on ORM lazy load in schema response if configured?
-    # Schema has product_name field, let's make sure we can fill it.
-    for m in movements:
-        m.product_name = m.product.name if m.product else "Unknown"
+    movements, next_cursor = await run_db(db, _read_stock_movements, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
     return movements
 
-@router.post("/adjust", response_model=schemas.StockMovementResponse)
-def create_stock_movement(
-    movement: schemas.StockMovementCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+def _read_stock_at(db: Session, at: datetime, product_id, sku, skip, limit, cursor):
+    query = db.query(models.Product)
+    if product_id is not None:
+        query = query.filter(models.Product.id == product_id)
+    if sku is not None:
+        query = query.filter(models.Product.sku == sku)
+    products, next_cursor = paginate(query, models.Product.id, limit, skip=skip, cursor=cursor)
+    if not products and (product_id is not None or sku is not None):
+        raise HTTPException(status_code=404, detail="Product not found")
+    return snapshots.stock_at_rows(db, products, at), next_cursor
+
+@router.get("/stock-at", response_model=List[schemas.StockAtResponse])
+async def read_stock_at(
+    response: Response,
+    date: Optional[date] = Query(None, description="Closing stock of this day (UTC)"),
+    at: Optional[datetime] = Query(None, description="Stock at this instant"),
+    product_id: Optional[int] = None,
+    sku: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    product = db.query(models.Product).filter(models.Product.id == movement.product_id).first()
+    if (date is None) == (at is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of date or at")
+    if date is not None:
+        at = snapshots.midnight(date + timedelta(days=1))
+    else:
+        at = snapshots.naive_utc(at)
+    rows, next_cursor = await run_db(db, _read_stock_at, at, product_id, sku, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return rows
+
+@router.get("/reorder-suggestions", response_model=List[schemas.ReorderSuggestion])
+async def read_reorder_suggestions(
+    supplier_id: Optional[int] = None,
+    lookback_days: int = Query(settings.REORDER_LOOKBACK_DAYS, ge=1, le=3650),
+    lead_time_days: int = Query(settings.REORDER_LEAD_TIME_DAYS, ge=0),
+    review_days: int = Query(settings.REORDER_REVIEW_DAYS, ge=0),
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    # Computed over the whole catalog on every call; see app/services/reorder.py
+    return await run_db(
+        db, reorder.compute, lookback_days, lead_time_days, review_days,
+        settings.REORDER_SERVICE_LEVEL_Z, supplier_id,
+    )
+
+def _create_stock_movement(db: Session, movement: schemas.StockMovementCreate):
+    # Committed or rolled back by group_commit.execute, like orders._create_order
+    if catalog.enabled():
+        product = catalog.get(db, movement.product_id)
+    else:
+        product = db.query(models.Product).filter(models.Product.id == movement.product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    product_name = product.name
 
-    # Update product stock
-    if movement.change_type == models.StockMovementType.IN:
-        product.stock_quantity += movement.quantity
-    elif movement.change_type == models.StockMovementType.OUT:
-        if product.stock_quantity < movement.quantity:
-             raise HTTPException(status_code=400, detail="Insufficient stock")
-        product.stock_quantity -= movement.quantity
-    elif movement.change_type == models.StockMovementType.ADJUSTMENT:
-        # Adjustment could be setting to absolute value or relative.
-        # Let's assume adjustment is relative addition (negative for subtraction).
-        # Actually usually adjustment sets the stock to a new value or adds/subtracts.
-        # Interpretation: "adjustment" here acts like a generic add/sub but we recorded it as 'adjustment'.
-        # Let's assume the user sends the 'quantity' to ADD (negative to subtract).
-        # OR simple interpretation: same as IN/OUT but just different label?
-        # Let's treat it as: quantity is the DELTA.
-        new_qty = product.stock_quantity + movement.quantity
-        if new_qty < 0:
-             raise HTTPException(status_code=400, detail="Resulting stock cannot be negative")
-        product.stock_quantity = new_qty
+    # Update product stock. For ADJUSTMENT, quantity is the signed DELTA (negative to subtract).
+    # The check and the write are one conditional UPDATE, so concurrent adjustments can't oversell.
+    delta = stock_service.movement_delta(movement.change_type, movement.quantity)
+    if stock_service.apply_delta(db, product.id, delta) is None:
+        raise HTTPException(status_code=400, detail=stock_service.movement_error(movement.change_type))
 
     db_movement = models.StockMovement(**movement.model_dump())
     db.add(db_movement)
-    db.add(product)
-    db.commit()
+    db.flush()
     db.refresh(db_movement)
-    db_movement.product_name = product.name
-    return db_movement
+    db_movement.product_name = product_name
+    return schemas.StockMovementResponse.model_validate(db_movement)
+
+@router.post("/adjust", response_model=schemas.StockMovementResponse)
+async def create_stock_movement(
+    movement: schemas.StockMovementCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    idempotent = Idempotency(current_user.id, idempotency_key, "POST /inventory/adjust", movement)
+    return await group_commit.execute(db, idempotent, _create_stock_movement, movement)
+
+def _create_stock_movements_batch(db: Session, batch: schemas.StockMovementBatch, idempotent: Idempotency):
+    replayed = idempotent.replay(db)
+    if replayed:
+        return replayed
+
+    # Entries are checked in order with the same rules as /adjust, against stock
+    # loaded in one query, then written with one UPDATE per product (guarded by the
+    # stock level that was read), one bulk INSERT of movements and one commit.
+    for attempt in range(BATCH_RETRIES):
+        products = stock_service.fetch_products(db, (item.product_id for item in batch.items))
+        errors, levels = stock_service.plan_batch(batch.items, products)
+        failed = sum(1 for error in errors if error)
+        if failed and batch.mode == schemas.BatchMode.ATOMIC:
+            raise HTTPException(status_code=400, detail=[
+                {"index": index, "product_id": item.product_id, "error": error}
+                for index, (item, error) in enumerate(zip(batch.items, errors)) if error
+            ])
+        to_apply = [item for item, error in zip(batch.items, errors) if error is None]
+        try:
+            movement_ids = stock_service.write_batch(db, to_apply, products, levels)
+        except stock_service.StockChanged:
+            # Someone else changed one of these products in between: start over from fresh stock.
+            db.rollback()
+            continue
+        break
+    else:
+        raise HTTPException(status_code=409, detail="Stock changed while applying the batch, please retry")
+
+    new_ids = iter(movement_ids)
+    results = [
+        schemas.StockMovementBatchItemResult(
+            index=index,
+            product_id=item.product_id,
+            applied=error is None,
+            movement_id=next(new_ids) if error is None else None,
+            error=error,
+        )
+        for index, (item, error) in enumerate(zip(batch.items, errors))
+    ]
+    response = schemas.StockMovementBatchResult(applied=len(to_apply), failed=failed, results=results)
+    return idempotent.commit(db, response) or response
+
+@router.post("/adjust/batch", response_model=schemas.StockMovementBatchResult)
+async def create_stock_movements_batch(
+    batch: schemas.StockMovementBatch,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    idempotent = Idempotency(current_user.id, idempotency_key, "POST /inventory/adjust/batch", batch)
+    return await run_db(db, _create_stock_movements_batch, batch, idempotent)
@@ -1,51 +1,118 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app import deps, models, schemas
+from app.core.config import settings
+from app.core.pagination import paginate, set_next_cursor
+from app.core.responses import fast_json
+from app.database import run_db
+from app.services import catalog, group_commit, listings
+from app.services import sales as sales_service
+from app.services import stats as stats_service
+from app.services.idempotency import IDEMPOTENCY_HEADER, Idempotency
+from app.services import stock as stock_service
 
 router = APIRouter()
 
+# Loader options covering the whole OrderResponse graph. The page of orders is
+# fetched with its customer joined in, then items, products (de-duplicated by
+# primary key) and their suppliers are loaded with one SELECT ... IN per level,
+# so serializing a page costs the same number of queries whatever its size.
+ORDER_RESPONSE_OPTIONS = (
+    joinedload(models.Order.customer),
+    selectinload(models.Order.items)
+    .selectinload(models.OrderItem.product)
+    .joinedload(models.Product.supplier),
+)
+
+def get_order_with_details(db: Session, order_id: int):
+    return (
+        db.query(models.Order)
+        .options(*ORDER_RESPONSE_OPTIONS)
+        .filter(models.Order.id == order_id)
+        .first()
+    )
+
+def _read_orders(db: Session, skip, limit, cursor):
+    return paginate(
+        db.query(models.Order).options(*ORDER_RESPONSE_OPTIONS),
+        models.Order.id,
+        limit,
+        skip=skip,
+        cursor=cursor,
+        time_column=models.Order.created_at,
+    )
+
 @router.get("/", response_model=List[schemas.OrderResponse])
-def read_orders(
+async def read_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    orders = db.query(models.Order).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+    if settings.FAST_LIST_RESPONSES:
+        orders, next_cursor = await run_db(db, listings.order_page, skip, limit, cursor)
+        set_next_cursor(response, next_cursor)
+        return fast_json(orders, response)
+    orders, next_cursor = await run_db(db, _read_orders, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
     return orders
 
-@router.post("/", response_model=schemas.OrderResponse)
-def create_order(
-    order_in: schemas.OrderCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+@router.get("/{order_id}", response_model=schemas.OrderResponse)
+async def read_order(
+    order_id: int,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
+    order = await run_db(db, get_order_with_details, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+def _check_items(order_in: schemas.OrderCreate, products) -> dict:
+    """Quantity per product of the order; raises 404 for an unknown product, 400 when short."""
+    quantities = {}
+    for item in order_in.items:
+        product = products.get(item.product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
+        quantities[product.id] = quantities.get(product.id, 0) + item.quantity
+        # Cheap early rejection; the conditional update below is what actually guards the stock.
+        if product.stock_quantity < quantities[product.id]:
+             raise HTTPException(status_code=400, detail=f"Insufficient stock for product: {product.name}")
+    return quantities
+
+def _create_order(db: Session, order_in: schemas.OrderCreate, current_user: deps.CurrentUser):
+    # Runs inside the write transaction opened by group_commit.execute, which commits
+    # it or rolls it back; errors are raised as HTTPException.
+
     # 1. Validate customer
     customer = db.query(models.Customer).filter(models.Customer.id == order_in.customer_id).first()
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    # 2. Check stock and calculate total
-    total_amount = 0.0
-    order_items_data = []
+    # 2. Check every product of the order, from the catalog cache or in one query
+    product_ids = {item.product_id for item in order_in.items}
+    if catalog.enabled():
+        products = catalog.get_many(db, product_ids)
+        try:
+            quantities = _check_items(order_in, products)
+        except HTTPException:
+            # The cached stock may predate a restock by another worker: look again before refusing.
+            products = catalog.refresh(db, product_ids)
+            quantities = _check_items(order_in, products)
+    else:
+        products = stock_service.fetch_products(db, product_ids)
+        quantities = _check_items(order_in, products)
 
-    for item in order_in.items:
-        product = db.query(models.Product).filter(models.Product.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-        
-        if product.stock_quantity < item.quantity:
-             raise HTTPException(status_code=400, detail=f"Insufficient stock for product: {product.name}")
-        
-        total_amount += product.price * item.quantity
-        order_items_data.append({
-            "product": product,
-            "quantity": item.quantity,
-            "price": product.price
-        })
+    # 3. Deduct stock atomically; this is the first write, so the write transaction starts here.
+    # Prices come back from the deducting UPDATEs, never from a possibly stale cache.
+    prices = stock_service.reserve(db, quantities, products)
+    total_amount = sum(prices[item.product_id] * item.quantity for item in order_in.items)
 
-    # 3. Create Order
+    # 4. Create Order
     db_order = models.Order(
         customer_id=order_in.customer_id,
         user_id=current_user.id,
@@ -55,34 +122,34 @@ def create_order(
     db.add(db_order)
     db.flush() # get ID
 
-    # 4. Create Items and Deduct Stock
-    for data in order_items_data:
-        product = data["product"]
-        qty = data["quantity"]
-        price = data["price"]
-
-        # Create Item
-        db_item = models.OrderItem(
+    # 5. Create Items and record movements
+    for item in order_in.items:
+        db.add(models.OrderItem(
             order_id=db_order.id,
-            product_id=product.id,
-            quantity=qty,
-            price_at_time=price
-        )
-        db.add(db_item)
-
-        # Update Stock
-        product.stock_quantity -= qty
-        db.add(product)
-
-        # Record Movement
-        db_movement = models.StockMovement(
-            product_id=product.id,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price_at_time=prices[item.product_id]
+        ))
+        db.add(models.StockMovement(
+            product_id=item.product_id,
             change_type=models.StockMovementType.OUT,
-            quantity=qty,
+            quantity=item.quantity,
             notes=f"Order #{db_order.id}"
-        )
-        db.add(db_movement)
+        ))
+
+    stats_service.apply_order_created(db, db_order.status, total_amount)
+    db.flush()
+    order = get_order_with_details(db, db_order.id)
+    sales_service.apply_order_created(db, order)
+    return schemas.OrderResponse.model_validate(order)
 
-    db.commit()
-    db.refresh(db_order)
-    return db_order
+@router.post("/", response_model=schemas.OrderResponse)
+async def create_order(
+    order_in: schemas.OrderCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    # A retry of an order that already went through gets the original response back
+    idempotent = Idempotency(current_user.id, idempotency_key, "POST /orders", order_in)
+    return await group_commit.execute(db, idempotent, _create_order, order_in, current_user)
@@ -1,71 +1,171 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from sqlalchemy.orm import Session, joinedload
 from app import deps, models, schemas
+from app.core.config import settings
+from app.core.pagination import paginate, set_next_cursor
+from app.core.responses import fast_json
+from app.database import run_db
+from app.services import catalog, listings, product_import
+from app.services import search as search_service
+from app.services import stats as stats_service
+from app.services import versions
 
 router = APIRouter()
 
+def _get_product(db: Session, product_id: int) -> models.Product:
+    product = (
+        db.query(models.Product)
+        .options(joinedload(models.Product.supplier))
+        .filter(models.Product.id == product_id)
+        .first()
+    )
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+def _read_products(db: Session, skip, limit, cursor, search, category):
+    query = db.query(models.Product).options(joinedload(models.Product.supplier))
+    if category:
+        query = query.filter(models.Product.category == category)
+    if search:
+        # Ranked results are paged with skip/limit; cursors follow id order only.
+        return search_service.apply_search(query, search).offset(skip).limit(limit).all(), None
+
+    return paginate(query, models.Product.id, limit, skip=skip, cursor=cursor)
+
 @router.get("/", response_model=List[schemas.ProductResponse])
-def read_products(
+async def read_products(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     category: Optional[str] = None,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    query = db.query(models.Product)
-    if search:
-        query = query.filter(models.Product.name.contains(search))
-    if category:
-        query = query.filter(models.Product.category == category)
-    
-    products = query.offset(skip).limit(limit).all()
+    not_modified = await versions.conditional(request, response, db, versions.PRODUCTS)
+    if not_modified:
+        return not_modified
+    if catalog.enabled() and not search:
+        # Memoized by conditional() above: the version in the ETag, or a newer one
+        version = await versions.current(db, versions.PRODUCTS)
+        products, next_cursor = await run_db(db, catalog.product_page, skip, limit, cursor, category, version)
+        set_next_cursor(response, next_cursor)
+        return fast_json(products, response) if settings.FAST_LIST_RESPONSES else products
+    if settings.FAST_LIST_RESPONSES:
+        products, next_cursor = await run_db(db, listings.product_page, skip, limit, cursor, search, category)
+        set_next_cursor(response, next_cursor)
+        return fast_json(products, response)
+    products, next_cursor = await run_db(db, _read_products, skip, limit, cursor, search, category)
+    set_next_cursor(response, next_cursor)
     return products
 
-@router.post("/", response_model=schemas.ProductResponse)
-def create_product(
-    product: schemas.ProductCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+@router.get("/suggest", response_model=List[schemas.ProductSuggestion])
+async def suggest_products(
+    q: str = Query(..., min_length=1),
+    category: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    # Typeahead for the product pickers: id, sku and name only, straight from the search index.
+    return await run_db(db, search_service.suggest, q, category=category, limit=limit)
+
+@router.get("/cache-stats")
+async def catalog_cache_stats(current_user: deps.CurrentUser = Depends(deps.get_current_active_admin)):
+    return catalog.stats()
+
+@router.get("/{product_id}", response_model=schemas.ProductResponse)
+async def read_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
+    not_modified = await versions.conditional(request, response, db, versions.PRODUCTS)
+    if not_modified:
+        return not_modified
+    if catalog.enabled():
+        version = await versions.current(db, versions.PRODUCTS)
+        product = await run_db(db, catalog.get, product_id, version)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return product.as_dict()
+    return await run_db(db, _get_product, product_id)
+
+def _create_product(db: Session, product: schemas.ProductCreate):
     db_product = models.Product(**product.model_dump())
     db.add(db_product)
+    stats_service.apply_product_change(db, None, stats_service.product_state(db_product))
+    versions.bump(db, versions.PRODUCTS)
     db.commit()
-    db.refresh(db_product)
     # Initial stock movement if quantity > 0 ? Maybe not, just set initial stock.
     # Strictly speaking, we should create a stock movement for initial stock but for simplicity we allow setting it directly.
-    return db_product
+    return _get_product(db, db_product.id)
 
-@router.put("/{product_id}", response_model=schemas.ProductResponse)
-def update_product(
-    product_id: int,
-    product_in: schemas.ProductUpdate,
+@router.post("/", response_model=schemas.ProductResponse)
+async def create_product(
+    product: schemas.ProductCreate,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    return await run_db(db, _create_product, product)
+
+@router.post("/import", response_model=schemas.ProductImportResult)
+def import_products(
+    file: UploadFile = File(...),
+    format: Optional[schemas.FileFormat] = None,
+    record_movements: bool = False,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
+    # Upsert by SKU in chunked transactions; invalid rows are reported, not fatal.
+    # Parsing is CPU-bound, so this route keeps a sync session and the threadpool.
+    if format is None:
+        is_csv = (file.filename or "").lower().endswith(".csv") or file.content_type == "text/csv"
+        format = schemas.FileFormat.CSV if is_csv else schemas.FileFormat.NDJSON
+    return product_import.import_products(db, file.file, format, record_movements=record_movements)
+
+def _update_product(db: Session, product_id: int, product_in: schemas.ProductUpdate):
+    product = _get_product(db, product_id)
+
+    before = stats_service.product_state(product)
     update_data = product_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(product, field, value)
-    
+
     db.add(product)
+    stats_service.apply_product_change(db, before, stats_service.product_state(product))
+    versions.bump(db, versions.PRODUCTS)
     db.commit()
-    db.refresh(product)
-    return product
+    return _get_product(db, product_id)
 
-@router.delete("/{product_id}", response_model=schemas.ProductResponse)
-def delete_product(
+@router.put("/{product_id}", response_model=schemas.ProductResponse)
+async def update_product(
     product_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    product_in: schemas.ProductUpdate,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+    return await run_db(db, _update_product, product_id, product_in)
+
+def _delete_product(db: Session, product_id: int):
+    product = _get_product(db, product_id)
+    deleted = schemas.ProductResponse.model_validate(product)
     db.delete(product)
+    stats_service.apply_product_change(db, stats_service.product_state(product), None)
+    versions.bump(db, versions.PRODUCTS)
     db.commit()
-    return product
+    return deleted
+
+@router.delete("/{product_id}", response_model=schemas.ProductResponse)
+async def delete_product(
+    product_id: int,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    return await run_db(db, _delete_product, product_id)
@@ -1,35 +1,67 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app import deps, models, schemas
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app import deps, schemas
+from app.database import run_db
+from app.services import sales as sales_service
+from app.services import stats as stats_service
 
 router = APIRouter()
 
+# Widest range served at hourly resolution; longer ranges should use day or coarser buckets.
+MAX_HOURLY_DAYS = 93
+
 @router.get("/dashboard", response_model=schemas.DashboardStats)
-def get_dashboard_stats(
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+async def get_dashboard_stats(
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    # Aggregates are maintained incrementally by the mutating routes, so this is a single row read.
+    return await run_db(db, stats_service.get_stats)
+
+def _date_range(start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+    # Both ends are included; the default is the last 30 days.
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return start, end
+
+# The sales reports read the pre-aggregated rows of app/services/sales.py, never orders.
+@router.get("/sales/timeseries", response_model=List[schemas.SalesPoint])
+async def get_sales_timeseries(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: schemas.SalesBucket = schemas.SalesBucket.DAY,
+    product_id: Optional[int] = None,
+    category: Optional[str] = None,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    total_products = db.query(models.Product).count()
-    
-    # Calculate stock value
-    products = db.query(models.Product).all()
-    total_stock_value = sum(p.price * p.stock_quantity for p in products)
-    
-    low_stock_items = db.query(models.Product).filter(models.Product.stock_quantity < models.Product.min_stock_threshold).count()
-    
-    total_orders = db.query(models.Order).count()
-    pending_orders = db.query(models.Order).filter(models.Order.status == models.OrderStatus.PENDING).count()
-    
-    # Revenue (only completed)
-    revenue_query = db.query(func.sum(models.Order.total_amount)).filter(models.Order.status == models.OrderStatus.COMPLETED).scalar()
-    total_revenue = revenue_query if revenue_query else 0.0
+    start, end = _date_range(start, end)
+    if bucket == schemas.SalesBucket.HOUR and (end - start).days >= MAX_HOURLY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Hourly buckets are limited to {MAX_HOURLY_DAYS} days")
+    return await run_db(db, sales_service.timeseries, start, end, bucket.value, product_id, category)
 
-    return {
-        "total_products": total_products,
-        "total_stock_value": total_stock_value,
-        "low_stock_items": low_stock_items,
-        "total_orders": total_orders,
-        "pending_orders": pending_orders,
-        "total_revenue": total_revenue
-    }
+@router.get("/sales/top-products", response_model=List[schemas.ProductSales])
+async def get_top_products(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    by: schemas.SalesRanking = schemas.SalesRanking.REVENUE,
+    limit: int = Query(10, ge=1, le=100),
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    start, end = _date_range(start, end)
+    return await run_db(db, sales_service.top_products, start, end, by.value, limit)
+
+@router.get("/sales/by-category", response_model=List[schemas.CategorySales])
+async def get_sales_by_category(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    by: schemas.SalesRanking = schemas.SalesRanking.REVENUE,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    start, end = _date_range(start, end)
+    return await run_db(db, sales_service.by_category, start, end, by.value)
@@ -1,61 +1,104 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app import deps, models, schemas
+from app.core.pagination import paginate, set_next_cursor
+from app.database import run_db
+from app.services import versions
 
 router = APIRouter()
 
+def _get_supplier(db: Session, supplier_id: int) -> models.Supplier:
+    supplier = db.query(models.Supplier).filter(models.Supplier.id == supplier_id).first()
+    if not supplier:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    return supplier
+
+def _read_suppliers(db: Session, skip, limit, cursor):
+    return paginate(
+        db.query(models.Supplier), models.Supplier.id, limit, skip=skip, cursor=cursor
+    )
+
 @router.get("/", response_model=List[schemas.SupplierResponse])
-def read_suppliers(
+async def read_suppliers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    suppliers = db.query(models.Supplier).offset(skip).limit(limit).all()
+    not_modified = await versions.conditional(request, response, db, versions.SUPPLIERS)
+    if not_modified:
+        return not_modified
+    suppliers, next_cursor = await run_db(db, _read_suppliers, skip, limit, cursor)
+    set_next_cursor(response, next_cursor)
     return suppliers
 
-@router.post("/", response_model=schemas.SupplierResponse)
-def create_supplier(
-    supplier: schemas.SupplierCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+@router.get("/{supplier_id}", response_model=schemas.SupplierResponse)
+async def read_supplier(
+    supplier_id: int,
+    request: Request,
+    response: Response,
+    db: deps.DbSession = Depends(deps.get_read_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
+    not_modified = await versions.conditional(request, response, db, versions.SUPPLIERS)
+    if not_modified:
+        return not_modified
+    return await run_db(db, _get_supplier, supplier_id)
+
+def _create_supplier(db: Session, supplier: schemas.SupplierCreate):
     db_supplier = models.Supplier(**supplier.model_dump())
     db.add(db_supplier)
+    versions.bump(db, versions.SUPPLIERS)
     db.commit()
     db.refresh(db_supplier)
     return db_supplier
 
-@router.put("/{supplier_id}", response_model=schemas.SupplierResponse)
-def update_supplier(
-    supplier_id: int,
-    supplier_in: schemas.SupplierUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+@router.post("/", response_model=schemas.SupplierResponse)
+async def create_supplier(
+    supplier: schemas.SupplierCreate,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    supplier = db.query(models.Supplier).filter(models.Supplier.id == supplier_id).first()
-    if not supplier:
-        raise HTTPException(status_code=404, detail="Supplier not found")
-    
+    return await run_db(db, _create_supplier, supplier)
+
+def _update_supplier(db: Session, supplier_id: int, supplier_in: schemas.SupplierUpdate):
+    supplier = _get_supplier(db, supplier_id)
+
     update_data = supplier_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(supplier, field, value)
-    
+
     db.add(supplier)
+    versions.bump(db, versions.SUPPLIERS, versions.PRODUCTS)
     db.commit()
     db.refresh(supplier)
     return supplier
 
-@router.delete("/{supplier_id}", response_model=schemas.SupplierResponse)
-def delete_supplier(
+@router.put("/{supplier_id}", response_model=schemas.SupplierResponse)
+async def update_supplier(
     supplier_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    supplier_in: schemas.SupplierUpdate,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
 ):
-    supplier = db.query(models.Supplier).filter(models.Supplier.id == supplier_id).first()
-    if not supplier:
-        raise HTTPException(status_code=404, detail="Supplier not found")
+    return await run_db(db, _update_supplier, supplier_id, supplier_in)
+
+def _delete_supplier(db: Session, supplier_id: int):
+    supplier = _get_supplier(db, supplier_id)
+    deleted = schemas.SupplierResponse.model_validate(supplier)
     db.delete(supplier)
+    versions.bump(db, versions.SUPPLIERS, versions.PRODUCTS)
     db.commit()
-    return supplier
+    return deleted
+
+@router.delete("/{supplier_id}", response_model=schemas.SupplierResponse)
+async def delete_supplier(
+    supplier_id: int,
+    db: deps.DbSession = Depends(deps.get_session),
+    current_user: deps.CurrentUser = Depends(deps.get_current_active_user),
+):
+    return await run_db(db, _delete_supplier, supplier_id)
@@ -1,3 +1,4 @@
+import enum
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime
@@ -105,6 +106,25 @@ class ProductResponse(ProductBase):
     class Config:
         from_attributes = True
 
+class ProductSuggestion(BaseModel):
+    id: int
+    sku: str
+    name: str
+    category: Optional[str] = None
+    class Config:
+        from_attributes = True
+
+class ImportRowError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    error: str
+
+class ProductImportResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
 # --- Stock Movement ---
 class StockMovementBase(BaseModel):
     product_id: int
@@ -122,6 +142,53 @@ class StockMovementResponse(StockMovementBase):
     class Config:
         from_attributes = True
 
+class BatchMode(str, enum.Enum):
+    ATOMIC = "atomic"    # all entries apply or none do
+    PARTIAL = "partial"  # valid entries apply, invalid ones are reported
+
+class StockMovementBatch(BaseModel):
+    items: List[StockMovementCreate]
+    mode: BatchMode = BatchMode.ATOMIC
+
+class StockMovementBatchItemResult(BaseModel):
+    index: int
+    product_id: int
+    applied: bool
+    movement_id: Optional[int] = None
+    error: Optional[str] = None
+
+class StockMovementBatchResult(BaseModel):
+    applied: int
+    failed: int
+    results: List[StockMovementBatchItemResult]
+
+class StockAtResponse(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    price: float
+    quantity: int
+    value: float
+    as_of: datetime
+
+class ReorderItem(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    stock_quantity: int
+    daily_demand: float
+    demand_std: float
+    days_of_cover: float
+    reorder_point: float
+    suggested_quantity: int
+
+class ReorderSuggestion(BaseModel):
+    supplier_id: Optional[int] = None
+    supplier_name: Optional[str] = None
+    total_quantity: int
+    total_cost: float
+    items: List[ReorderItem]
+
 # --- Order ---
 class OrderItemBase(BaseModel):
     product_id: int
@@ -162,3 +229,39 @@ class DashboardStats(BaseModel):
     total_orders: int
     pending_orders: int
     total_revenue: float
+
+# --- Sales reports ---
+class SalesBucket(str, enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class SalesRanking(str, enum.Enum):
+    REVENUE = "revenue"
+    UNITS = "units"
+
+class SalesPoint(BaseModel):
+    bucket: datetime
+    units: int
+    revenue: float
+    orders: int
+
+class ProductSales(BaseModel):
+    product_id: int
+    sku: Optional[str] = None
+    name: Optional[str] = None
+    units: int
+    revenue: float
+    orders: int
+
+class CategorySales(BaseModel):
+    category: Optional[str] = None
+    units: int
+    revenue: float
+    orders: int
+
+# --- Import / Export ---
+class FileFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
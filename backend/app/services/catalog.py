@@ -0,0 +1,284 @@
+"""In-process read-through cache of the product catalog.
+
+Two bounded TTL caches per process: product id -> CatalogProduct (a frozen
+record of the product with its supplier, not an ORM object), and category
+(None for the whole catalog) -> the ids of its products in id order. The
+product list, product detail, order creation and stock adjustment routes
+read through them.
+
+Invalidation
+------------
+Code that changes products marks them with `invalidate(db, ids)`, or the
+whole catalog with `invalidate_all(db)`. ORM inserts, updates and deletes of
+products and suppliers are marked by the mapper events below; bulk and Core
+statements (stock deltas, imports, generated data) call these functions
+themselves. Inserts, deletes, category and supplier changes affect the lists
+and other records, so they invalidate everything; stock and price changes
+only the product itself.
+
+On commit the marks are dropped from this process's caches and written to
+`catalog_invalidations` in the same transaction, so they are never lost and
+never seen before the data. Other processes read the rows newer than the last
+one they saw at most every CATALOG_CACHE_POLL_SECONDS, before serving from
+their caches. That polling interval bounds how stale another worker's cache can be.
+The product routes also pass the version they put in the ETag
+(versions.PRODUCTS); when it is newer than the one the caches last caught up
+with, they poll at once, so a response is never older than its ETag.
+
+A load only enters the cache if no invalidation was applied in this process
+since the loading session's transaction began (its snapshot), and the session
+has not changed products itself, so an old or uncommitted row never replaces
+a newer one.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+from app import models
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.services import listings
+
+ALL = None  # the whole catalog, as a listing key and as an invalidation
+
+_PENDING = "catalog_invalidations"
+_GENERATION = "catalog_generation"
+# Listing of more than CATALOG_CACHE_MAX_PRODUCTS ids: paged from the database instead
+_TOO_BIG = "too big"
+
+@dataclass(frozen=True, slots=True)
+class CatalogSupplier:
+    id: int
+    name: str
+    contact_person: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    address: Optional[str]
+
+@dataclass(frozen=True, slots=True)
+class CatalogProduct:
+    id: int
+    sku: str
+    name: str
+    category: Optional[str]
+    price: float
+    stock_quantity: int
+    min_stock_threshold: int
+    supplier_id: Optional[int]
+    supplier: Optional[CatalogSupplier]
+
+    def as_dict(self) -> dict:
+        """Shaped like ProductResponse, in the field order of listings.product_dict."""
+        product = {name: getattr(self, name) for name in listings.PRODUCT_FIELDS}
+        supplier = self.supplier
+        product["supplier"] = (
+            {name: getattr(supplier, name) for name in listings.SUPPLIER_FIELDS} if supplier else None
+        )
+        return product
+
+products = TTLCache(maxsize=settings.CATALOG_CACHE_MAX_PRODUCTS, ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+product_lists = TTLCache(maxsize=settings.CATALOG_CACHE_MAX_LISTINGS, ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+
+_lock = threading.Lock()
+# Bumped by every invalidation applied in this process
+_generation = 0
+# Last catalog_invalidations row applied; None until the first poll
+_last_seen: Optional[int] = None
+# Products version (versions.PRODUCTS) read before the last poll that was asked to catch up with it
+_synced_version = -1
+_next_poll = 0.0
+_next_prune = 0.0
+
+def enabled() -> bool:
+    return settings.CATALOG_CACHE_ENABLED
+
+# --- Invalidation ---
+
+def invalidate(db: Session, product_ids: Iterable[int]) -> None:
+    """Mark products as changed by the current transaction."""
+    db.info.setdefault(_PENDING, set()).update(product_ids)
+
+def invalidate_all(db: Session) -> None:
+    db.info.setdefault(_PENDING, set()).add(ALL)
+
+def _apply(product_ids) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+    if ALL in product_ids:
+        products.clear()
+        product_lists.clear()
+        return
+    for product_id in product_ids:
+        products.pop(product_id)
+
+@event.listens_for(models.Product, "after_insert")
+@event.listens_for(models.Product, "after_delete")
+@event.listens_for(models.Supplier, "after_update")
+@event.listens_for(models.Supplier, "after_delete")
+def _catalog_changed(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        invalidate_all(session)
+
+@event.listens_for(models.Product, "after_update")
+def _product_changed(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is None:
+        return
+    changed = inspect(target).attrs
+    if changed.category.history.has_changes() or changed.supplier_id.history.has_changes():
+        invalidate_all(session)
+    else:
+        invalidate(session, [target.id])
+
+@event.listens_for(Session, "after_begin")
+def _remember_generation(db: Session, transaction, connection):
+    db.info[_GENERATION] = _generation
+
+@event.listens_for(Session, "before_commit")
+def _write_invalidations(db: Session):
+    if enabled():
+        db.flush()  # commit flushes after this hook; the mapper events above mark their products during it
+    pending = db.info.get(_PENDING)
+    if not pending or not enabled():
+        return
+    global _next_prune
+    table = models.CatalogInvalidation.__table__
+    now = datetime.utcnow()
+    db.execute(insert(table), [{"product_id": product_id, "created_at": now} for product_id in pending])
+    if time.monotonic() >= _next_prune:
+        # A row older than the TTL can only concern entries that have expired anyway.
+        _next_prune = time.monotonic() + 60
+        cutoff = now - timedelta(seconds=settings.CATALOG_CACHE_TTL_SECONDS + settings.CATALOG_CACHE_POLL_SECONDS)
+        db.execute(delete(table).where(table.c.created_at < cutoff))
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _apply_invalidations(db: Session):
+    # After a rollback too: loads made inside the transaction may have seen its writes.
+    pending = db.info.pop(_PENDING, None)
+    if pending:
+        _apply(pending)
+
+def _poll(db: Session, version: Optional[int] = None) -> None:
+    """Apply the invalidations other processes committed since the last poll.
+
+    Polls regardless of the interval when `version`, a products version read
+    before this call, is newer than the caches have caught up with: the
+    transaction that bumped it wrote its invalidations too.
+    """
+    global _last_seen, _next_poll, _synced_version
+    if version is not None and version != _synced_version:
+        _synced_version = version
+    elif time.monotonic() < _next_poll:
+        return
+    _next_poll = time.monotonic() + settings.CATALOG_CACHE_POLL_SECONDS
+    table = models.CatalogInvalidation.__table__
+    if _last_seen is None:
+        # Nothing cached before the first poll; start from the newest row.
+        _last_seen = db.execute(select(func.max(table.c.id))).scalar() or 0
+        return
+    rows = db.execute(
+        select(table.c.id, table.c.product_id).where(table.c.id > _last_seen).order_by(table.c.id)
+    ).all()
+    if rows:
+        _last_seen = rows[-1].id
+        _apply({product_id for _, product_id in rows})
+
+def _can_store(db: Session) -> bool:
+    db.connection()  # begins the transaction the loads will read from, if none is open yet
+    return db.info.get(_GENERATION) == _generation and not db.info.get(_PENDING)
+
+# --- Reads ---
+
+def _record(row) -> CatalogProduct:
+    product = listings.product_dict(row)
+    supplier = product.pop("supplier")
+    return CatalogProduct(supplier=CatalogSupplier(**supplier) if supplier else None, **product)
+
+def get_many(db: Session, product_ids: Iterable[int], version: Optional[int] = None) -> Dict[int, CatalogProduct]:
+    """The products that exist among `product_ids`, from memory where possible.
+
+    `version` is the products version the caller's response is tagged with, if any.
+    """
+    _poll(db, version)
+    found = {}
+    missing = []
+    for product_id in set(product_ids):
+        record = products.get(product_id)
+        if record is None:
+            missing.append(product_id)
+        else:
+            found[product_id] = record
+    if missing:
+        store = _can_store(db)
+        for row in listings.product_query(db).filter(models.Product.id.in_(missing)):
+            record = _record(row._mapping)
+            found[record.id] = record
+            if store:
+                products.set(record.id, record)
+    return found
+
+def get(db: Session, product_id: int, version: Optional[int] = None) -> Optional[CatalogProduct]:
+    return get_many(db, [product_id], version).get(product_id)
+
+def refresh(db: Session, product_ids: Iterable[int]) -> Dict[int, CatalogProduct]:
+    """Like get_many, but read from the database, for decisions a stale record could get wrong."""
+    product_ids = list(product_ids)
+    for product_id in product_ids:
+        products.pop(product_id)
+    return get_many(db, product_ids)
+
+def _listing(db: Session, category: Optional[str]):
+    ids = product_lists.get(category)
+    if ids is not None:
+        return ids
+    store = _can_store(db)
+    query = select(models.Product.id).order_by(models.Product.id).limit(settings.CATALOG_CACHE_MAX_PRODUCTS + 1)
+    if category:
+        query = query.where(models.Product.category == category)
+    ids = array("q", db.execute(query).scalars())
+    if len(ids) > settings.CATALOG_CACHE_MAX_PRODUCTS:
+        ids = _TOO_BIG
+    if store:
+        product_lists.set(category, ids)
+    return ids
+
+def _page_ids(db: Session, category, skip, limit, last_id) -> List[int]:
+    ids = _listing(db, category)
+    if ids is not _TOO_BIG:
+        start = bisect_right(ids, last_id) if last_id is not None else skip
+        return list(ids[start:start + limit + 1])
+    query = select(models.Product.id).order_by(models.Product.id)
+    if category:
+        query = query.where(models.Product.category == category)
+    if last_id is not None:
+        query = query.where(models.Product.id > last_id)
+    else:
+        query = query.offset(skip)
+    return list(db.execute(query.limit(limit + 1)).scalars())
+
+def product_page(db: Session, skip, limit, cursor, category, version=None) -> Tuple[List[dict], Optional[str]]:
+    """Same page as listings.product_page without a search, from the caches."""
+    _poll(db, version)
+    last_id = None
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            return listings.product_page(db, skip, limit, cursor, None, category)
+    ids = _page_ids(db, category or ALL, skip, limit, last_id)
+    records = get_many(db, ids)
+    # A product deleted since the listing was read is left out of the page
+    page = [records[product_id].as_dict() for product_id in ids[:limit] if product_id in records]
+    next_cursor = encode_cursor([ids[limit - 1]]) if len(ids) > limit else None
+    return page, next_cursor
+
+def stats() -> dict:
+    return {"products": products.stats(), "listings": product_lists.stats()}
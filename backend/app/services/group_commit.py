@@ -0,0 +1,184 @@
+"""Group commit for stock writes.
+
+With GROUP_COMMIT_ENABLED, order creation and single stock adjustments are
+not committed by the request that makes them. They are queued for one
+writer thread, which takes whatever has arrived within GROUP_COMMIT_WINDOW_MS
+(up to GROUP_COMMIT_MAX_BATCH jobs) and runs it in a single transaction,
+each job inside its own SAVEPOINT. A job that raises only rolls back its own
+savepoint, so every caller still gets its own result or validation error,
+while the batch pays for one commit (and one fsync) instead of one each.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from app import database
+from app.core.config import settings
+from app.services.idempotency import Idempotency
+
+logger = logging.getLogger(__name__)
+
+Job = Tuple[Callable[[Session], object], Future]
+
+def _writer_sessions() -> sessionmaker:
+    # A connection of its own, with explicit transactions so SAVEPOINT works on SQLite.
+    engine = create_engine(
+        database.sync_url, connect_args=database.connect_args, pool_size=1, max_overflow=0
+    )
+    if database.PRODUCTION_PROFILE:
+        database.configure_sqlite(engine, readonly=False)
+    elif database.backend == "sqlite":
+        database.use_explicit_transactions(engine, "BEGIN IMMEDIATE")
+    return sessionmaker(bind=engine, autoflush=False)
+
+class GroupCommitWriter:
+    def __init__(self, session_factory: sessionmaker, max_batch: int, window_seconds: float):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.window_seconds = window_seconds
+        self.batches = 0
+        self.jobs = 0
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+        self.session_factory.kw["bind"].dispose()
+
+    def submit(self, job: Callable[[Session], object]) -> Future:
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def _collect(self, first: Job) -> Tuple[List[Job], bool]:
+        jobs = [first]
+        deadline = time.monotonic() + self.window_seconds
+        while len(jobs) < self.max_batch:
+            try:
+                job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if job is None:
+                return jobs, True
+            jobs.append(job)
+        return jobs, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            jobs, stopping = self._collect(first)
+            try:
+                self._apply_batch(jobs)
+            except Exception:  # never let the writer thread die
+                logger.exception("Group commit batch failed")
+                for _, future in jobs:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Group commit failed"))
+
+    def _apply_batch(self, jobs: List[Job]):
+        self.batches += 1
+        self.jobs += len(jobs)
+        done, retry = [], []
+        db = self.session_factory()
+        try:
+            for job, future in jobs:
+                savepoint = db.begin_nested()
+                try:
+                    result = job(db)
+                    savepoint.commit()
+                except IntegrityError:
+                    # Typically another process committed the same Idempotency-Key;
+                    # run it again on its own once this batch is in.
+                    savepoint.rollback()
+                    retry.append((job, future))
+                except Exception as exc:
+                    savepoint.rollback()
+                    future.set_exception(exc)
+                else:
+                    done.append((future, result))
+            try:
+                db.commit()
+            except Exception:
+                logger.exception("Group commit failed, applying %s jobs one by one", len(done))
+                db.rollback()
+                retry = [(job, future) for (job, future) in jobs if not future.done()]
+            else:
+                for future, result in done:
+                    future.set_result(result)
+        finally:
+            db.close()
+        for job, future in retry:
+            self._apply_alone(job, future)
+
+    def _apply_alone(self, job: Callable[[Session], object], future: Future):
+        db = self.session_factory()
+        try:
+            result = job(db)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+        finally:
+            db.close()
+
+writer: Optional[GroupCommitWriter] = None
+
+def start():
+    global writer
+    if settings.GROUP_COMMIT_ENABLED and writer is None:
+        writer = GroupCommitWriter(
+            _writer_sessions(), settings.GROUP_COMMIT_MAX_BATCH, settings.GROUP_COMMIT_WINDOW_MS / 1000
+        )
+        writer.start()
+
+def stop():
+    global writer
+    if writer is not None:
+        writer.stop()
+        writer = None
+
+def _commit_alone(db: Session, idempotent: Idempotency, apply, *args):
+    replayed = idempotent.replay(db)
+    if replayed:
+        return replayed
+    try:
+        response = apply(db, *args)
+    except Exception:
+        db.rollback()
+        raise
+    return idempotent.commit(db, response) or response
+
+async def execute(db, idempotent: Idempotency, apply, *args):
+    """Run the write `apply(session, *args)` and commit it, returning its response.
+
+    `apply` must not commit or roll back; it raises to reject the request.
+    Through the group-commit writer when it is running, in the request's own
+    session and transaction otherwise.
+    """
+    if writer is None:
+        return await database.run_db(db, _commit_alone, idempotent, apply, *args)
+
+    def job(session: Session):
+        replayed = idempotent.replay(session)
+        if replayed:
+            return replayed
+        response = apply(session, *args)
+        idempotent.record(session, response)
+        return response
+
+    return await asyncio.wrap_future(writer.submit(job))
@@ -0,0 +1,99 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Set on responses served from the store rather than by running the request.
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+class Idempotency:
+    """Idempotency-Key handling for one request.
+
+    The response is stored in the same transaction as the change it reports,
+    so both are committed or neither is. A retry is answered from the stored
+    row before any stock is read. Only successful responses are stored; a
+    request that failed can be retried with the same key.
+    """
+
+    def __init__(self, user_id: int, key: Optional[str], endpoint: str, payload: BaseModel):
+        self.user_id = user_id
+        self.key = key
+        # The endpoint is part of the fingerprint, so reusing a key elsewhere is a mismatch too.
+        self.fingerprint = (
+            hashlib.sha256(f"{endpoint}\n{payload.model_dump_json()}".encode()).hexdigest() if key else None
+        )
+
+    def replay(self, db: Session) -> Optional[Response]:
+        if not self.key:
+            return None
+        stored = db.get(models.IdempotencyKey, (self.user_id, self.key))
+        if stored is None or stored.expires_at <= _now():
+            return None
+        if stored.fingerprint != self.fingerprint:
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used for a different request"
+            )
+        return Response(
+            content=stored.response_body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    def record(self, db: Session, response: BaseModel, status_code: int = 200):
+        """Add `response` under the key to the current transaction."""
+        if not self.key:
+            return
+        now = _now()
+        # An expired entry for this key would otherwise block the insert.
+        db.execute(
+            delete(models.IdempotencyKey).where(
+                models.IdempotencyKey.user_id == self.user_id,
+                models.IdempotencyKey.key == self.key,
+                models.IdempotencyKey.expires_at <= now,
+            )
+        )
+        db.add(models.IdempotencyKey(
+            user_id=self.user_id,
+            key=self.key,
+            fingerprint=self.fingerprint,
+            status_code=status_code,
+            response_body=response.model_dump_json(),
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        ))
+
+    def commit(self, db: Session, response: BaseModel, status_code: int = 200) -> Optional[Response]:
+        """Commit the transaction with `response` recorded under the key.
+
+        Returns None when this request's changes were committed. If a concurrent
+        request with the same key committed first, this one is rolled back and
+        the response stored by the other one is returned instead.
+        """
+        self.record(db, response, status_code)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            replayed = self.replay(db)
+            if replayed is None:
+                raise
+            return replayed
+        return None
+
+def purge_expired(db: Session) -> int:
+    """Delete expired entries; returns how many were removed."""
+    result = db.execute(
+        delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at <= _now())
+    )
+    return result.rowcount
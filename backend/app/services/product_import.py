@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+from typing import IO, Dict, Iterator, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.database import upsert_insert
+from app.services import catalog
+from app.services import stats as stats_service
+from app.services import versions
+
+# Rows are validated and written CHUNK_SIZE at a time: one SELECT for the
+# chunk's existing SKUs, one multi-row INSERT ... ON CONFLICT (sku) DO UPDATE
+# per set of columns the rows carry, one bulk INSERT of movements and one
+# commit per chunk. A column a row leaves out keeps its current value on an
+# existing product and gets the default on a new one.
+CHUNK_SIZE = 1000
+UPSERT_COLUMNS = ["sku", "name", "category", "price", "stock_quantity", "min_stock_threshold", "supplier_id"]
+
+def read_rows(upload: IO[bytes], fmt: schemas.FileFormat) -> Iterator[Tuple[int, dict]]:
+    """Yield (row number, raw fields) from a CSV or NDJSON upload without loading it whole."""
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    if fmt == schemas.FileFormat.CSV:
+        for number, row in enumerate(csv.DictReader(text), start=2):  # line 1 is the header
+            # Empty cells mean "not given", not an empty string.
+            yield number, {key: value for key, value in row.items() if key and value not in ("", None)}
+    else:
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else {"__invalid__": line}
+
+def _chunks(rows: Iterator[Tuple[int, dict]]) -> Iterator[List[Tuple[int, dict]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _validate(chunk, result: schemas.ProductImportResult) -> Dict[str, Tuple[int, schemas.ProductCreate]]:
+    valid = {}
+    for number, raw in chunk:
+        if "__invalid__" in raw:
+            result.failed += 1
+            result.errors.append(schemas.ImportRowError(row=number, error="Row is not a JSON object"))
+            continue
+        try:
+            product = schemas.ProductCreate(**raw)
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            result.failed += 1
+            result.errors.append(schemas.ImportRowError(
+                row=number,
+                sku=str(raw["sku"]) if raw.get("sku") is not None else None,
+                error=f"{'.'.join(str(part) for part in first['loc'])}: {first['msg']}",
+            ))
+            continue
+        valid[product.sku] = (number, product)  # a SKU repeated in the file: the last row wins
+    return valid
+
+def _write_chunk(db: Session, products: Dict[str, schemas.ProductCreate], record_movements: bool) -> Tuple[int, int]:
+    Product = models.Product
+    existing = {
+        row.sku: row for row in db.execute(
+            select(Product.id, Product.sku, Product.price, Product.stock_quantity, Product.min_stock_threshold)
+            .where(Product.sku.in_(list(products)))
+        )
+    }
+
+    # Rows grouped by the columns they carry: an update only sets those. Each
+    # group is one cached statement run as executemany, batched by the driver
+    # layer into multi-row INSERTs; RETURNING hands back the id of every
+    # inserted or updated row.
+    groups: Dict[frozenset, List[dict]] = {}
+    for product in products.values():
+        groups.setdefault(frozenset(product.model_fields_set), []).append(product.model_dump())
+    table = Product.__table__
+    insert = upsert_insert(db.get_bind())
+    ids = {}
+    for given, rows in groups.items():
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.sku],
+            set_={name: stmt.excluded[name] for name in UPSERT_COLUMNS if name != "sku" and name in given},
+        ).returning(table.c.id, table.c.sku)
+        ids.update({sku: product_id for product_id, sku in db.execute(stmt, rows)})
+
+    changes, movements = [], []
+    for sku, product in products.items():
+        before = existing.get(sku)
+        if before is None:
+            changes.append((None, (product.price, product.stock_quantity, product.min_stock_threshold)))
+            delta, change_type, note = product.stock_quantity, models.StockMovementType.IN, "Initial stock (import)"
+        else:
+            given = product.model_fields_set
+            old = (before.price, before.stock_quantity or 0, before.min_stock_threshold)
+            new = tuple(
+                getattr(product, name) if name in given else value
+                for name, value in zip(("price", "stock_quantity", "min_stock_threshold"), old)
+            )
+            changes.append((old, new))
+            delta = new[1] - old[1]
+            change_type, note = models.StockMovementType.ADJUSTMENT, "Stock set by import"
+        if record_movements and delta:
+            movements.append({
+                "product_id": ids[sku], "change_type": change_type, "quantity": delta, "notes": note,
+            })
+
+    stats_service.apply_product_changes(db, changes)
+    versions.bump(db, versions.PRODUCTS)
+    # The upsert bypasses the ORM events, and may add products
+    catalog.invalidate_all(db)
+    if movements:
+        db.execute(models.StockMovement.__table__.insert(), movements)
+    return len(products) - len(existing), len(existing)
+
+def import_products(
+    db: Session, upload: IO[bytes], fmt: schemas.FileFormat, record_movements: bool = False
+) -> schemas.ProductImportResult:
+    result = schemas.ProductImportResult()
+    for chunk in _chunks(read_rows(upload, fmt)):
+        rows = _validate(chunk, result)
+        if not rows:
+            continue
+        products = {sku: product for sku, (_, product) in rows.items()}
+        try:
+            created, updated = _write_chunk(db, products, record_movements)
+            db.commit()
+        except SQLAlchemyError as exc:
+            # The chunk is one transaction: report every row in it and carry on with the next.
+            db.rollback()
+            error = str(exc.orig if getattr(exc, "orig", None) else exc)
+            result.failed += len(rows)
+            result.errors.extend(
+                schemas.ImportRowError(row=number, sku=sku, error=error)
+                for sku, (number, _) in rows.items()
+            )
+            continue
+        result.created += created
+        result.updated += updated
+    return result
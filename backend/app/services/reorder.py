@@ -0,0 +1,132 @@
+"""Reorder suggestions from recent demand.
+
+OUT movements of the lookback window are read in one query, already summed
+per product and day, and everything after that is array math over the whole
+catalog: mean and standard deviation of daily demand, reorder point, days of
+cover and the quantity that brings each product back to its target level.
+No Python code runs per product until the suggested ones are listed.
+
+    reorder point = mean * lead_time + z * std * sqrt(lead_time)
+    target level  = mean * (lead_time + review) + z * std * sqrt(lead_time)
+
+A product at or below its reorder point is suggested for `target - stock`,
+rounded up.
+"""
+from datetime import date, datetime, timedelta
+from itertools import chain
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app import models
+from app.services import snapshots
+
+# Products whose details are loaded per query; stays below SQLite's parameter limit
+DETAIL_CHUNK = 5000
+
+def _columns(db: Session, stmt, width: int) -> np.ndarray:
+    # Straight from the rows' values into one float array; np.array() on Row objects
+    # is an order of magnitude slower.
+    return np.fromiter(chain.from_iterable(db.execute(stmt)), dtype=np.float64).reshape(-1, width)
+
+def _demand(db: Session, product_ids: np.ndarray, since: date):
+    """Sum and sum of squares of daily OUT quantities per product, aligned with `product_ids`."""
+    Movement = models.StockMovement
+    day = func.date(Movement.created_at)
+    # The window is a range on the raw column, so it is read through the created_at index
+    created, bound = snapshots.created_column(db)
+    daily = _columns(db, (
+        select(Movement.product_id, func.sum(Movement.quantity))
+        .where(Movement.change_type == models.StockMovementType.OUT.value, created >= bound(snapshots.midnight(since)))
+        .group_by(Movement.product_id, day)
+    ), 2)
+
+    positions = np.searchsorted(product_ids, daily[:, 0])
+    known = positions < len(product_ids)
+    known[known] = product_ids[positions[known]] == daily[known, 0]
+    positions, quantities = positions[known], daily[known, 1]
+    total = np.bincount(positions, weights=quantities, minlength=len(product_ids))
+    squares = np.bincount(positions, weights=quantities ** 2, minlength=len(product_ids))
+    return total, squares
+
+def compute(
+    db: Session,
+    lookback_days: int,
+    lead_time_days: int,
+    review_days: int,
+    service_level_z: float,
+    supplier_id: Optional[int] = None,
+) -> List[dict]:
+    """Suggested purchase orders, one entry per supplier with the products to reorder."""
+    Product = models.Product
+    query = select(
+        Product.id,
+        func.coalesce(Product.supplier_id, 0),
+        func.coalesce(Product.stock_quantity, 0),
+        Product.price,
+    ).order_by(Product.id)
+    if supplier_id is not None:
+        query = query.where(Product.supplier_id == supplier_id)
+    products = _columns(db, query, 4)
+    ids = products[:, 0].astype(np.int64)
+    suppliers = products[:, 1].astype(np.int64)
+    stock, price = products[:, 2], products[:, 3]
+
+    since = datetime.utcnow().date() - timedelta(days=lookback_days - 1)
+    total, squares = _demand(db, ids, since)
+    # Days without an OUT movement count as zero demand.
+    mean = total / lookback_days
+    std = np.sqrt(np.maximum(squares / lookback_days - mean ** 2, 0.0))
+
+    safety = service_level_z * std * np.sqrt(lead_time_days)
+    reorder_point = mean * lead_time_days + safety
+    target = mean * (lead_time_days + review_days) + safety
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(mean > 0, stock / mean, np.inf)
+    suggested = np.where(
+        (mean > 0) & (stock <= reorder_point), np.ceil(np.maximum(target - stock, 0.0)), 0.0
+    ).astype(np.int64)
+
+    # Suggested products grouped by supplier, the ones running out first at the top.
+    picked = np.flatnonzero(suggested > 0)
+    picked = picked[np.lexsort((cover[picked], suppliers[picked]))]
+    details = {}
+    picked_ids = ids[picked].tolist()
+    for start in range(0, len(picked_ids), DETAIL_CHUNK):
+        chunk = picked_ids[start:start + DETAIL_CHUNK]
+        for product_id, sku, name in db.execute(
+            select(Product.id, Product.sku, Product.name).where(Product.id.in_(chunk))
+        ):
+            details[product_id] = (sku, name)
+    supplier_names = dict(db.execute(
+        select(models.Supplier.id, models.Supplier.name)
+        .where(models.Supplier.id.in_(np.unique(suppliers[picked]).tolist()))
+    ).all())
+
+    orders = []
+    for group in np.split(picked, np.flatnonzero(np.diff(suppliers[picked])) + 1):
+        if not len(group):
+            continue
+        group_supplier = int(suppliers[group[0]]) or None
+        items = [
+            {
+                "product_id": int(ids[i]),
+                "sku": details[int(ids[i])][0],
+                "name": details[int(ids[i])][1],
+                "stock_quantity": int(stock[i]),
+                "daily_demand": float(mean[i]),
+                "demand_std": float(std[i]),
+                "days_of_cover": float(cover[i]),
+                "reorder_point": float(reorder_point[i]),
+                "suggested_quantity": int(suggested[i]),
+            }
+            for i in group.tolist()
+        ]
+        orders.append({
+            "supplier_id": group_supplier,
+            "supplier_name": supplier_names.get(group_supplier),
+            "total_quantity": int(suggested[group].sum()),
+            "total_cost": float((suggested[group] * price[group]).sum()),
+            "items": items,
+        })
+    return orders
@@ -0,0 +1,195 @@
+"""Pre-aggregated sales for the report endpoints.
+
+`sales_rollups` holds units, revenue and order count per hour and per day,
+for all sales together, per product and per category. Creating an order adds
+its lines to the matching rows in the same transaction, so a report over any
+range reads at most one row per bucket (and key) instead of scanning orders.
+`manage.py rebuild-sales-rollups` recomputes the table from the orders.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app import models
+from app.database import upsert_insert
+
+HOUR = "hour"
+DAY = "day"
+GRAINS = (HOUR, DAY)
+
+TOTAL = "total"
+PRODUCT = "product"
+CATEGORY = "category"
+
+# Key of the products without a category
+UNCATEGORIZED = ""
+
+INSERT_CHUNK = 5000
+
+# (grain, bucket, dimension, key) -> [units, revenue, orders]
+Totals = Dict[Tuple[str, datetime, str, str], list]
+
+def truncate(moment: datetime, grain: str) -> datetime:
+    """Start of the hour or day (UTC, naive) containing `moment`."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    if grain == HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return datetime.combine(moment.date(), time.min)
+
+def _add_order(totals: Totals, created_at: datetime, lines: Iterable[Tuple[int, Optional[str], int, float]]):
+    # lines: (product_id, category, quantity, price) of one order
+    lines = list(lines)
+    for grain in GRAINS:
+        bucket = truncate(created_at, grain)
+        seen = set()
+        for product_id, category, quantity, price in lines:
+            for dimension, key in ((TOTAL, ""), (PRODUCT, str(product_id)), (CATEGORY, category or UNCATEGORIZED)):
+                row = totals[(grain, bucket, dimension, key)]
+                row[0] += quantity
+                row[1] += quantity * price
+                # An order counts once per row, however many of its lines fall into it.
+                if (dimension, key) not in seen:
+                    seen.add((dimension, key))
+                    row[2] += 1
+
+def _rows(totals: Totals) -> List[dict]:
+    return [
+        {"grain": grain, "bucket": bucket, "dimension": dimension, "key": key,
+         "units": units, "revenue": revenue, "orders": orders}
+        for (grain, bucket, dimension, key), (units, revenue, orders) in totals.items()
+    ]
+
+def apply_order_created(db: Session, order: models.Order) -> None:
+    """Add a new order, loaded with its items and their products, to the rollups."""
+    totals: Totals = defaultdict(lambda: [0, 0.0, 0])
+    _add_order(totals, order.created_at, (
+        (item.product_id, item.product.category, item.quantity, item.price_at_time) for item in order.items
+    ))
+    Rollup = models.SalesRollup
+    insert = upsert_insert(db.get_bind())
+    stmt = insert(Rollup.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Rollup.grain, Rollup.dimension, Rollup.key, Rollup.bucket],
+        set_={
+            "units": Rollup.units + stmt.excluded.units,
+            "revenue": Rollup.revenue + stmt.excluded.revenue,
+            "orders": Rollup.orders + stmt.excluded.orders,
+        },
+    )
+    db.execute(stmt, _rows(totals))
+
+def rebuild(db: Session) -> int:
+    """Recompute every rollup row from orders and order items; returns the rows written."""
+    totals: Totals = defaultdict(lambda: [0, 0.0, 0])
+    Order, Item = models.Order, models.OrderItem
+    lines = db.execute(
+        select(Order.id, Order.created_at, Item.product_id, models.Product.category, Item.quantity, Item.price_at_time)
+        .join(Item, Item.order_id == Order.id)
+        .outerjoin(models.Product, models.Product.id == Item.product_id)
+        .order_by(Order.id)
+        .execution_options(yield_per=INSERT_CHUNK)
+    )
+    order_id, created_at, order_lines = None, None, []
+    for line in lines:
+        if line.id != order_id:
+            if order_lines:
+                _add_order(totals, created_at, order_lines)
+            order_id, created_at, order_lines = line.id, line.created_at, []
+        order_lines.append((line.product_id, line.category, line.quantity, line.price_at_time))
+    if order_lines:
+        _add_order(totals, created_at, order_lines)
+
+    db.execute(delete(models.SalesRollup))
+    rows = _rows(totals)
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.execute(models.SalesRollup.__table__.insert(), rows[start:start + INSERT_CHUNK])
+    return len(rows)
+
+def _range(start: date, end: date) -> Tuple[datetime, datetime]:
+    # Whole days, end included
+    return datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+
+def _period(bucket: datetime, size: str) -> datetime:
+    if size == "week":
+        return bucket - timedelta(days=bucket.weekday())
+    if size == "month":
+        return bucket.replace(day=1)
+    return bucket
+
+def timeseries(
+    db: Session, start: date, end: date, bucket: str,
+    product_id: Optional[int] = None, category: Optional[str] = None,
+) -> List[dict]:
+    """Units, revenue and orders per hour, day, week or month between two days (inclusive)."""
+    Rollup = models.SalesRollup
+    dimension, key = TOTAL, ""
+    if product_id is not None:
+        dimension, key = PRODUCT, str(product_id)
+    elif category is not None:
+        dimension, key = CATEGORY, category
+    low, high = _range(start, end)
+    rows = db.execute(
+        select(Rollup.bucket, Rollup.units, Rollup.revenue, Rollup.orders)
+        .where(
+            Rollup.grain == (HOUR if bucket == HOUR else DAY),
+            Rollup.dimension == dimension,
+            Rollup.key == key,
+            Rollup.bucket >= low,
+            Rollup.bucket < high,
+        )
+        .order_by(Rollup.bucket)
+    ).all()
+    # Weeks and months are summed from the daily rows; there are at most a few thousand.
+    periods: Dict[datetime, list] = {}
+    for moment, units, revenue, orders in rows:
+        period = periods.setdefault(_period(moment, bucket), [0, 0.0, 0])
+        period[0] += units
+        period[1] += revenue
+        period[2] += orders
+    return [
+        {"bucket": moment, "units": units, "revenue": revenue, "orders": orders}
+        for moment, (units, revenue, orders) in periods.items()
+    ]
+
+def _by_key(db: Session, dimension: str, start: date, end: date, order_by: str, limit: Optional[int]):
+    Rollup = models.SalesRollup
+    low, high = _range(start, end)
+    units, revenue, orders = func.sum(Rollup.units), func.sum(Rollup.revenue), func.sum(Rollup.orders)
+    stmt = (
+        select(Rollup.key, units, revenue, orders)
+        .where(Rollup.grain == DAY, Rollup.dimension == dimension, Rollup.bucket >= low, Rollup.bucket < high)
+        .group_by(Rollup.key)
+        .order_by((units if order_by == "units" else revenue).desc(), Rollup.key)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return db.execute(stmt).all()
+
+def top_products(db: Session, start: date, end: date, order_by: str, limit: int) -> List[dict]:
+    ranked = _by_key(db, PRODUCT, start, end, order_by, limit)
+    ids = [int(key) for key, *_ in ranked]
+    products = {
+        product.id: product
+        for product in db.query(models.Product).filter(models.Product.id.in_(ids))
+    }
+    results = []
+    for key, units, revenue, orders in ranked:
+        # Deleted products keep their sales history, just without a name.
+        product = products.get(int(key))
+        results.append({
+            "product_id": int(key),
+            "sku": product.sku if product else None,
+            "name": product.name if product else None,
+            "units": units,
+            "revenue": revenue,
+            "orders": orders,
+        })
+    return results
+
+def by_category(db: Session, start: date, end: date, order_by: str) -> List[dict]:
+    return [
+        {"category": key or None, "units": units, "revenue": revenue, "orders": orders}
+        for key, units, revenue, orders in _by_key(db, CATEGORY, start, end, order_by, None)
+    ]
@@ -0,0 +1,49 @@
+from typing import List, Optional
+from sqlalchemy import func, literal_column, or_, table, column
+from sqlalchemy.orm import Query, Session
+from app import models
+
+# Product search runs on an SQLite FTS5 index over sku, name and category.
+# The trigram tokenizer matches any substring of 3+ characters, so "ook"
+# finds "MacBook", without scanning the products table. The index is an
+# external-content table kept in sync by triggers, so every write path
+# (routes, bulk loads, manual SQL) updates it. The migrations create both.
+FTS_TABLE = "products_fts"
+MIN_TERM_LENGTH = 3
+# bm25 column weights: sku, name, category
+RANK = func.bm25(literal_column(FTS_TABLE), 10.0, 5.0, 1.0)
+
+fts = table(FTS_TABLE, column("rowid"))
+
+def is_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+def _match_expression(search: str) -> Optional[str]:
+    # Quote each term so user input can't use FTS query syntax; all terms must match.
+    terms = [term for term in search.split() if len(term) >= MIN_TERM_LENGTH]
+    if not terms:
+        return None
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+def apply_search(query: Query, search: str) -> Query:
+    """Restrict a Product query to `search` matches, best matches first."""
+    match = _match_expression(search) if is_supported(query.session.get_bind()) else None
+    if match is None:
+        # Too short for trigrams (or no FTS on this database): plain substring match.
+        pattern = f"%{search.strip()}%"
+        return query.filter(or_(
+            models.Product.name.ilike(pattern), models.Product.sku.ilike(pattern)
+        )).order_by(models.Product.name)
+    return (
+        query.join(fts, fts.c.rowid == models.Product.id)
+        .filter(literal_column(FTS_TABLE).op("MATCH")(match))
+        .order_by(RANK, models.Product.id)
+    )
+
+def suggest(db: Session, q: str, category: Optional[str] = None, limit: int = 10) -> List[tuple]:
+    query = db.query(
+        models.Product.id, models.Product.sku, models.Product.name, models.Product.category
+    )
+    if category:
+        query = query.filter(models.Product.category == category)
+    return apply_search(query, q).limit(limit).all()
@@ -0,0 +1,147 @@
+"""Point-in-time stock levels.
+
+The stock of a product at an instant is the nearest earlier snapshot plus the
+movements between the snapshot and that instant. Without such a snapshot the
+current stock is walked back by the movements made since the instant.
+Snapshots are themselves computed that way, from the current stock backwards,
+so stock set without a movement (product edits, imports without movements)
+is attributed to the whole history before it.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import String, case, func, select, type_coerce
+from sqlalchemy.orm import Session
+from app import models
+from app.database import upsert_insert
+
+INSERT_CHUNK = 5000
+
+def midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+def _delta():
+    # Signed stock change of a movement, as in stock.movement_delta.
+    Movement = models.StockMovement
+    return case(
+        (Movement.change_type == models.StockMovementType.OUT.value, -Movement.quantity),
+        else_=Movement.quantity,
+    )
+
+def naive_utc(moment: datetime) -> datetime:
+    # Timestamps are stored as naive UTC
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+def created_column(db, column=models.StockMovement.created_at):
+    """`column` (a created_at, by default the movements') and a formatter for bounds compared with it.
+
+    SQLite keeps server-default timestamps as "YYYY-MM-DD HH:MM:SS" text (Python-written
+    ones add ".ffffff"); compare that text with boundaries in the same format so a row
+    made exactly at midnight is not counted on the wrong side. `db` is a Session or an Engine.
+    """
+    bind = db.get_bind() if isinstance(db, Session) else db
+    if bind.dialect.name == "sqlite":
+        return type_coerce(column, String), lambda moment: moment.isoformat(sep=" ")
+    return column, lambda moment: moment
+
+def _movement_sums(db: Session, product_ids: Optional[List[int]], start: Optional[datetime], end: Optional[datetime]) -> Dict[int, int]:
+    Movement = models.StockMovement
+    created, bound = created_column(db)
+    stmt = select(Movement.product_id, func.sum(_delta())).group_by(Movement.product_id)
+    if product_ids is not None:
+        stmt = stmt.where(Movement.product_id.in_(product_ids))
+    if start is not None:
+        stmt = stmt.where(created >= bound(start))
+    if end is not None:
+        stmt = stmt.where(created < bound(end))
+    return dict(db.execute(stmt).all())
+
+def stock_at(db: Session, product_ids: List[int], at: datetime) -> Dict[int, int]:
+    """Stock of each of `product_ids` at the instant `at` (naive UTC)."""
+    Snapshot = models.StockSnapshot
+    anchor = db.execute(select(func.max(Snapshot.as_of)).where(Snapshot.as_of <= at)).scalar()
+    levels = {}
+    if anchor is not None:
+        levels = dict(db.execute(
+            select(Snapshot.product_id, Snapshot.quantity)
+            .where(Snapshot.as_of == anchor, Snapshot.product_id.in_(product_ids))
+        ).all())
+        forward = _movement_sums(db, list(levels), anchor, at)
+        for product_id in levels:
+            levels[product_id] += forward.get(product_id, 0)
+
+    # Products without a snapshot (none taken yet, or created since) start from their current stock.
+    rest = [product_id for product_id in product_ids if product_id not in levels]
+    if rest:
+        current = dict(db.execute(
+            select(models.Product.id, models.Product.stock_quantity).where(models.Product.id.in_(rest))
+        ).all())
+        since = _movement_sums(db, rest, at, None)
+        for product_id in rest:
+            levels[product_id] = (current.get(product_id) or 0) - since.get(product_id, 0)
+    return levels
+
+def take_snapshots(db: Session, days: Iterable[date]) -> int:
+    """Store every product's stock at the start of each of `days`; returns the rows written.
+
+    One pass backwards from the current stock over movements summed per product
+    and per day, so the cost is a single scan of the movements since the oldest
+    day, however many days are filled in.
+    """
+    days = sorted(set(days), reverse=True)
+    if not days:
+        return 0
+    levels = {
+        product_id: quantity or 0
+        for product_id, quantity in db.execute(select(models.Product.id, models.Product.stock_quantity)).all()
+    }
+
+    Movement = models.StockMovement
+    created, bound = created_column(db)
+    day_of = func.date(Movement.created_at)
+    per_day = defaultdict(list)
+    for product_id, day, delta in db.execute(
+        select(Movement.product_id, day_of, func.sum(_delta()))
+        .where(created >= bound(midnight(days[-1])))
+        .group_by(Movement.product_id, day_of)
+    ):
+        per_day[str(day)].append((product_id, delta))
+    pending = sorted(per_day, reverse=True)
+
+    Snapshot = models.StockSnapshot
+    insert = upsert_insert(db.get_bind())
+    stmt = insert(Snapshot.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Snapshot.as_of, Snapshot.product_id], set_={"quantity": stmt.excluded.quantity}
+    )
+
+    written = 0
+    for day in days:
+        # Undo everything that happened on or after this day.
+        while pending and pending[0] >= day.isoformat():
+            for product_id, delta in per_day[pending.pop(0)]:
+                if product_id in levels:
+                    levels[product_id] -= delta
+        as_of = midnight(day)
+        rows = [{"as_of": as_of, "product_id": product_id, "quantity": quantity} for product_id, quantity in levels.items()]
+        for start in range(0, len(rows), INSERT_CHUNK):
+            db.execute(stmt, rows[start:start + INSERT_CHUNK])
+        written += len(rows)
+    return written
+
+def stock_at_rows(db: Session, products: List[models.Product], at: datetime) -> List[dict]:
+    levels = stock_at(db, [product.id for product in products], at)
+    return [
+        {
+            "product_id": product.id,
+            "sku": product.sku,
+            "name": product.name,
+            "price": product.price,
+            "quantity": levels[product.id],
+            "value": levels[product.id] * product.price,
+            "as_of": at,
+        }
+        for product in products
+    ]
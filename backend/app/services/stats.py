@@ -0,0 +1,116 @@
+import logging
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# The dashboard aggregates live in a single row of `inventory_stats`. Every
+# route that changes products or orders applies its delta to that row inside
+# its own transaction, so reading the dashboard is a primary key lookup.
+# The row is created once, together with the table (see models.py) or by
+# `manage.py rebuild-stats`; requests never create it.
+STATS_ID = 1
+
+# (price, stock_quantity, min_stock_threshold) of a product, or None when it doesn't exist
+ProductState = Optional[Tuple[float, int, int]]
+
+def product_state(product: Optional[models.Product]) -> ProductState:
+    if product is None:
+        return None
+    return (
+        product.price or 0.0,
+        product.stock_quantity or 0,
+        product.min_stock_threshold if product.min_stock_threshold is not None else 10,
+    )
+
+def _contribution(state: ProductState) -> Tuple[int, float, int]:
+    if state is None:
+        return 0, 0.0, 0
+    price, stock, threshold = state
+    return 1, price * stock, 1 if stock < threshold else 0
+
+def _apply(db: Session, **deltas) -> None:
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    table = models.InventoryStats
+    result = db.execute(
+        update(table)
+        .where(table.id == STATS_ID)
+        .values({name: getattr(table, name) + value for name, value in deltas.items()})
+    )
+    if result.rowcount == 0:
+        # Without a row the dashboard falls back to computing from the tables,
+        # so there is nothing to keep in step until the row is rebuilt.
+        logger.warning("inventory_stats row is missing; run `python manage.py rebuild-stats`")
+
+def apply_product_change(db: Session, before: ProductState, after: ProductState) -> None:
+    apply_product_changes(db, [(before, after)])
+
+def apply_product_changes(db: Session, changes: Iterable[Tuple[ProductState, ProductState]]) -> None:
+    # Many product changes folded into one UPDATE of the stats row.
+    products = value = low = 0
+    for before, after in changes:
+        count_before, value_before, low_before = _contribution(before)
+        count_after, value_after, low_after = _contribution(after)
+        products += count_after - count_before
+        value += value_after - value_before
+        low += low_after - low_before
+    _apply(db, total_products=products, total_stock_value=value, low_stock_items=low)
+
+def apply_order_created(db: Session, status: str, total_amount: float) -> None:
+    _apply(
+        db,
+        total_orders=1,
+        pending_orders=1 if status == models.OrderStatus.PENDING else 0,
+        total_revenue=total_amount if status == models.OrderStatus.COMPLETED else 0.0,
+    )
+
+def compute_stats(connection) -> dict:
+    """Aggregate the dashboard totals straight from the tables; works on a Session or a Connection."""
+    Product, Order = models.Product, models.Order
+    total_products, total_stock_value, low_stock_items = connection.execute(select(
+        func.count(Product.id),
+        func.coalesce(func.sum(Product.price * Product.stock_quantity), 0.0),
+        func.coalesce(func.sum(case((Product.stock_quantity < Product.min_stock_threshold, 1), else_=0)), 0),
+    )).one()
+    total_orders, pending_orders, total_revenue = connection.execute(select(
+        func.count(Order.id),
+        func.coalesce(func.sum(case((Order.status == models.OrderStatus.PENDING, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Order.status == models.OrderStatus.COMPLETED, Order.total_amount), else_=0.0)), 0.0),
+    )).one()
+    return {
+        "total_products": total_products,
+        "total_stock_value": total_stock_value,
+        "low_stock_items": low_stock_items,
+        "total_orders": total_orders,
+        "pending_orders": pending_orders,
+        "total_revenue": total_revenue,
+    }
+
+def rebuild_stats(db: Session) -> models.InventoryStats:
+    values = compute_stats(db)
+    stats = db.get(models.InventoryStats, STATS_ID)
+    if stats is None:
+        stats = models.InventoryStats(id=STATS_ID)
+        db.add(stats)
+    for name, value in values.items():
+        setattr(stats, name, value)
+    db.flush()
+    return stats
+
+def get_stats(db: Session) -> dict:
+    stats = db.get(models.InventoryStats, STATS_ID)
+    if stats is None:
+        # Read-only fallback until `manage.py rebuild-stats` creates the row.
+        return compute_stats(db)
+    return {
+        "total_products": stats.total_products,
+        "total_stock_value": stats.total_stock_value,
+        "low_stock_items": stats.low_stock_items,
+        "total_orders": stats.total_orders,
+        "pending_orders": stats.pending_orders,
+        "total_revenue": stats.total_revenue,
+    }
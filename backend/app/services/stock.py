@@ -0,0 +1,143 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.services import catalog
+from app.services import stats as stats_service
+from app.services import versions
+
+# Stock levels are only ever changed with a conditional UPDATE evaluated by the
+# database (`stock_quantity = stock_quantity + :delta WHERE stock_quantity + :delta >= 0`),
+# so concurrent requests can never read the same level and both deduct from it.
+
+def fetch_products(db: Session, product_ids: Iterable[int]) -> Dict[int, models.Product]:
+    product_ids = set(product_ids)
+    if not product_ids:
+        return {}
+    products = db.query(models.Product).filter(models.Product.id.in_(product_ids)).all()
+    return {product.id: product for product in products}
+
+def movement_delta(change_type: models.StockMovementType, quantity: int) -> int:
+    if change_type == models.StockMovementType.OUT:
+        return -quantity
+    # IN adds stock; ADJUSTMENT carries a signed delta (negative to subtract).
+    return quantity
+
+def movement_error(change_type: models.StockMovementType) -> str:
+    if change_type == models.StockMovementType.OUT:
+        return "Insufficient stock"
+    return "Resulting stock cannot be negative"
+
+def _apply_delta(db: Session, product_id: int, delta: int) -> Optional[Tuple[int, float]]:
+    Product = models.Product
+    stmt = (
+        update(Product)
+        .where(Product.id == product_id)
+        .values(stock_quantity=Product.stock_quantity + delta)
+        .returning(Product.stock_quantity, Product.price, Product.min_stock_threshold)
+        .execution_options(synchronize_session=False)
+    )
+    if delta < 0:
+        stmt = stmt.where(Product.stock_quantity >= -delta)
+    row = db.execute(stmt).first()
+    if row is None:
+        return None
+    new_stock, price, threshold = row
+    versions.bump(db, versions.PRODUCTS)
+    catalog.invalidate(db, [product_id])
+    stats_service.apply_product_change(
+        db, (price, new_stock - delta, threshold), (price, new_stock, threshold)
+    )
+    return new_stock, price
+
+def apply_delta(db: Session, product_id: int, delta: int) -> Optional[int]:
+    """Atomically add `delta` to a product's stock; returns the new level, or None if it would go negative."""
+    applied = _apply_delta(db, product_id, delta)
+    return applied[0] if applied else None
+
+def reserve(db: Session, quantities: Dict[int, int], products: Mapping[int, object]) -> Dict[int, float]:
+    """Deduct every quantity; raises 400 naming the first product that is short.
+
+    Returns each product's price as read by its UPDATE, which is current even
+    when `products` came from the catalog cache. Earlier deductions are not
+    undone here: the caller must roll back its transaction when this raises.
+    """
+    prices = {}
+    for product_id, quantity in quantities.items():
+        applied = _apply_delta(db, product_id, -quantity)
+        if applied is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Insufficient stock for product: {products[product_id].name}",
+            )
+        prices[product_id] = applied[1]
+    return prices
+
+class StockChanged(Exception):
+    """A product's stock moved between reading it and writing a batch; the batch can be retried."""
+
+def plan_batch(
+    items: List[schemas.StockMovementCreate], products: Dict[int, models.Product]
+) -> Tuple[List[Optional[str]], Dict[int, int]]:
+    """Replay a batch against the loaded stock levels with the single-adjustment rules.
+
+    Returns one error (or None) per item and the resulting stock of each touched product.
+    """
+    levels = {}
+    errors = []
+    for item in items:
+        product = products.get(item.product_id)
+        if product is None:
+            errors.append("Product not found")
+            continue
+        current = levels.get(product.id, product.stock_quantity or 0)
+        new_level = current + movement_delta(item.change_type, item.quantity)
+        if new_level < 0:
+            errors.append(movement_error(item.change_type))
+            continue
+        levels[product.id] = new_level
+        errors.append(None)
+    return errors, levels
+
+def write_batch(
+    db: Session,
+    items: List[schemas.StockMovementCreate],
+    products: Dict[int, models.Product],
+    levels: Dict[int, int],
+) -> List[int]:
+    """Set the planned stock levels and insert the movements; returns the movement ids in order.
+
+    Each product is updated only if its stock still equals what the plan was
+    based on. Raises StockChanged otherwise; the caller must roll back.
+    """
+    table = models.Product.__table__
+    changed = {pid: level for pid, level in levels.items() if level != (products[pid].stock_quantity or 0)}
+    if changed:
+        result = db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.stock_quantity == bindparam("b_seen"))
+            .values(stock_quantity=bindparam("b_new")),
+            [
+                {"b_id": pid, "b_seen": products[pid].stock_quantity or 0, "b_new": level}
+                for pid, level in changed.items()
+            ],
+        )
+        if result.rowcount != len(changed):
+            raise StockChanged()
+        versions.bump(db, versions.PRODUCTS)
+        catalog.invalidate(db, changed)
+        stats_service.apply_product_changes(db, [
+            (stats_service.product_state(products[pid]),
+             (products[pid].price, level, products[pid].min_stock_threshold))
+            for pid, level in changed.items()
+        ])
+
+    movements = models.StockMovement.__table__
+    if not items:
+        return []
+    rows = db.execute(
+        insert(movements).returning(movements.c.id, sort_by_parameter_order=True),
+        [item.model_dump() for item in items],
+    )
+    return [movement_id for (movement_id,) in rows]
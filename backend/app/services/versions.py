@@ -0,0 +1,92 @@
+"""Version counters behind the ETags of the catalog endpoints.
+
+Every resource (products, suppliers, customers) has a counter in
+`resource_versions`. Code that changes a resource calls `bump(db, name)`; the
+counter is incremented once per transaction, right before it commits, so it
+moves together with the data. GET routes send `ETag: "<resource>.<version>"`
+and answer a matching If-None-Match with 304.
+
+The counters are memoized in the process for ETAG_VERSION_TTL_SECONDS, and a
+commit that bumps a counter drops its memo at once, so a revalidation in the
+common case touches neither the database nor Pydantic. A change committed by
+another process is noticed within the TTL.
+"""
+import time
+from typing import Dict, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.database import run_db, upsert_insert
+
+PRODUCTS = "products"
+SUPPLIERS = "suppliers"
+CUSTOMERS = "customers"
+
+_PENDING = "bumped_resources"
+
+# resource -> (version, monotonic expiry)
+_memo: Dict[str, Tuple[int, float]] = {}
+
+def bump(db: Session, *resources: str) -> None:
+    """Mark `resources` as changed by the current transaction."""
+    db.info.setdefault(_PENDING, set()).update(resources)
+
+@event.listens_for(Session, "before_commit")
+def _write_bumps(db: Session):
+    pending = db.info.get(_PENDING)
+    if not pending:
+        return
+    table = models.ResourceVersion.__table__
+    insert = upsert_insert(db.get_bind())
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.resource], set_={"version": table.c.version + 1}
+    )
+    db.execute(stmt, [{"resource": resource, "version": 1} for resource in sorted(pending)])
+
+@event.listens_for(Session, "after_commit")
+def _forget_bumped(db: Session):
+    for resource in db.info.pop(_PENDING, ()):
+        _memo.pop(resource, None)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bumps(db: Session):
+    db.info.pop(_PENDING, None)
+
+def _read_version(db: Session, resource: str) -> int:
+    version = db.execute(
+        select(models.ResourceVersion.version).where(models.ResourceVersion.resource == resource)
+    ).scalar()
+    return version or 0
+
+async def current(db, resource: str) -> int:
+    memo = _memo.get(resource)
+    if memo and memo[1] > time.monotonic():
+        return memo[0]
+    version = await run_db(db, _read_version, resource)
+    _memo[resource] = (version, time.monotonic() + settings.ETAG_VERSION_TTL_SECONDS)
+    return version
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/"x" matches "x".
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+async def conditional(request: Request, response: Response, db, resource: str) -> Optional[Response]:
+    """Set the ETag of `resource` on `response`; returns a 304 to send instead when the client is current.
+
+    Call before reading any data: the version is read first, so a change
+    committed in between can only make the ETag older than the data, never newer.
+    """
+    etag = f'"{resource}.{await current(db, resource)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
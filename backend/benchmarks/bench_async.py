@@ -0,0 +1,146 @@
+"""Requests/sec of the sync and async session layers on the same workload.
+
+Seeds one SQLite database, then serves it with uvicorn twice -- once with a
+plain ``sqlite://`` URI (sync sessions on the threadpool) and once with
+``sqlite+aiosqlite://`` (AsyncSession on the event loop) -- and drives both
+with the same concurrent read/write mix.
+
+    python benchmarks/bench_async.py --concurrency 64 --duration 15
+    SQLITE_PROFILE=production python benchmarks/bench_async.py
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {"sync": "sqlite", "async": "sqlite+aiosqlite"}
+
+SEED = """
+from app.main import app
+from app.core import schema
+from app.database import SessionLocal, engine
+from app.core.security import get_password_hash
+from app import models
+from app.services.stats import rebuild_stats
+
+schema.upgrade(engine)
+db = SessionLocal()
+db.add(models.User(email="bench@example.com", hashed_password=get_password_hash("bench"),
+                   full_name="Bench", role=models.UserRole.ADMIN))
+db.add(models.Customer(name="Bench Customer", email="customer@example.com"))
+db.add_all(models.Product(sku=f"BENCH-{{i}}", name=f"Bench product {{i}}", category=f"cat-{{i % 20}}",
+                          price=10 + i % 50, stock_quantity=1_000_000) for i in range({products}))
+db.commit()
+rebuild_stats(db)
+db.commit()
+"""
+
+def seed(path, products):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}")
+    subprocess.run([sys.executable, "-c", SEED.format(products=products)], cwd=BACKEND_DIR, env=env, check=True)
+
+def copy_database(source_path, target_path):
+    with sqlite3.connect(source_path) as source, sqlite3.connect(target_path) as target:
+        source.backup(target)
+
+def start_server(uri, port, workers, **extra_env):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=uri, **extra_env)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+async def worker(client, headers, products, write_ratio, stop_at, latencies, errors):
+    while time.perf_counter() < stop_at:
+        roll = random.random()
+        if roll < write_ratio:
+            request = client.post("/api/v1/orders/", headers=headers, json={
+                "customer_id": 1,
+                "items": [{"product_id": random.randint(1, products), "quantity": 1}],
+            })
+        elif roll < 0.5:
+            request = client.get("/api/v1/products/", headers=headers, params={"limit": 50})
+        elif roll < 0.8:
+            request = client.get("/api/v1/inventory/movements", headers=headers, params={"limit": 50})
+        else:
+            request = client.get("/api/v1/reports/dashboard", headers=headers)
+        started = time.perf_counter()
+        response = await request
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+async def drive(port, products, concurrency, duration, write_ratio):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        token = (await client.post(
+            "/api/v1/auth/login", data={"username": "bench@example.com", "password": "bench"}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        # Warm-up: connections, caches and the auth user.
+        await client.get("/api/v1/products/", headers=headers)
+        latencies, errors = [], []
+        stop_at = time.perf_counter() + duration
+        await asyncio.gather(*(
+            worker(client, headers, products, write_ratio, stop_at, latencies, errors)
+            for _ in range(concurrency)
+        ))
+    return latencies, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of requests that create an order")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="inventory-bench-")
+    template = os.path.join(tmp, "seed.db")
+    seed(template, args.products)
+    try:
+        print(f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for mode, driver in MODES.items():
+            # Each mode starts from an identical copy of the seeded database
+            # (through the backup API, which also picks up pages still in a WAL).
+            path = os.path.join(tmp, f"{mode}.db")
+            copy_database(template, path)
+            server = start_server(f"{driver}:///{path}", args.port, args.workers)
+            try:
+                latencies, errors = asyncio.run(
+                    drive(args.port, args.products, args.concurrency, args.duration, args.write_ratio)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+            print(f"{mode:<6} {len(latencies) / args.duration:>8.1f} "
+                  f"{statistics.median(latencies) * 1000:>8.1f} {p99 * 1000:>8.1f} {len(errors):>7}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Sustained stock adjustments/sec with and without group commit.
+
+Seeds one SQLite database and serves copies of it with uvicorn, once with
+GROUP_COMMIT_ENABLED=false (one commit per request) and once with it on,
+while many clients post single-unit adjustments spread over the catalog.
+
+With --pipeline it skips HTTP and drives the storage path in-process from
+--concurrency threads: one transaction per adjustment against the writer
+thread. This isolates what group commit changes when the request handling
+itself, not the commit, is what saturates the CPU.
+
+    python benchmarks/bench_group_commit.py --concurrency 64 --duration 15
+    python benchmarks/bench_group_commit.py --pipeline
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench_async import BACKEND_DIR, copy_database, seed, start_server
+
+PIPELINE = """
+import threading, time
+from app.main import app
+from app import schemas
+from app.database import SessionLocal
+from app.routers.inventory import _create_stock_movement
+from app.services import group_commit
+from app.services.idempotency import Idempotency
+
+def movement(i):
+    return schemas.StockMovementCreate(product_id=i % {products} + 1, change_type="in", quantity=1)
+
+def run(apply_one):
+    def worker(first):
+        for i in range(first, {count}, {threads}):
+            apply_one(movement(i))
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range({threads})]
+    started = time.perf_counter()
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    return {count} / (time.perf_counter() - started)
+
+def alone(m):
+    db = SessionLocal()
+    try:
+        group_commit._commit_alone(db, Idempotency(1, None, "", m), _create_stock_movement, m)
+    finally:
+        db.close()
+
+print(f"{{'false':<13}} {{run(alone):>9.1f}}")
+writer = group_commit.GroupCommitWriter(group_commit._writer_sessions(), 256, 0.002)
+writer.start()
+rate = run(lambda m: writer.submit(lambda db: _create_stock_movement(db, m)).result())
+writer.stop()
+print(f"{{'true':<13}} {{rate:>9.1f}}   average batch {{writer.jobs / writer.batches:.1f}}")
+"""
+
+def pipeline(path, products, threads, count):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}")
+    code = PIPELINE.format(products=products, threads=threads, count=count)
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True)
+
+async def drive(port, products, concurrency, duration):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        token = (await client.post(
+            "/api/v1/auth/login", data={"username": "bench@example.com", "password": "bench"}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        counts = {"ok": 0, "failed": 0}
+        stop_at = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < stop_at:
+                change_type = random.choice(["in", "out"])
+                response = await client.post("/api/v1/inventory/adjust", headers=headers, json={
+                    "product_id": random.randint(1, products), "change_type": change_type, "quantity": 1,
+                })
+                counts["ok" if response.status_code == 200 else "failed"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--pipeline", action="store_true", help="measure the storage path in-process, without HTTP")
+    parser.add_argument("--count", type=int, default=3000, help="adjustments per run with --pipeline")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="inventory-bench-")
+    template = os.path.join(tmp, "seed.db")
+    seed(template, args.products)
+    try:
+        if args.pipeline:
+            print(f"{'group commit':<13} {'adjust/s':>9}")
+            pipeline(template, args.products, args.concurrency, args.count)
+            return
+        print(f"{'group commit':<13} {'adjust/s':>9} {'failed':>7}")
+        for enabled in ("false", "true"):
+            path = os.path.join(tmp, f"group-{enabled}.db")
+            copy_database(template, path)
+            server = start_server(f"sqlite:///{path}", args.port, 1, GROUP_COMMIT_ENABLED=enabled)
+            try:
+                counts = asyncio.run(drive(args.port, args.products, args.concurrency, args.duration))
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{enabled:<13} {counts['ok'] / args.duration:>9.1f} {counts['failed']:>7}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Per-row cost of the product and order list responses, schema path vs fast path.
+
+Seeds a SQLite database, then in one process measures for each list:
+
+* encode: turning an already loaded page into JSON bytes -- ORM objects
+  validated by the response model and dumped the way FastAPI does it, against
+  the projected dicts of app/services/listings.py encoded with orjson;
+* request: the whole GET through the app (query, build, encode), with
+  FAST_LIST_RESPONSES off and on.
+
+    python benchmarks/bench_serialization.py --rows 1000 --repeat 20
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from bench_async import BACKEND_DIR, seed
+
+MEASURE = """
+import json, time
+from typing import List
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from app.main import app
+from app import models, schemas
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.security import create_access_token
+from app.database import SessionLocal, engine
+from app.routers.orders import _read_orders
+from app.routers.products import _read_products
+from app.services import listings
+
+ROWS, REPEAT = {rows}, {repeat}
+
+with engine.begin() as connection:
+    # Orders of three lines each, spread over the catalog
+    connection.execute(models.Order.__table__.insert(), [
+        {{"customer_id": 1, "user_id": 1, "total_amount": 30.0, "status": "completed"}} for _ in range(ROWS)
+    ])
+    connection.execute(models.OrderItem.__table__.insert(), [
+        {{"order_id": order_id, "product_id": (order_id * 7 + line) % {products} + 1, "quantity": 1, "price_at_time": 10.0}}
+        for order_id in range(1, ROWS + 1) for line in range(3)
+    ])
+
+def best(fn):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def encode_schema(adapter, objects):
+    # What FastAPI does with a response_model: validate, dump in JSON mode, json.dumps.
+    return json.dumps(adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")).encode()
+
+db = SessionLocal()
+client = TestClient(app)
+headers = {{"Authorization": "Bearer " + create_access_token(1)}}
+print(f"{{'list':<10}}{{'stage':<9}}{{'schema us/row':>15}}{{'fast us/row':>13}}{{'speedup':>9}}")
+for name, path, read, page, schema in (
+    ("products", "/api/v1/products/", lambda: _read_products(db, 0, ROWS, None, None, None)[0],
+     lambda: listings.product_page(db, 0, ROWS, None, None, None)[0], schemas.ProductResponse),
+    ("orders", "/api/v1/orders/", lambda: _read_orders(db, 0, ROWS, None)[0],
+     lambda: listings.order_page(db, 0, ROWS, None)[0], schemas.OrderResponse),
+):
+    adapter = TypeAdapter(List[schema])
+    objects, rows = read(), page()
+    assert json.loads(encode_schema(adapter, objects)) == json.loads(FastJSONResponse(rows).body)
+    slow = best(lambda: encode_schema(adapter, objects))
+    fast = best(lambda: FastJSONResponse(rows).body)
+    print(f"{{name:<10}}{{'encode':<9}}{{slow / ROWS * 1e6:>15.1f}}{{fast / ROWS * 1e6:>13.1f}}{{slow / fast:>8.1f}}x")
+
+    timings = {{}}
+    for enabled in (False, True):
+        settings.FAST_LIST_RESPONSES = enabled
+        assert client.get(path, params={{"limit": ROWS}}, headers=headers).status_code == 200
+        timings[enabled] = best(lambda: client.get(path, params={{"limit": ROWS}}, headers=headers))
+    slow, fast = timings[False], timings[True]
+    print(f"{{name:<10}}{{'request':<9}}{{slow / ROWS * 1e6:>15.1f}}{{fast / ROWS * 1e6:>13.1f}}{{slow / fast:>8.1f}}x")
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per page, and orders seeded")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement; the best one counts")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="inventory-bench-")
+    path = os.path.join(tmp, "seed.db")
+    try:
+        seed(path, args.products)
+        env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}")
+        code = MEASURE.format(rows=args.rows, repeat=args.repeat, products=args.products)
+        subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
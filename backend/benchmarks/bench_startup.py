@@ -0,0 +1,88 @@
+"""Cold start time of uvicorn workers against an already migrated database.
+
+Migrates a fresh SQLite database once (as a deploy would), then starts
+uvicorn repeatedly and times each start from spawning the process to the
+first successful response. With one worker the app's own figure, the
+``app_startup_seconds`` gauge from /metrics (import plus startup hooks), is
+shown next to it.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --workers 4 --max-ms 3000   # exit 1 if the median is slower
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench_async import BACKEND_DIR
+
+def migrate(uri):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=uri)
+    subprocess.run([sys.executable, "manage.py", "migrate"], cwd=BACKEND_DIR, env=env, check=True)
+
+def start_once(uri, port, workers):
+    """Seconds until the server answers, and the app's own startup figure (one worker only)."""
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=uri, METRICS_ENABLED="true")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        deadline = started + 60
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with {server.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        else:
+            raise RuntimeError("server did not start")
+        ready = time.perf_counter() - started
+        reported = None
+        if workers == 1:
+            for line in httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=5).text.splitlines():
+                if line.startswith("app_startup_seconds "):
+                    reported = float(line.split()[1])
+        return ready, reported
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--max-ms", type=float, help="fail when the median time to first response exceeds this")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="inventory-bench-")
+    uri = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+    try:
+        migrate(uri)
+        print(f"{'run':>4} {'ready ms':>9} {'app ms':>8}")
+        readies = []
+        for run in range(1, args.runs + 1):
+            ready, reported = start_once(uri, args.port, args.workers)
+            readies.append(ready)
+            app_ms = f"{reported * 1000:>8.0f}" if reported is not None else f"{'-':>8}"
+            print(f"{run:>4} {ready * 1000:>9.0f} {app_ms}")
+        median_ms = statistics.median(readies) * 1000
+        print(f"median {median_ms:.0f} ms, min {min(readies) * 1000:.0f} ms, max {max(readies) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if args.max_ms is not None and median_ms > args.max_ms:
+        sys.exit(f"median startup {median_ms:.0f} ms is over --max-ms {args.max_ms:.0f}")
+
+if __name__ == "__main__":
+    main()
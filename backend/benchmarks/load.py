@@ -0,0 +1,304 @@
+"""End-to-end load test: throughput and latency per endpoint under a traffic mix.
+
+Builds a dataset with generate_data.py (or copies one given with --database),
+serves it, and runs --users virtual users for --duration seconds. Each user
+logs in as one of the generated staff accounts and then picks its next
+request from the weighted --mix of scenarios:
+
+    login       POST /auth/login
+    browse      GET  /products (a page, sometimes filtered by category)
+    search      GET  /products?search=... and /products/suggest
+    order       POST /orders (1-3 lines, popular products picked more often)
+    adjust      POST /inventory/adjust (a restock)
+    dashboard   GET  /reports/dashboard
+
+The app runs either as a local uvicorn with --workers processes, or
+in-process (--server inprocess) through httpx's ASGI transport, which leaves
+out the network and process boundaries. Reports requests/sec and
+p50/p95/p99 per endpoint; --output writes the numbers, the options and the
+git commit as JSON, and --compare prints the change against such a file.
+
+    python benchmarks/load.py --users 50 --duration 30 --workers 4 --output results/$(git rev-parse --short HEAD).json
+    python benchmarks/load.py --mix browse=50,dashboard=50 --compare results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+
+from bench_async import BACKEND_DIR, copy_database, start_server
+
+API = "/api/v1"
+DEFAULT_MIX = "login=1,browse=35,search=15,order=10,adjust=10,dashboard=29"
+STAFF_PASSWORD = "staff123"
+# Popularity of the products the users order and restock, as in the generated demand
+HOT_SHARE, HOT_PRODUCTS = 0.8, 0.05
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(ordered, fraction):
+    # Nearest rank on an already sorted list
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+class Catalog:
+    """Ids, staff logins and search terms of the dataset, read once from the database file."""
+
+    def __init__(self, path):
+        with sqlite3.connect(path) as connection:
+            self.products = [row[0] for row in connection.execute("SELECT id FROM products ORDER BY id")]
+            self.customers = [row[0] for row in connection.execute("SELECT id FROM customers ORDER BY id")]
+            self.staff = [row[0] for row in connection.execute(
+                "SELECT email FROM users WHERE email LIKE 'loadstaff%' ORDER BY id"
+            )]
+            self.categories = [row[0] for row in connection.execute(
+                "SELECT DISTINCT category FROM products WHERE category IS NOT NULL"
+            )]
+            names = [row[0] for row in connection.execute("SELECT name FROM products ORDER BY id LIMIT 1000")]
+        if not (self.products and self.customers and self.staff):
+            raise SystemExit("the database has no generated products, customers or staff; build it with generate_data.py")
+        hot = max(1, int(len(self.products) * HOT_PRODUCTS))
+        self.hot = random.Random(0).sample(self.products, hot)
+        self.words = sorted({word for name in names for word in name.split() if word.isalpha() and len(word) > 2})
+
+    def product(self, rng):
+        return rng.choice(self.hot) if rng.random() < HOT_SHARE else rng.choice(self.products)
+
+class VirtualUser:
+    def __init__(self, number, client, catalog, record, seed):
+        self.client = client
+        self.catalog = catalog
+        self.record = record
+        self.rng = random.Random(seed * 10007 + number)
+        self.email = catalog.staff[number % len(catalog.staff)]
+        self.headers = {}
+
+    async def call(self, label, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, API + path, headers=self.headers, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        self.record(label, time.perf_counter() - started, status)
+        return response
+
+    async def login(self):
+        response = await self.call("POST /auth/login", "POST", "/auth/login",
+                                   data={"username": self.email, "password": STAFF_PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def browse(self):
+        params = {"limit": 50, "skip": self.rng.randrange(0, 500, 50)}
+        if self.catalog.categories and self.rng.random() < 0.3:
+            params = {"limit": 50, "category": self.rng.choice(self.catalog.categories)}
+        await self.call("GET /products", "GET", "/products/", params=params)
+
+    async def search(self):
+        if self.rng.random() < 0.5:
+            term = " ".join(self.rng.sample(self.catalog.words, 2))
+            await self.call("GET /products?search", "GET", "/products/", params={"search": term, "limit": 20})
+        else:
+            prefix = self.rng.choice(self.catalog.words)[:3]
+            await self.call("GET /products/suggest", "GET", "/products/suggest", params={"q": prefix})
+
+    async def order(self):
+        products = {self.catalog.product(self.rng) for _ in range(self.rng.randint(1, 3))}
+        await self.call("POST /orders", "POST", "/orders/", json={
+            "customer_id": self.rng.choice(self.catalog.customers),
+            "items": [{"product_id": product_id, "quantity": 1} for product_id in products],
+        })
+
+    async def adjust(self):
+        await self.call("POST /inventory/adjust", "POST", "/inventory/adjust", json={
+            "product_id": self.catalog.product(self.rng), "change_type": "in",
+            "quantity": self.rng.randint(1, 20), "notes": "load test restock",
+        })
+
+    async def dashboard(self):
+        await self.call("GET /reports/dashboard", "GET", "/reports/dashboard")
+
+    async def run(self, mix, stop_at, think):
+        await self.login()
+        names, weights = list(mix), list(mix.values())
+        while time.perf_counter() < stop_at:
+            await getattr(self, self.rng.choices(names, weights)[0])()
+            if think:
+                await asyncio.sleep(self.rng.expovariate(1 / think))
+
+SCENARIOS = ("login", "browse", "search", "order", "adjust", "dashboard")
+
+async def drive(client, catalog, args, mix):
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    measuring = False
+
+    def record(label, seconds, status):
+        if not measuring:
+            return
+        samples[label].append(seconds)
+        if not 200 <= status < 400:
+            errors[label] += 1
+
+    started = time.perf_counter()
+    stop_at = started + args.warmup + args.duration
+    users = [VirtualUser(number, client, catalog, record, args.seed) for number in range(args.users)]
+    tasks = [asyncio.create_task(user.run(mix, stop_at, args.think_ms / 1000)) for user in users]
+    await asyncio.sleep(args.warmup)
+    measuring = True
+    measured_from = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - measured_from
+    return summarize(samples, errors, elapsed)
+
+def summarize(samples, errors, elapsed):
+    endpoints = {}
+    for label, latencies in sorted(samples.items()):
+        latencies.sort()
+        endpoints[label] = {
+            "requests": len(latencies),
+            "errors": errors[label],
+            "rps": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+    every = sorted(latency for latencies in samples.values() for latency in latencies)
+    total = {
+        "requests": len(every),
+        "errors": sum(errors.values()),
+        "rps": len(every) / elapsed,
+        "p50_ms": percentile(every, 0.50) * 1000,
+        "p95_ms": percentile(every, 0.95) * 1000,
+        "p99_ms": percentile(every, 0.99) * 1000,
+    }
+    return {"seconds": elapsed, "endpoints": endpoints, "total": total}
+
+async def run_inprocess(path, catalog, args, mix):
+    # The app reads its settings at import; point it at the copy first.
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"{args.driver}:///{path}"
+    sys.path.insert(0, BACKEND_DIR)
+    from app.main import app
+    limits = httpx.Limits(max_connections=args.users)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", limits=limits, timeout=120) as client:
+            return await drive(client, catalog, args, mix)
+
+async def run_uvicorn(catalog, args, mix):
+    limits = httpx.Limits(max_connections=args.users)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=120) as client:
+        return await drive(client, catalog, args, mix)
+
+def build_database(path, args):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}")
+    subprocess.run([
+        sys.executable, "generate_data.py", "--products", str(args.products), "--customers", str(args.customers),
+        "--orders", str(args.orders), "--movements", str(args.movements), "--seed", str(args.seed),
+    ], cwd=BACKEND_DIR, env=env, check=True)
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+def print_report(result, baseline=None):
+    print(f"{'endpoint':<26}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    rows = list(result["endpoints"].items()) + [("all", result["total"])]
+    for label, numbers in rows:
+        line = (f"{label:<26}{numbers['requests']:>9}{numbers['rps']:>9.1f}{numbers['p50_ms']:>9.1f}"
+                f"{numbers['p95_ms']:>9.1f}{numbers['p99_ms']:>9.1f}{numbers['errors']:>8}")
+        before = baseline and (baseline["total"] if label == "all" else baseline["endpoints"].get(label))
+        if before and before["rps"] and before["p95_ms"]:
+            line += (f"   req/s {(numbers['rps'] / before['rps'] - 1) * 100:+.1f}%"
+                     f"  p95 {(numbers['p95_ms'] / before['p95_ms'] - 1) * 100:+.1f}%")
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("uvicorn", "inprocess"), default="uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--driver", choices=("sqlite", "sqlite+aiosqlite"), default="sqlite", help="session layer to serve with")
+    parser.add_argument("--users", type=int, default=32, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds run before measuring")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1, help="seeds the dataset and the users' choices")
+    parser.add_argument("--database", help="an existing generate_data.py database to copy instead of building one")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--movements", type=int, default=500_000)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    # Under load every write queues; keep the slow-request log from burying the report.
+    os.environ.setdefault("SLOW_REQUEST_MS", "60000")
+    tmp = tempfile.mkdtemp(prefix="inventory-load-")
+    path = os.path.join(tmp, "load.db")
+    try:
+        if args.database:
+            copy_database(args.database, path)
+        else:
+            build_database(path, args)
+        catalog = Catalog(path)
+        if args.server == "inprocess":
+            result = asyncio.run(run_inprocess(path, catalog, args, args.mix))
+        else:
+            server = start_server(f"{args.driver}:///{path}", args.port, args.workers)
+            try:
+                result = asyncio.run(run_uvicorn(catalog, args, args.mix))
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)["result"]
+    print_report(result, baseline)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        options = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+        with open(args.output, "w") as handle:
+            json.dump({
+                "commit": git_commit(),
+                "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "options": options,
+                "result": result,
+            }, handle, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Deterministic synthetic data at production volumes, for load and performance tests.
+
+Appends suppliers, products, customers, orders with their items and stock
+movements to the configured database. The same options (and the same
+starting ids) always give the same rows. Demand is skewed the way real
+catalogs are: product and customer popularity follow a Zipf law, so a few
+hot SKUs take most of the order lines, and timestamps spread over `--days`
+days before `--end`, weighted towards business hours.
+
+Every completed order line has its OUT movement; the rest of `--movements`
+are restocks and adjustments. Each product's current stock is set so its
+history never goes below zero. The dashboard stats and sales rollups are
+rebuilt at the end.
+
+Columns are generated with numpy and written with executemany in batches of
+`--batch-size` rows, all in one transaction; on SQLite the indexes of the big
+tables are dropped during the load and built once at the end:
+
+    python generate_data.py --products 200000 --customers 100000 --orders 2000000 --movements 10000000
+
+`seed_data.py` remains the small hand-written demo dataset.
+"""
+import argparse
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app import models
+from app.core import schema
+from app.core.security import get_password_hash
+from app.database import SessionLocal, engine
+from app.services import catalog
+from app.services import sales as sales_service
+from app.services import versions
+from app.services.stats import rebuild_stats
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50_000
+# On SQLite the secondary indexes of these tables are dropped for the load and
+# built again once at the end, which beats updating them row by row.
+BULK_TABLES = ("products", "orders", "order_items", "stock_movements")
+
+CATEGORIES = [
+    "Electronics", "Accessories", "Office Supplies", "Networking", "Furniture", "Storage",
+    "Printing", "Audio", "Cables", "Lighting", "Cleaning", "Safety",
+]
+BRANDS = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay", "Soylent", "Cyberdyne"]
+ITEMS = [
+    "Laptop", "Monitor", "Keyboard", "Mouse", "Headset", "Router", "Switch", "Chair", "Desk", "Cabinet",
+    "Printer", "Toner", "Paper", "Cable", "Adapter", "Lamp", "Speaker", "Webcam", "Drive", "Charger",
+]
+VARIANTS = ["Pro", "Lite", "Max", "Mini", "V2", "Black", "White", "XL", "Plus", "Basic"]
+
+# Share of orders per status, and of the extra movements that are restocks (the rest are adjustments)
+STATUSES = (
+    (models.OrderStatus.COMPLETED.value, 0.85),
+    (models.OrderStatus.PENDING.value, 0.10),
+    (models.OrderStatus.CANCELLED.value, 0.05),
+)
+RESTOCK_SHARE = 0.8
+# change_type and note of the generated movements, by type code
+MOVEMENT_TYPES = (
+    (models.StockMovementType.OUT.value, None),
+    (models.StockMovementType.IN.value, "Restock"),
+    (models.StockMovementType.ADJUSTMENT.value, "Stock count"),
+)
+# Relative activity per hour of the day (UTC)
+HOUR_WEIGHTS = np.array([1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 14, 13, 12, 13, 14, 14, 12, 9, 6, 4, 3, 2, 1, 1], dtype=float)
+HOUR_WEIGHTS /= HOUR_WEIGHTS.sum()
+
+def _next_id(db: Session, model) -> int:
+    return (db.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _zipf(rng, n: int, exponent: float):
+    """Sampler of indexes 0..n-1 with Zipf popularity.
+
+    Ranks are shuffled, so the hot items are spread over the id range instead
+    of being the first ones.
+    """
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    cdf = np.cumsum(weights[rng.permutation(n)])
+    cdf /= cdf[-1]
+    return lambda size: np.minimum(np.searchsorted(cdf, rng.random(size), side="right"), n - 1)
+
+def _times(rng, size: int, start: np.datetime64, days: int) -> np.ndarray:
+    seconds = (
+        rng.integers(0, days, size) * 86400
+        + rng.choice(24, size, p=HOUR_WEIGHTS) * 3600
+        + rng.integers(0, 3600, size)
+    )
+    return start + seconds.astype("timedelta64[s]")
+
+def _values(column, start: int, stop: int) -> list:
+    if callable(column):
+        # Built batch by batch, to keep millions of strings out of memory
+        return column(start, stop)
+    part = column[start:stop]
+    if isinstance(part, np.ndarray) and part.dtype.kind == "M":
+        # The text form SQLite timestamps have ("YYYY-MM-DD HH:MM:SS")
+        return [moment.replace("T", " ") for moment in np.datetime_as_string(part, unit="s").tolist()]
+    return part.tolist() if isinstance(part, np.ndarray) else list(part)
+
+def _write(db: Session, table, columns: Dict[str, object], batch_size: int) -> int:
+    """Insert the rows given column by column, `batch_size` rows per executemany."""
+    names = list(columns)
+    total = len(columns["id"])
+    connection = db.connection()
+    sql = f"INSERT INTO {table.name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+    for start in range(0, total, batch_size):
+        stop = min(start + batch_size, total)
+        rows = list(zip(*(_values(columns[name], start, stop) for name in names)))
+        if connection.dialect.name == "sqlite":
+            # Straight to the driver: no per-row parameter processing
+            connection.exec_driver_sql(sql, rows)
+        else:
+            connection.execute(table.insert(), [dict(zip(names, row)) for row in rows])
+    return total
+
+def _drop_indexes(db: Session) -> List[str]:
+    """Drop the explicit indexes of BULK_TABLES (SQLite only); returns the DDL that recreates them."""
+    connection = db.connection()
+    if connection.dialect.name != "sqlite":
+        return []
+    indexes = connection.exec_driver_sql(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        f"AND tbl_name IN ({', '.join('?' * len(BULK_TABLES))})",
+        BULK_TABLES,
+    ).all()
+    for name, _ in indexes:
+        connection.exec_driver_sql(f'DROP INDEX "{name}"')
+    return [ddl for _, ddl in indexes]
+
+def _staff(db: Session, count: int) -> np.ndarray:
+    hashed = get_password_hash("staff123")
+    ids = []
+    for number in range(count):
+        email = f"loadstaff{number}@example.com"
+        user = db.query(models.User).filter(models.User.email == email).first()
+        if user is None:
+            user = models.User(email=email, hashed_password=hashed, full_name=f"Load Staff {number}", role=models.UserRole.STAFF)
+            db.add(user)
+            db.flush()
+        ids.append(user.id)
+    return np.array(ids)
+
+def _pick(rng, words, size: int) -> np.ndarray:
+    return np.array(words, dtype=object)[rng.integers(0, len(words), size)]
+
+def generate(
+    db: Session,
+    suppliers: int = 50,
+    products: int = 10_000,
+    customers: int = 5_000,
+    orders: int = 50_000,
+    movements: int = 200_000,
+    items_per_order: float = 2.5,
+    days: int = 365,
+    end: Optional[date] = None,
+    zipf: float = 1.1,
+    staff: int = 5,
+    seed: int = 0,
+    batch_size: int = BATCH_SIZE,
+    rollups: bool = True,
+) -> dict:
+    """Append a generated dataset through `db` without committing; returns the row counts and first ids."""
+    rng = np.random.default_rng(seed)
+    end = end or datetime.utcnow().date()
+    start = np.datetime64(end - timedelta(days=days), "s")
+    first = {
+        name: _next_id(db, model) for name, model in (
+            ("supplier", models.Supplier), ("product", models.Product), ("customer", models.Customer),
+            ("order", models.Order), ("order_item", models.OrderItem), ("movement", models.StockMovement),
+        )
+    }
+    user_ids = _staff(db, staff)
+
+    supplier_ids = first["supplier"] + np.arange(suppliers)
+    _write(db, models.Supplier.__table__, {
+        "id": supplier_ids,
+        "name": [f"{brand} Supply {number}" for brand, number in zip(_pick(rng, BRANDS, suppliers), supplier_ids.tolist())],
+        "email": [f"supplier{number}@example.com" for number in supplier_ids.tolist()],
+        "phone": [f"555-{number % 10000:04d}" for number in supplier_ids.tolist()],
+    }, batch_size)
+
+    customer_ids = first["customer"] + np.arange(customers)
+    _write(db, models.Customer.__table__, {
+        "id": customer_ids,
+        "name": [f"Customer {number}" for number in customer_ids.tolist()],
+        "email": [f"customer{number}@example.com" for number in customer_ids.tolist()],
+        "address": [f"{number} Market Street" for number in customer_ids.tolist()],
+    }, batch_size)
+
+    # Products: the columns except stock, which depends on the movements below
+    product_ids = first["product"] + np.arange(products)
+    categories = _pick(rng, CATEGORIES, products)
+    prices = np.round(np.exp(rng.normal(3.5, 1.2, products)).clip(0.5, 5000), 2)
+    product_supplier = supplier_ids[_zipf(rng, suppliers, 0.8)(products)]
+    names = [
+        f"{brand} {item} {variant} {number}" for brand, item, variant, number in
+        zip(_pick(rng, BRANDS, products), _pick(rng, ITEMS, products), _pick(rng, VARIANTS, products), product_ids.tolist())
+    ]
+    hot_product = _zipf(rng, products, zipf)
+
+    # Orders, in time order so ids grow with created_at
+    order_ids = first["order"] + np.arange(orders)
+    order_times = np.sort(_times(rng, orders, start, days))
+    order_customer = customer_ids[_zipf(rng, customers, 0.8)(orders)]
+    status_names = np.array([name for name, _ in STATUSES], dtype=object)
+    order_status = status_names[rng.choice(len(STATUSES), orders, p=[share for _, share in STATUSES])]
+
+    lines = np.minimum(1 + rng.poisson(items_per_order - 1, orders), 20)
+    item_order = np.repeat(np.arange(orders), lines)
+    item_product = hot_product(len(item_order))
+    item_quantity = np.minimum(rng.geometric(0.5, len(item_order)), 50)
+    item_price = prices[item_product]
+    order_total = np.round(np.bincount(item_order, weights=item_quantity * item_price, minlength=orders), 2)
+
+    # Movements: an OUT per completed order line, then restocks and adjustments.
+    # Types are indexes into MOVEMENT_TYPES; OUT rows note their order.
+    sold = order_status[item_order] == models.OrderStatus.COMPLETED.value
+    extra = max(movements - int(sold.sum()), 0)
+    restocks = rng.random(extra) < RESTOCK_SHARE
+    adjustment = rng.integers(1, 6, extra) * rng.choice((-1, 1), extra)
+    move_product = np.concatenate([item_product[sold], hot_product(extra)])
+    move_type = np.concatenate([np.zeros(sold.sum(), dtype=np.int8), np.where(restocks, 1, 2).astype(np.int8)])
+    move_quantity = np.concatenate([item_quantity[sold], np.where(restocks, rng.integers(10, 200, extra), adjustment)])
+    move_time = np.concatenate([order_times[item_order[sold]], _times(rng, extra, start, days)])
+    move_order = np.concatenate([order_ids[item_order[sold]], np.zeros(extra, dtype=np.int64)])
+    by_time = np.argsort(move_time, kind="stable")
+    move_product, move_type, move_quantity, move_time, move_order = (
+        column[by_time] for column in (move_product, move_type, move_quantity, move_time, move_order)
+    )
+
+    # Opening stock high enough that no product's running balance goes negative
+    delta = np.where(move_type == 0, -move_quantity, move_quantity)
+    by_product = np.lexsort((move_time, move_product))
+    counts = np.bincount(move_product, minlength=products)
+    running = np.cumsum(delta[by_product])
+    group_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    moved = counts > 0
+    lowest = np.zeros(products, dtype=np.int64)
+    if len(running):
+        offsets = np.repeat(running[group_start[moved]] - delta[by_product][group_start[moved]], counts[moved])
+        lowest[moved] = np.minimum.reduceat(running - offsets, group_start[moved])
+    opening = np.maximum(-lowest, 0) + rng.integers(0, 50, products)
+    stock = opening + np.bincount(move_product, weights=delta, minlength=products).astype(np.int64)
+
+    recreate = _drop_indexes(db)
+    _write(db, models.Product.__table__, {
+        "id": product_ids,
+        "sku": [f"{category[:3].upper()}-{number:08d}" for category, number in zip(categories.tolist(), product_ids.tolist())],
+        "name": names,
+        "category": categories,
+        "price": prices,
+        "stock_quantity": stock,
+        "min_stock_threshold": rng.integers(5, 25, products),
+        "supplier_id": product_supplier,
+    }, batch_size)
+    _write(db, models.Order.__table__, {
+        "id": order_ids,
+        "customer_id": order_customer,
+        "user_id": user_ids[rng.integers(0, len(user_ids), orders)],
+        "total_amount": order_total,
+        "status": order_status,
+        "created_at": order_times,
+    }, batch_size)
+    _write(db, models.OrderItem.__table__, {
+        "id": first["order_item"] + np.arange(len(item_order)),
+        "order_id": order_ids[item_order],
+        "product_id": product_ids[item_product],
+        "quantity": item_quantity,
+        "price_at_time": item_price,
+    }, batch_size)
+    _write(db, models.StockMovement.__table__, {
+        "id": first["movement"] + np.arange(len(move_product)),
+        "product_id": product_ids[move_product],
+        "change_type": lambda start, stop: [MOVEMENT_TYPES[code][0] for code in move_type[start:stop].tolist()],
+        "quantity": move_quantity,
+        "notes": lambda start, stop: [
+            f"Order #{order}" if order else MOVEMENT_TYPES[code][1]
+            for code, order in zip(move_type[start:stop].tolist(), move_order[start:stop].tolist())
+        ],
+        "created_at": move_time,
+    }, batch_size)
+
+    for ddl in recreate:
+        db.connection().exec_driver_sql(ddl)
+
+    # Rows were written around the services, so bring the derived tables in line.
+    versions.bump(db, "products", "suppliers", "customers")
+    catalog.invalidate_all(db)
+    rebuild_stats(db)
+    if rollups:
+        sales_service.rebuild(db)
+    return {
+        "first_ids": first,
+        "suppliers": suppliers, "products": products, "customers": customers,
+        "orders": orders, "order_items": len(item_order), "movements": len(move_product),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suppliers", type=int, default=50)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--customers", type=int, default=5_000)
+    parser.add_argument("--orders", type=int, default=50_000)
+    parser.add_argument("--movements", type=int, default=200_000,
+                        help="total stock movements; at least one per completed order line")
+    parser.add_argument("--items-per-order", type=float, default=2.5, help="mean order lines per order")
+    parser.add_argument("--days", type=int, default=365, help="history length")
+    parser.add_argument("--end", type=date.fromisoformat, help="day the history ends (YYYY-MM-DD, default today)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="exponent of the product popularity law")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--skip-rollups", action="store_true",
+                        help="leave the sales rollups for a later `manage.py rebuild-sales-rollups`")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    schema.upgrade(engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        written = generate(
+            db, suppliers=args.suppliers, products=args.products, customers=args.customers,
+            orders=args.orders, movements=args.movements, items_per_order=args.items_per_order,
+            days=args.days, end=args.end, zipf=args.zipf, seed=args.seed, batch_size=args.batch_size, rollups=not args.skip_rollups,
+        )
+        db.commit()
+        logger.info(
+            "Generated %s products, %s customers, %s orders (%s lines) and %s movements in %.1fs",
+            written["products"], written["customers"], written["orders"], written["order_items"],
+            written["movements"], time.perf_counter() - started,
+        )
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
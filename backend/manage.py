@@ -0,0 +1,122 @@
+import argparse
+import contextlib
+import json
+import logging
+import sys
+from datetime import date, datetime, timedelta
+from app.core import schema
+from app.core.config import settings
+from app.database import SessionLocal, engine
+from app.services import idempotency, reorder, snapshots
+from app.services import sales as sales_service
+from app.services import stats as stats_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def rebuild_stats(args):
+    db = SessionLocal()
+    try:
+        stats = stats_service.rebuild_stats(db)
+        db.commit()
+        logger.info(
+            "Dashboard stats rebuilt: %s products, %s orders",
+            stats.total_products, stats.total_orders,
+        )
+    finally:
+        db.close()
+
+def rebuild_sales_rollups(args):
+    db = SessionLocal()
+    try:
+        written = sales_service.rebuild(db)
+        db.commit()
+        logger.info("Sales rollups rebuilt: %s rows", written)
+    finally:
+        db.close()
+
+def reorder_suggestions(args):
+    db = SessionLocal()
+    try:
+        suggestions = reorder.compute(
+            db, args.lookback_days, args.lead_time_days, args.review_days, settings.REORDER_SERVICE_LEVEL_Z
+        )
+    finally:
+        db.close()
+    with open(args.output, "w") if args.output else contextlib.nullcontext(sys.stdout) as out:
+        json.dump(suggestions, out, indent=2)
+    logger.info(
+        "%s products to reorder from %s suppliers",
+        sum(len(order["items"]) for order in suggestions), len(suggestions),
+    )
+
+def purge_idempotency_keys(args):
+    db = SessionLocal()
+    try:
+        removed = idempotency.purge_expired(db)
+        db.commit()
+        logger.info("Removed %s expired idempotency keys", removed)
+    finally:
+        db.close()
+
+def _take_snapshots(days):
+    db = SessionLocal()
+    try:
+        written = snapshots.take_snapshots(db, days)
+        db.commit()
+        logger.info("Stored %s stock snapshot rows for %s day(s)", written, len(days))
+    finally:
+        db.close()
+
+def take_stock_snapshots(args):
+    _take_snapshots([args.as_of or datetime.utcnow().date()])
+
+def backfill_stock_snapshots(args):
+    today = datetime.utcnow().date()
+    _take_snapshots([args.since + timedelta(days=n) for n in range((today - args.since).days + 1)])
+
+def migrate(args):
+    before, after = schema.upgrade(engine)
+    if before == after:
+        logger.info("Database schema already at %s", after)
+    else:
+        logger.info("Migrated database schema from %s to %s", before or "nothing", after)
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory System maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upgrade = subparsers.add_parser("migrate", help="Bring the database schema to the latest migration (run before starting workers)")
+    upgrade.set_defaults(func=migrate)
+
+    rebuild = subparsers.add_parser("rebuild-stats", help="Recompute the dashboard aggregates from the tables")
+    rebuild.set_defaults(func=rebuild_stats)
+
+    rollups = subparsers.add_parser("rebuild-sales-rollups", help="Recompute the sales report rollups from the orders")
+    rollups.set_defaults(func=rebuild_sales_rollups)
+
+    suggest = subparsers.add_parser("reorder-suggestions", help="Write suggested purchase orders per supplier as JSON")
+    suggest.add_argument("--output", help="File to write (default: stdout)")
+    suggest.add_argument("--lookback-days", type=int, default=settings.REORDER_LOOKBACK_DAYS)
+    suggest.add_argument("--lead-time-days", type=int, default=settings.REORDER_LEAD_TIME_DAYS)
+    suggest.add_argument("--review-days", type=int, default=settings.REORDER_REVIEW_DAYS)
+    suggest.set_defaults(func=reorder_suggestions)
+
+    purge = subparsers.add_parser("purge-idempotency-keys", help="Delete stored Idempotency-Key responses past their TTL")
+    purge.set_defaults(func=purge_idempotency_keys)
+
+    snapshot = subparsers.add_parser("take-stock-snapshots", help="Store every product's stock at midnight UTC (run daily)")
+    snapshot.add_argument("--as-of", type=date.fromisoformat, help="Day whose opening stock to store (default: today)")
+    snapshot.set_defaults(func=take_stock_snapshots)
+
+    backfill = subparsers.add_parser("backfill-stock-snapshots", help="Store daily stock snapshots from a past day up to today")
+    backfill.add_argument("--since", type=date.fromisoformat, required=True, help="First day, YYYY-MM-DD")
+    backfill.set_defaults(func=backfill_stock_snapshots)
+
+    args = parser.parse_args()
+    if args.func is not migrate:
+        schema.check(engine)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine, Base
+from app.core import schema
+from app.database import SessionLocal, engine
 from app.models import (
     User, UserRole, Supplier, Customer, Product, StockMovement, 
     StockMovementType, Order, OrderItem, OrderStatus
 )
 from app.core.security import get_password_hash
+from app.services import catalog  # noqa: F401 (running workers learn about the new products)
+from app.services.stats import rebuild_stats
 import logging
 import random
 from datetime import datetime, timedelta
@@ -198,10 +201,14 @@ def init_db(db: Session):
         db.add(o)
         
     db.commit()
+
+    # Rows above were written directly, so recompute the dashboard aggregates from scratch.
+    rebuild_stats(db)
+    db.commit()
     logger.info("Seeding Complete!")
 
 def main():
-    Base.metadata.create_all(bind=engine)
+    schema.upgrade(engine)
     db = SessionLocal()
     try:
         init_db(db)
@@ -0,0 +1,144 @@
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Point the app at a throwaway database before anything imports app.core.config.
+# TEST_DB_DRIVER=sqlite+aiosqlite runs the suite against the async session layer.
+_db_dir = tempfile.mkdtemp(prefix="inventory-tests-")
+_driver = os.environ.get("TEST_DB_DRIVER", "sqlite")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"{_driver}:///{os.path.join(_db_dir, 'test.db')}"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core import schema
+from app.database import SessionLocal, async_engine, async_read_engine, engine, read_engine
+from app.core.security import get_password_hash
+from app import models
+import generate_data
+
+# The app no longer creates tables itself; migrate like a deploy would.
+schema.upgrade(engine)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture(scope="session")
+def admin_user():
+    session = SessionLocal()
+    try:
+        user = session.query(models.User).filter(models.User.email == "admin@test.com").first()
+        if not user:
+            user = models.User(
+                email="admin@test.com",
+                hashed_password=get_password_hash("admin123"),
+                full_name="Test Admin",
+                role=models.UserRole.ADMIN,
+            )
+            session.add(user)
+            session.commit()
+        return user.id
+    finally:
+        session.close()
+
+# generate_data datasets for the performance tests; "large" is appended to
+# "small", so tests at that scale run against both.
+SCALES = {
+    "small": dict(suppliers=60, products=300, customers=120, orders=600, movements=3000, seed=1),
+    "large": dict(suppliers=300, products=1500, customers=600, orders=3000, movements=15000, seed=2),
+}
+
+def _generate(scale):
+    session = SessionLocal()
+    try:
+        written = generate_data.generate(session, days=90, **SCALES[scale])
+        session.commit()
+        return written
+    finally:
+        session.close()
+
+@pytest.fixture(scope="session")
+def generated(admin_user):
+    """A small generate_data dataset in the test database, for the performance tests."""
+    return _generate("small")
+
+@pytest.fixture(scope="session")
+def generated_large(generated):
+    return _generate("large")
+
+@pytest.fixture(scope="module", params=sorted(SCALES, reverse=True))
+def seeded(request):
+    """Ids for the URL templates of the performance tests, at each scale in turn."""
+    written = request.getfixturevalue("generated_large" if request.param == "large" else "generated")
+    first = written["first_ids"]
+    return {"product": first["product"], "customer": first["customer"], "order": first["order"]}
+
+def _engines():
+    engines = {engine, read_engine}
+    for async_one in (async_engine, async_read_engine):
+        if async_one is not None:
+            engines.add(async_one.sync_engine)
+    return engines
+
+@contextmanager
+def count_statements():
+    """Collect the SQL every engine runs in the block; BEGIN statements are left out."""
+    statements = []
+    def _record(conn, cursor, statement, *args):
+        if statement.strip().upper() not in ("BEGIN", "BEGIN IMMEDIATE"):
+            statements.append(statement)
+    for target in _engines():
+        event.listen(target, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        for target in _engines():
+            event.remove(target, "before_cursor_execute", _record)
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+@pytest.fixture(scope="session")
+def auth_headers(client, admin_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@test.com", "password": "admin123"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def customer(db):
+    customer = models.Customer(name="Test Customer", email="customer@test.com")
+    db.add(customer)
+    db.flush()
+    customer_id = customer.id
+    db.commit()
+    return customer_id
+
+_sku_numbers = itertools.count(1)
+
+@pytest.fixture
+def make_product(db):
+    def _make(stock_quantity, price=10.0, **kwargs):
+        number = next(_sku_numbers)
+        product = models.Product(
+            sku=kwargs.pop("sku", f"TEST-{number}"),
+            name=kwargs.pop("name", f"Test Product {number}"),
+            price=price,
+            stock_quantity=stock_quantity,
+            **kwargs,
+        )
+        db.add(product)
+        db.flush()
+        product_id = product.id
+        db.commit()
+        return product_id
+    return _make
@@ -0,0 +1,26 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app import models
+from app.database import SessionLocal, engine, run_db
+
+def _count_products(db):
+    return db.query(models.Product).count()
+
+def test_run_db_accepts_sync_and_async_sessions(make_product):
+    make_product(stock_quantity=1)
+    session = SessionLocal()
+    try:
+        expected = asyncio.run(run_db(session, _count_products))
+    finally:
+        session.close()
+    assert expected >= 1
+
+    async def count_async():
+        async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"))
+        try:
+            async with AsyncSession(async_engine) as db:
+                return await run_db(db, _count_products)
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(count_async()) == expected
@@ -0,0 +1,45 @@
+from sqlalchemy import update
+from app import deps, models
+from app.core.security import get_password_hash
+
+def _login(client, email):
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": "secret123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def _make_user(db, email, role=models.UserRole.STAFF):
+    user = models.User(email=email, hashed_password=get_password_hash("secret123"), role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+def test_repeat_requests_hit_the_cache(client, db):
+    _make_user(db, "cached@test.com")
+    headers = _login(client, "cached@test.com")
+    before = deps.user_cache.stats()
+
+    for _ in range(3):
+        assert client.post("/api/v1/auth/test-token", headers=headers).status_code == 200
+
+    after = deps.user_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+
+def test_deactivation_applies_on_next_request(client, db):
+    user = _make_user(db, "leaver@test.com")
+    headers = _login(client, "leaver@test.com")
+    assert client.get("/api/v1/customers/", headers=headers).status_code == 200
+
+    user.is_active = False
+    db.commit()
+
+    assert client.get("/api/v1/customers/", headers=headers).status_code == 400
+
+def test_bulk_role_change_applies_on_next_request(client, db):
+    user = _make_user(db, "promoted@test.com")
+    headers = _login(client, "promoted@test.com")
+    assert client.get("/api/v1/auth/cache-stats", headers=headers).status_code == 400
+
+    db.execute(update(models.User).where(models.User.id == user.id).values(role=models.UserRole.ADMIN))
+    db.commit()
+
+    assert client.get("/api/v1/auth/cache-stats", headers=headers).status_code == 200
@@ -0,0 +1,42 @@
+from app import models
+
+URL = "/api/v1/inventory/adjust/batch"
+
+def test_atomic_batch_applies_nothing_when_one_entry_fails(client, db, auth_headers, make_product):
+    first = make_product(stock_quantity=5)
+    second = make_product(stock_quantity=1)
+    batch = {"items": [
+        {"product_id": first, "change_type": "out", "quantity": 2},
+        {"product_id": second, "change_type": "out", "quantity": 2},
+    ]}
+
+    response = client.post(URL, json=batch, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == [{"index": 1, "product_id": second, "error": "Insufficient stock"}]
+    assert db.get(models.Product, first).stock_quantity == 5
+    assert db.query(models.StockMovement).filter(models.StockMovement.product_id == first).count() == 0
+
+def test_partial_batch_applies_entries_in_order(client, db, auth_headers, make_product):
+    product = make_product(stock_quantity=1)
+    batch = {"mode": "partial", "items": [
+        {"product_id": product, "change_type": "out", "quantity": 3},
+        {"product_id": product, "change_type": "in", "quantity": 10},
+        {"product_id": product, "change_type": "out", "quantity": 3},
+        {"product_id": product, "change_type": "adjustment", "quantity": -9},
+        {"product_id": 987654, "change_type": "in", "quantity": 1},
+    ]}
+
+    response = client.post(URL, json=batch, headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["applied"], body["failed"]) == (2, 3)
+    assert [r["applied"] for r in body["results"]] == [False, True, True, False, False]
+    assert body["results"][3]["error"] == "Resulting stock cannot be negative"
+    assert body["results"][4]["error"] == "Product not found"
+    db.expire_all()
+    assert db.get(models.Product, product).stock_quantity == 8
+    movement_ids = [r["movement_id"] for r in body["results"] if r["applied"]]
+    stored = db.query(models.StockMovement).filter(models.StockMovement.id.in_(movement_ids)).order_by(models.StockMovement.id)
+    assert [(m.change_type, m.quantity) for m in stored] == [("in", 10), ("out", 3)]
@@ -0,0 +1,148 @@
+import os
+import subprocess
+import sys
+import pytest
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database import engine
+from app.services import catalog, versions
+from tests.conftest import count_statements
+
+@pytest.fixture
+def no_poll(monkeypatch):
+    """Keep this process from reading other processes' invalidations until `poll_now()`."""
+    monkeypatch.setattr(catalog, "_next_poll", float("inf"))
+
+def poll_now(monkeypatch):
+    monkeypatch.setattr(catalog, "_next_poll", 0.0)
+
+def _detail(client, auth_headers, product_id):
+    versions._memo.clear()
+    response = client.get(f"/api/v1/products/{product_id}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _pages(client, auth_headers, **params):
+    pages, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get("/api/v1/products/", params=query, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+@pytest.mark.parametrize("params", [{"limit": 7}, {"limit": 4, "category": "Gadgets"}, {"skip": 3, "limit": 5}])
+def test_cached_pages_match_the_database(params, client, auth_headers, make_product, monkeypatch):
+    for number in range(6):
+        make_product(stock_quantity=number, category="Gadgets")
+    cached = _pages(client, auth_headers, **params)
+    assert _pages(client, auth_headers, **params) == cached  # warm
+
+    monkeypatch.setattr(settings, "CATALOG_CACHE_ENABLED", False)
+    assert _pages(client, auth_headers, **params) == cached
+
+def test_listing_larger_than_the_bound_is_paged_from_the_database(client, auth_headers, make_product, monkeypatch):
+    make_product(stock_quantity=1)
+    expected = _pages(client, auth_headers, limit=9)
+    monkeypatch.setattr(settings, "CATALOG_CACHE_MAX_PRODUCTS", 5)
+    monkeypatch.setattr(catalog, "product_lists", TTLCache(maxsize=4, ttl=60))
+    assert _pages(client, auth_headers, limit=9) == expected
+
+def test_warm_reads_run_no_product_queries(no_poll, client, auth_headers, make_product, monkeypatch):
+    monkeypatch.setattr(settings, "ETAG_VERSION_TTL_SECONDS", 60)
+    product_id = make_product(stock_quantity=3)
+    client.get("/api/v1/products/", params={"limit": 50}, headers=auth_headers)
+    client.get(f"/api/v1/products/{product_id}", headers=auth_headers)
+
+    with count_statements() as statements:
+        assert client.get("/api/v1/products/", params={"limit": 50}, headers=auth_headers).status_code == 200
+        assert client.get(f"/api/v1/products/{product_id}", headers=auth_headers).status_code == 200
+    assert statements == []
+
+def test_writes_through_the_api_invalidate(no_poll, client, auth_headers, make_product, customer):
+    product_id = make_product(stock_quantity=10, price=4.0)
+    assert _detail(client, auth_headers, product_id)["stock_quantity"] == 10
+
+    response = client.post("/api/v1/orders/", json={
+        "customer_id": customer, "items": [{"product_id": product_id, "quantity": 3}],
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert _detail(client, auth_headers, product_id)["stock_quantity"] == 7
+
+    assert client.post("/api/v1/inventory/adjust", json={
+        "product_id": product_id, "change_type": "in", "quantity": 5,
+    }, headers=auth_headers).status_code == 200
+    assert _detail(client, auth_headers, product_id)["stock_quantity"] == 12
+
+    assert client.put(f"/api/v1/products/{product_id}", json={"price": 6.5, "category": "Moved"},
+                      headers=auth_headers).status_code == 200
+    assert _detail(client, auth_headers, product_id)["price"] == 6.5
+    moved = client.get("/api/v1/products/", params={"category": "Moved"}, headers=auth_headers).json()
+    assert product_id in [product["id"] for product in moved]
+
+    unsold = make_product(stock_quantity=1)
+    _detail(client, auth_headers, unsold)
+    assert client.delete(f"/api/v1/products/{unsold}", headers=auth_headers).status_code == 200
+    versions._memo.clear()
+    assert client.get(f"/api/v1/products/{unsold}", headers=auth_headers).status_code == 404
+
+def test_order_rechecks_stale_stock_and_charges_the_current_price(no_poll, client, auth_headers, make_product, customer):
+    product_id = make_product(stock_quantity=1, price=2.0)
+    assert _detail(client, auth_headers, product_id)["stock_quantity"] == 1
+    # Restocked and repriced behind the cache's back
+    with engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE products SET stock_quantity = 5, price = 3.0 WHERE id = ?", (product_id,))
+
+    response = client.post("/api/v1/orders/", json={
+        "customer_id": customer, "items": [{"product_id": product_id, "quantity": 4}],
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["total_amount"] == 12.0
+    assert response.json()["items"][0]["price_at_time"] == 3.0
+
+def test_changes_from_another_process_arrive_through_the_poll(no_poll, client, auth_headers, make_product, monkeypatch):
+    product_id = make_product(stock_quantity=1, price=2.0)
+    poll_now(monkeypatch)  # catch up with the log first, so only the changes below are new
+    _detail(client, auth_headers, product_id)
+    monkeypatch.setattr(catalog, "_next_poll", float("inf"))
+    assert _detail(client, auth_headers, product_id)["price"] == 2.0
+
+    def write_elsewhere(price, bump):
+        script = (
+            "from app import models\n"
+            "from app.database import SessionLocal\n"
+            "from app.services import catalog, versions\n"
+            "db = SessionLocal()\n"
+            f"db.get(models.Product, {product_id}).price = {price}\n"
+            f"{'versions.bump(db, versions.PRODUCTS)' if bump else ''}\n"
+            "db.commit()\n"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.dirname(__file__)), check=True)
+
+    def etag_and_price():
+        versions._memo.clear()
+        response = client.get(f"/api/v1/products/{product_id}", headers=auth_headers)
+        return response.headers["ETag"], response.json()["price"]
+
+    etag, _ = etag_and_price()
+    # A write that moves the ETag is in the response that carries the new ETag
+    write_elsewhere(9.0, bump=True)
+    newer, price = etag_and_price()
+    assert newer != etag and price == 9.0
+    etag_and_price()  # cached again
+    monkeypatch.setattr(catalog, "_next_poll", float("inf"))  # that poll restarted the interval
+
+    # Without a version bump the ETag stays and the change waits for the timed poll
+    write_elsewhere(7.0, bump=False)
+    assert etag_and_price() == (newer, 9.0)
+    poll_now(monkeypatch)
+    assert etag_and_price() == (newer, 7.0)
+
+def test_product_cache_is_bounded(no_poll, db, make_product, monkeypatch):
+    monkeypatch.setattr(catalog, "products", TTLCache(maxsize=3, ttl=60))
+    product_ids = [make_product(stock_quantity=1) for _ in range(6)]
+    db.rollback()  # a new transaction, begun after those inserts were applied
+    assert sorted(catalog.get_many(db, product_ids)) == product_ids
+    assert catalog.stats()["products"]["size"] == 3
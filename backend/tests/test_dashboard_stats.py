@@ -0,0 +1,41 @@
+import pytest
+from app.services import stats as stats_service
+
+def _dashboard(client, auth_headers):
+    response = client.get("/api/v1/reports/dashboard", headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+def test_maintained_totals_match_full_rebuild(client, db, auth_headers, customer, make_product):
+    existing = make_product(stock_quantity=40, price=2.5, min_stock_threshold=5)
+    # Fixtures write rows directly, so start from totals that include them.
+    stats_service.rebuild_stats(db)
+    db.commit()
+
+    created = client.post("/api/v1/products/", json={
+        "sku": "STATS-1", "name": "Stats Widget", "price": 12.0,
+        "stock_quantity": 4, "min_stock_threshold": 10,
+    }, headers=auth_headers).json()["id"]
+    client.put(f"/api/v1/products/{created}", json={"stock_quantity": 30, "price": 11.0}, headers=auth_headers)
+    client.post("/api/v1/inventory/adjust", json={"product_id": created, "change_type": "out", "quantity": 25}, headers=auth_headers)
+    client.post("/api/v1/inventory/adjust", json={"product_id": existing, "change_type": "adjustment", "quantity": -38}, headers=auth_headers)
+    client.post("/api/v1/orders/", json={
+        "customer_id": customer,
+        "items": [{"product_id": created, "quantity": 2}, {"product_id": existing, "quantity": 1}],
+    }, headers=auth_headers)
+    doomed = client.post("/api/v1/products/", json={
+        "sku": "STATS-2", "name": "Doomed Widget", "price": 3.0, "stock_quantity": 3,
+    }, headers=auth_headers).json()["id"]
+    client.delete(f"/api/v1/products/{doomed}", headers=auth_headers)
+
+    maintained = _dashboard(client, auth_headers)
+    db.expire_all()
+    rebuilt = stats_service.compute_stats(db)
+
+    assert maintained == pytest.approx(rebuilt)
+
+def test_dashboard_read_does_not_write(client, db, auth_headers, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("dashboard read must not rebuild stats")
+    monkeypatch.setattr(stats_service, "rebuild_stats", fail)
+    _dashboard(client, auth_headers)
@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from tests.conftest import count_statements
+
+@contextmanager
+def no_queries():
+    with count_statements() as statements:
+        yield
+    assert statements == []
+
+def _revalidate(client, auth_headers, path, etag):
+    return client.get(path, headers={**auth_headers, "If-None-Match": etag})
+
+def test_unchanged_list_is_revalidated_without_queries(client, auth_headers, make_product):
+    make_product(stock_quantity=3)
+    first = client.get("/api/v1/products/", headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    with no_queries():
+        response = _revalidate(client, auth_headers, "/api/v1/products/", etag)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+def test_writes_change_the_etag(client, auth_headers, make_product):
+    product_id = make_product(stock_quantity=3)
+    supplier_id = client.post("/api/v1/suppliers/", json={"name": "ETag Supplier"}, headers=auth_headers).json()["id"]
+    etag = client.get("/api/v1/products/", headers=auth_headers).headers["ETag"]
+
+    client.post("/api/v1/inventory/adjust", json={"product_id": product_id, "change_type": "in", "quantity": 1}, headers=auth_headers)
+    after_adjust = _revalidate(client, auth_headers, "/api/v1/products/", etag)
+    assert after_adjust.status_code == 200
+    assert after_adjust.headers["ETag"] != etag
+
+    # Products embed their supplier, so editing a supplier changes the product ETag too.
+    etag = after_adjust.headers["ETag"]
+    supplier_etag = client.get(f"/api/v1/suppliers/{supplier_id}", headers=auth_headers).headers["ETag"]
+    client.put(f"/api/v1/suppliers/{supplier_id}", json={"name": "Renamed"}, headers=auth_headers)
+    assert _revalidate(client, auth_headers, "/api/v1/products/", etag).status_code == 200
+    assert _revalidate(client, auth_headers, f"/api/v1/suppliers/{supplier_id}", supplier_etag).status_code == 200
+
+def test_failed_write_keeps_the_etag(client, auth_headers, make_product):
+    product_id = make_product(stock_quantity=1)
+    etag = client.get(f"/api/v1/products/{product_id}", headers=auth_headers).headers["ETag"]
+    response = client.post("/api/v1/inventory/adjust", json={"product_id": product_id, "change_type": "out", "quantity": 5}, headers=auth_headers)
+    assert response.status_code == 400
+    assert _revalidate(client, auth_headers, f"/api/v1/products/{product_id}", etag).status_code == 304
+
+def test_detail_endpoints(client, auth_headers, customer):
+    response = client.get(f"/api/v1/customers/{customer}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == customer
+    assert client.get("/api/v1/customers/999999", headers=auth_headers).status_code == 404
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from sqlalchemy import text
+from app.database import engine
+from app.routers import exports
+
+def test_orders_ndjson_streams_every_order_with_items(client, auth_headers, customer, make_product, monkeypatch):
+    monkeypatch.setattr(exports, "BATCH_SIZE", 2)
+    product_id = make_product(stock_quantity=50)
+    created = []
+    for _ in range(5):
+        order = {"customer_id": customer, "items": [{"product_id": product_id, "quantity": 1}]}
+        created.append(client.post("/api/v1/orders/", json=order, headers=auth_headers).json()["id"])
+
+    response = client.get("/api/v1/exports/orders", params={"product_id": product_id}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == created
+    assert all(line["items"][0]["product_id"] == product_id for line in lines)
+
+def test_movements_csv_filters_by_product(client, auth_headers, make_product):
+    product_id = make_product(stock_quantity=0)
+    other_id = make_product(stock_quantity=0)
+    for pid in (product_id, product_id, other_id):
+        client.post("/api/v1/inventory/adjust", json={"product_id": pid, "change_type": "in", "quantity": 4}, headers=auth_headers)
+
+    response = client.get(
+        "/api/v1/exports/stock-movements",
+        params={"format": "csv", "product_id": product_id},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    assert {row["product_id"] for row in rows} == {str(product_id)}
+    assert rows[0]["change_type"] == "in"
+
+def test_movements_filter_by_time_range(client, auth_headers, make_product):
+    product_id = make_product(stock_quantity=0)
+    with engine.begin() as connection:
+        # As the server default stores them: "YYYY-MM-DD HH:MM:SS" text
+        for moment in ("2031-01-01 23:59:59", "2031-01-02 00:00:00", "2031-01-02 23:59:59", "2031-01-03 00:00:00"):
+            connection.execute(text(
+                "INSERT INTO stock_movements (product_id, change_type, quantity, created_at) "
+                "VALUES (:product_id, 'in', 1, :moment)"
+            ), {"product_id": product_id, "moment": moment})
+
+    def exported(**bounds):
+        response = client.get("/api/v1/exports/stock-movements",
+                              params={"format": "csv", "product_id": product_id, **bounds}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return [row["created_at"] for row in csv.DictReader(io.StringIO(response.text))]
+
+    assert len(exported(start="2031-01-02T00:00:00", end="2031-01-03T00:00:00")) == 2
+    assert len(exported(end="2031-01-02T00:00:00")) == 1
+    # Timezone-aware bounds are compared in UTC
+    assert len(exported(start="2031-01-02T02:00:00+02:00", end="2031-01-03T01:00:00+01:00")) == 2
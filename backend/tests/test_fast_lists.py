@@ -0,0 +1,48 @@
+import pytest
+from app import models
+from app.core.config import settings
+
+def _both(client, auth_headers, monkeypatch, path, **params):
+    responses = {}
+    for fast in (False, True):
+        monkeypatch.setattr(settings, "FAST_LIST_RESPONSES", fast)
+        response = client.get(path, params=params, headers=auth_headers)
+        assert response.status_code == 200
+        responses[fast] = response
+    return responses[False], responses[True]
+
+@pytest.fixture
+def catalog(db, make_product, customer, client, auth_headers):
+    supplier = models.Supplier(name="Fast Supplier", email="fast@example.com")
+    db.add(supplier)
+    db.flush()
+    supplier_id = supplier.id
+    db.commit()
+    with_supplier = make_product(stock_quantity=50, price=3.25, supplier_id=supplier_id, category="Fast", name="Fast Widget")
+    without = make_product(stock_quantity=50, price=1.0, name="Fast Gadget")
+    for items in ([with_supplier], [with_supplier, without], [without]):
+        client.post("/api/v1/orders/", json={
+            "customer_id": customer, "items": [{"product_id": pid, "quantity": 1} for pid in items],
+        }, headers=auth_headers)
+
+@pytest.mark.parametrize("params", [
+    {"limit": 3},
+    {"limit": 1000},
+    {"category": "Fast"},
+    {"search": "Fast"},
+])
+def test_fast_product_list_matches_schema_path(catalog, client, auth_headers, monkeypatch, params):
+    slow, fast = _both(client, auth_headers, monkeypatch, "/api/v1/products/", **params)
+    # Same fields in the same order, byte for byte.
+    assert fast.content == slow.content
+    assert fast.headers.get("X-Next-Cursor") == slow.headers.get("X-Next-Cursor")
+    assert fast.headers["ETag"] == slow.headers["ETag"]
+
+def test_fast_order_list_matches_schema_path(catalog, client, auth_headers, monkeypatch):
+    slow, fast = _both(client, auth_headers, monkeypatch, "/api/v1/orders/", limit=2)
+    assert fast.content == slow.content
+    cursor = fast.headers["X-Next-Cursor"]
+    assert cursor == slow.headers["X-Next-Cursor"]
+
+    slow, fast = _both(client, auth_headers, monkeypatch, "/api/v1/orders/", limit=2, cursor=cursor)
+    assert fast.json() == slow.json()
@@ -0,0 +1,87 @@
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from app import models
+from app.core import schema
+from app.services import stats as stats_service
+import generate_data
+
+VOLUMES = dict(suppliers=10, products=300, customers=100, orders=1000, movements=5000, end=date(2026, 1, 31), days=30)
+
+def _generate(path, **overrides):
+    engine = create_engine(f"sqlite:///{path}")
+    schema.upgrade(engine)
+    db = Session(bind=engine)
+    written = generate_data.generate(db, **dict(VOLUMES, **overrides))
+    db.commit()
+    return engine, db, written
+
+def _dump(db, model):
+    table = model.__table__
+    return db.execute(select(table).order_by(table.c.id)).all()
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    engine, db, written = _generate(tmp_path_factory.mktemp("generated") / "a.db")
+    yield db, written
+    db.close()
+    engine.dispose()
+
+def test_same_seed_same_rows(dataset, tmp_path):
+    db, _ = dataset
+    engine, other, _ = _generate(tmp_path / "b.db")
+    try:
+        for model in (models.Supplier, models.Product, models.Customer, models.Order, models.OrderItem, models.StockMovement):
+            assert _dump(other, model) == _dump(db, model)
+    finally:
+        other.close()
+        engine.dispose()
+
+def test_volumes_and_derived_tables(dataset):
+    db, written = dataset
+    assert db.execute(select(func.count(models.Product.id))).scalar() == 300
+    assert db.execute(select(func.count(models.StockMovement.id))).scalar() == written["movements"] == 5000
+    assert db.execute(select(func.count(models.OrderItem.id))).scalar() == written["order_items"]
+    # Every completed order line has its OUT movement
+    completed_lines = db.execute(
+        select(func.count(models.OrderItem.id)).join(models.Order)
+        .where(models.Order.status == models.OrderStatus.COMPLETED.value)
+    ).scalar()
+    outs = db.execute(
+        select(func.count(models.StockMovement.id)).where(models.StockMovement.change_type == models.StockMovementType.OUT.value)
+    ).scalar()
+    assert outs == completed_lines
+    assert stats_service.compute_stats(db)["total_orders"] == db.get(models.InventoryStats, stats_service.STATS_ID).total_orders
+    assert db.execute(select(func.count()).select_from(models.SalesRollup)).scalar() > 0
+
+def test_history_never_goes_negative(dataset):
+    db, _ = dataset
+    stock = dict(db.execute(select(models.Product.id, models.Product.stock_quantity)).all())
+    balance = {
+        product_id: quantity - moved for product_id, quantity, moved in db.execute(
+            select(models.Product.id, models.Product.stock_quantity, func.coalesce(func.sum(
+                func.iif(models.StockMovement.change_type == "out", -models.StockMovement.quantity, models.StockMovement.quantity)
+            ), 0))
+            .outerjoin(models.StockMovement).group_by(models.Product.id)
+        )
+    }
+    movements = db.execute(
+        select(models.StockMovement.product_id, models.StockMovement.change_type, models.StockMovement.quantity)
+        .order_by(models.StockMovement.created_at, models.StockMovement.id)
+    )
+    for product_id, change_type, quantity in movements:
+        balance[product_id] += -quantity if change_type == "out" else quantity
+        assert balance[product_id] >= 0
+    assert balance == stock
+
+def test_demand_is_skewed_and_spread_over_the_window(dataset):
+    db, _ = dataset
+    lines = [count for (count,) in db.execute(
+        select(func.count(models.OrderItem.id)).group_by(models.OrderItem.product_id).order_by(func.count(models.OrderItem.id).desc())
+    )]
+    # The hottest 3% of the catalog takes a large share of the order lines
+    assert sum(lines[:9]) > 0.3 * sum(lines)
+    first, last = db.execute(select(func.min(models.Order.created_at), func.max(models.Order.created_at))).one()
+    assert first.date() >= date(2026, 1, 1) and last.date() < date(2026, 1, 31)
+    assert (last - first).days >= 25
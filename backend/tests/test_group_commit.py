@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import models
+from app.services import group_commit
+
+@pytest.fixture
+def writer(monkeypatch):
+    # A wide window so that concurrent requests reliably land in shared batches.
+    writer = group_commit.GroupCommitWriter(group_commit._writer_sessions(), max_batch=64, window_seconds=0.05)
+    writer.start()
+    monkeypatch.setattr(group_commit, "writer", writer)
+    yield writer
+    writer.stop()
+
+def _parallel(count, send):
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(lambda i: send(TestClient(app), i), range(count)))
+
+def test_concurrent_adjustments_share_commits(writer, auth_headers, make_product, db):
+    product_id = make_product(stock_quantity=30)
+    movement = {"product_id": product_id, "change_type": "out", "quantity": 3}
+
+    responses = _parallel(16, lambda c, i: c.post("/api/v1/inventory/adjust", json=movement, headers=auth_headers))
+
+    statuses = [r.status_code for r in responses]
+    assert statuses.count(200) == 10
+    assert statuses.count(400) == 6
+    assert {r.json()["detail"] for r in responses if r.status_code == 400} == {"Insufficient stock"}
+    assert writer.batches < writer.jobs == 16
+    assert db.get(models.Product, product_id).stock_quantity == 0
+    assert db.query(models.StockMovement).filter(models.StockMovement.product_id == product_id).count() == 10
+
+def test_rejected_order_in_a_batch_leaves_the_others_applied(writer, auth_headers, customer, make_product, db):
+    plenty = make_product(stock_quantity=100)
+    scarce = make_product(stock_quantity=1)
+
+    def send(c, i):
+        # Every fourth order also asks for the scarce product and must fail as a whole.
+        items = [{"product_id": plenty, "quantity": 1}]
+        if i % 4 == 0:
+            items.append({"product_id": scarce, "quantity": 2})
+        return c.post("/api/v1/orders/", json={"customer_id": customer, "items": items}, headers=auth_headers)
+
+    responses = _parallel(12, send)
+
+    assert [r.status_code for i, r in enumerate(responses) if i % 4 == 0] == [400, 400, 400]
+    assert all(r.status_code == 200 for i, r in enumerate(responses) if i % 4)
+    assert db.get(models.Product, plenty).stock_quantity == 91
+    assert db.get(models.Product, scarce).stock_quantity == 1
+
+def test_idempotent_retries_through_the_writer(writer, auth_headers, make_product, db):
+    product_id = make_product(stock_quantity=5)
+    headers = {**auth_headers, "Idempotency-Key": "group-commit-1"}
+    movement = {"product_id": product_id, "change_type": "in", "quantity": 5}
+
+    responses = _parallel(6, lambda c, i: c.post("/api/v1/inventory/adjust", json=movement, headers=headers))
+
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert db.get(models.Product, product_id).stock_quantity == 10
+
+def test_failing_job_only_rolls_back_its_own_savepoint(writer, make_product, db):
+    first, second = make_product(stock_quantity=1), make_product(stock_quantity=1)
+
+    def set_stock(product_id, fail):
+        def job(session):
+            session.query(models.Product).filter(models.Product.id == product_id).update({"stock_quantity": 7})
+            if fail:
+                raise ValueError("rejected after writing")
+            return product_id
+        return job
+
+    ok = writer.submit(set_stock(first, fail=False))
+    failed = writer.submit(set_stock(second, fail=True))
+
+    assert ok.result(timeout=5) == first
+    with pytest.raises(ValueError):
+        failed.result(timeout=5)
+    assert db.get(models.Product, first).stock_quantity == 7
+    assert db.get(models.Product, second).stock_quantity == 1
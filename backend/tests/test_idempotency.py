@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+from app import models
+
+def _order(customer, product_id, quantity=2):
+    return {"customer_id": customer, "items": [{"product_id": product_id, "quantity": quantity}]}
+
+def _order_movements(db, product_id):
+    return db.query(models.StockMovement).filter(models.StockMovement.product_id == product_id).count()
+
+def test_retried_order_is_applied_once(client, auth_headers, customer, make_product, db):
+    product_id = make_product(stock_quantity=10)
+    headers = {**auth_headers, "Idempotency-Key": "scanner-order-1"}
+
+    first = client.post("/api/v1/orders/", json=_order(customer, product_id), headers=headers)
+    retry = client.post("/api/v1/orders/", json=_order(customer, product_id), headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert db.get(models.Product, product_id).stock_quantity == 8
+    assert _order_movements(db, product_id) == 1
+
+def test_key_reused_for_a_different_request_is_rejected(client, auth_headers, customer, make_product):
+    product_id = make_product(stock_quantity=10)
+    headers = {**auth_headers, "Idempotency-Key": "scanner-order-2"}
+
+    assert client.post("/api/v1/orders/", json=_order(customer, product_id), headers=headers).status_code == 200
+    response = client.post("/api/v1/orders/", json=_order(customer, product_id, quantity=3), headers=headers)
+    assert response.status_code == 422
+
+def test_failed_request_is_not_stored(client, auth_headers, make_product, db):
+    product_id = make_product(stock_quantity=1)
+    headers = {**auth_headers, "Idempotency-Key": "scanner-adjust-1"}
+    movement = {"product_id": product_id, "change_type": "out", "quantity": 5}
+
+    assert client.post("/api/v1/inventory/adjust", json=movement, headers=headers).status_code == 400
+    db.query(models.Product).filter(models.Product.id == product_id).update({"stock_quantity": 10})
+    db.commit()
+    response = client.post("/api/v1/inventory/adjust", json=movement, headers=headers)
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+def test_expired_key_runs_the_request_again(client, auth_headers, make_product, db):
+    product_id = make_product(stock_quantity=10)
+    headers = {**auth_headers, "Idempotency-Key": "scanner-adjust-2"}
+    movement = {"product_id": product_id, "change_type": "in", "quantity": 5}
+
+    first = client.post("/api/v1/inventory/adjust", json=movement, headers=headers)
+    db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == "scanner-adjust-2").update(
+        {"expires_at": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    second = client.post("/api/v1/inventory/adjust", json=movement, headers=headers)
+
+    assert second.status_code == 200
+    assert second.json()["id"] != first.json()["id"]
+    db.expire_all()
+    assert db.get(models.Product, product_id).stock_quantity == 20
+
+def test_concurrent_retries_apply_the_order_once(auth_headers, customer, make_product, db):
+    product_id = make_product(stock_quantity=10)
+    headers = {**auth_headers, "Idempotency-Key": "scanner-order-3"}
+
+    def send(_):
+        return TestClient(app).post("/api/v1/orders/", json=_order(customer, product_id), headers=headers)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(send, range(8)))
+
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert db.get(models.Product, product_id).stock_quantity == 8
+    assert _order_movements(db, product_id) == 1
@@ -0,0 +1,45 @@
+import logging
+from app.core import metrics
+from app.core.config import settings
+from app.database import PRODUCTION_PROFILE
+from app.services import versions
+
+def _histograms(route):
+    return dict(zip(
+        (name for name, _, _ in metrics.Registry.HISTOGRAMS),
+        metrics.registry.histograms[("GET", route)],
+    ))
+
+def test_request_queries_and_rows_are_recorded(client, auth_headers, make_product, monkeypatch):
+    # Keep the ETag version memoized across both requests below
+    monkeypatch.setattr(settings, "ETAG_VERSION_TTL_SECONDS", 60)
+    monkeypatch.setattr(versions, "_memo", {})
+    # and read the product from the database each time, not from the catalog cache
+    monkeypatch.setattr(settings, "CATALOG_CACHE_ENABLED", False)
+    route = "/api/v1/products/{product_id}"
+    product_id = make_product(stock_quantity=1)
+
+    response = client.get(f"/api/v1/products/{product_id}", headers=auth_headers)
+    assert response.status_code == 200
+    histograms = _histograms(route)
+    queries, rows = histograms["http_request_db_queries"], histograms["http_request_db_rows"]
+    before = (sum(queries.counts), queries.total, rows.total)
+
+    client.get(f"/api/v1/products/{product_id}", headers=auth_headers)
+    # One more request; the ETag version is memoized, so its only query is the product
+    # itself (after an explicit BEGIN in the production profile).
+    assert sum(queries.counts) == before[0] + 1
+    assert queries.total == before[1] + (2 if PRODUCTION_PROFILE else 1)
+    assert rows.total == before[2] + 1
+
+    body = client.get("/metrics").text
+    assert f'http_requests_total{{method="GET",route="{route}",status="200"}}' in body
+    assert f'http_request_db_queries_bucket{{method="GET",route="{route}",le="+Inf"}}' in body
+
+def test_slow_request_log_lists_statements(client, auth_headers, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.slow_requests"):
+        client.get("/api/v1/customers/", headers=auth_headers)
+    message = next(record.getMessage() for record in caplog.records if "/api/v1/customers/" in record.getMessage())
+    assert message.startswith("Slow request GET /api/v1/customers/ -> 200")
+    assert "FROM customers" in message
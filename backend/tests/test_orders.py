@@ -0,0 +1,33 @@
+from tests.conftest import count_statements
+
+def test_read_orders_query_count_does_not_grow_with_page_size(client, auth_headers, customer, make_product):
+    products = [make_product(stock_quantity=100) for _ in range(3)]
+    for i in range(12):
+        order = {
+            "customer_id": customer,
+            "items": [{"product_id": products[i % 3], "quantity": 1}, {"product_id": products[(i + 1) % 3], "quantity": 1}],
+        }
+        assert client.post("/api/v1/orders/", json=order, headers=auth_headers).status_code == 200
+    # Warm the auth cache so both requests measure only the orders query plan.
+    client.get("/api/v1/orders/", params={"limit": 1}, headers=auth_headers)
+
+    counts = {}
+    for limit in (2, 12):
+        with count_statements() as statements:
+            response = client.get("/api/v1/orders/", params={"limit": limit}, headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = len(statements)
+
+    assert counts[2] == counts[12] > 0
+
+def test_read_order_by_id(client, auth_headers, customer, make_product):
+    product_id = make_product(stock_quantity=5)
+    order = {"customer_id": customer, "items": [{"product_id": product_id, "quantity": 2}]}
+    order_id = client.post("/api/v1/orders/", json=order, headers=auth_headers).json()["id"]
+
+    response = client.get(f"/api/v1/orders/{order_id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["product"]["id"] == product_id
+    assert client.get("/api/v1/orders/999999", headers=auth_headers).status_code == 404
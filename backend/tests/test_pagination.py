@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from app import models
+
+def _walk(client, url, headers, limit):
+    seen, cursor = [], None
+    for _ in range(100):
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+    raise AssertionError(f"cursor walk did not finish, stuck at {cursor}")
+
+def test_movement_feed_cursor_walk_has_no_gaps_or_repeats(client, db, auth_headers, make_product):
+    product_id = make_product(stock_quantity=0)
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    # Mix server-default timestamps with explicit ones, including ties on the same second.
+    for offset in (0, 0, 1, 1.5, 2, 2):
+        db.add(models.StockMovement(
+            product_id=product_id, change_type="in", quantity=1,
+            created_at=base + timedelta(seconds=offset),
+        ))
+    for _ in range(3):
+        db.add(models.StockMovement(product_id=product_id, change_type="in", quantity=1))
+    db.commit()
+
+    expected = [
+        m.id for m in db.query(models.StockMovement).order_by(
+            models.StockMovement.created_at.desc(), models.StockMovement.id.desc()
+        )
+    ]
+    assert _walk(client, "/api/v1/inventory/movements", auth_headers, limit=2) == expected
+
+def test_catalog_cursor_matches_offset_paging(client, auth_headers, make_product):
+    for _ in range(5):
+        make_product(stock_quantity=1)
+    by_offset = [
+        row["id"] for row in
+        client.get("/api/v1/products/", params={"limit": 1000}, headers=auth_headers).json()
+    ]
+    assert _walk(client, "/api/v1/products/", auth_headers, limit=2) == by_offset
+
+def test_invalid_cursor_is_rejected(client, auth_headers):
+    response = client.get("/api/v1/products/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,98 @@
+import json
+from app import models
+from app.services import product_import
+from app.services import stats as stats_service
+
+def _import(client, auth_headers, filename, content, **params):
+    return client.post(
+        "/api/v1/products/import",
+        params=params,
+        files={"file": (filename, content.encode())},
+        headers=auth_headers,
+    )
+
+def test_csv_import_upserts_by_sku_and_reports_bad_rows(client, db, auth_headers, monkeypatch):
+    monkeypatch.setattr(product_import, "CHUNK_SIZE", 2)
+    client.post("/api/v1/products/", json={"sku": "IMP-1", "name": "Old name", "price": 1, "stock_quantity": 5}, headers=auth_headers)
+    stats_service.rebuild_stats(db)
+    db.commit()
+    content = (
+        "sku,name,category,price,stock_quantity\n"
+        "IMP-1,New name,Tools,2.5,8\n"
+        "IMP-2,Second,Tools,3,4\n"
+        "IMP-3,Broken,Tools,not-a-price,1\n"
+        "IMP-4,Fourth,,4,\n"
+    )
+
+    response = _import(client, auth_headers, "catalog.csv", content, record_movements="true")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (2, 1, 1)
+    assert body["errors"][0]["row"] == 4
+    assert body["errors"][0]["sku"] == "IMP-3"
+
+    db.expire_all()
+    updated = db.query(models.Product).filter(models.Product.sku == "IMP-1").one()
+    assert (updated.name, updated.price, updated.stock_quantity) == ("New name", 2.5, 8)
+    fourth = db.query(models.Product).filter(models.Product.sku == "IMP-4").one()
+    assert fourth.stock_quantity == 0 and fourth.category is None
+
+    movements = {
+        (m.product_id, m.change_type, m.quantity)
+        for m in db.query(models.StockMovement).filter(models.StockMovement.notes.like("%import%"))
+    }
+    imp2 = db.query(models.Product).filter(models.Product.sku == "IMP-2").one()
+    assert movements == {(updated.id, "adjustment", 3), (imp2.id, "in", 4)}
+
+    dashboard = client.get("/api/v1/reports/dashboard", headers=auth_headers).json()
+    assert dashboard["total_products"] == stats_service.compute_stats(db)["total_products"]
+    assert abs(dashboard["total_stock_value"] - stats_service.compute_stats(db)["total_stock_value"]) < 1e-6
+
+def test_import_only_updates_the_columns_a_row_carries(client, db, auth_headers):
+    supplier_id = client.post("/api/v1/suppliers/", json={"name": "Partial Supplier"}, headers=auth_headers).json()["id"]
+    for sku in ("PART-1", "PART-2"):
+        client.post("/api/v1/products/", json={
+            "sku": sku, "name": "Kept", "category": "Tools", "price": 1, "stock_quantity": 40,
+            "min_stock_threshold": 3, "supplier_id": supplier_id,
+        }, headers=auth_headers)
+    stats_service.rebuild_stats(db)
+    db.commit()
+    content = (
+        "sku,name,price,stock_quantity\n"
+        "PART-1,Repriced,7.5,\n"  # no stock: keeps its 40
+        "PART-2,Restocked,1,45\n"
+    )
+
+    body = _import(client, auth_headers, "prices.csv", content, record_movements="true").json()
+
+    assert (body["updated"], body["failed"]) == (2, 0)
+    db.expire_all()
+    repriced, restocked = (
+        db.query(models.Product).filter(models.Product.sku == sku).one() for sku in ("PART-1", "PART-2")
+    )
+    assert (repriced.name, repriced.price, repriced.stock_quantity) == ("Repriced", 7.5, 40)
+    assert (repriced.category, repriced.supplier_id, repriced.min_stock_threshold) == ("Tools", supplier_id, 3)
+    assert (restocked.stock_quantity, restocked.category, restocked.min_stock_threshold) == (45, "Tools", 3)
+    movements = [
+        (m.product_id, m.quantity)
+        for m in db.query(models.StockMovement).filter(models.StockMovement.notes == "Stock set by import")
+        if m.product_id in (repriced.id, restocked.id)
+    ]
+    assert movements == [(restocked.id, 5)]
+    dashboard = client.get("/api/v1/reports/dashboard", headers=auth_headers).json()
+    assert abs(dashboard["total_stock_value"] - stats_service.compute_stats(db)["total_stock_value"]) < 1e-6
+
+def test_ndjson_import_feeds_search(client, auth_headers):
+    lines = [
+        {"sku": "NDJ-1", "name": "Gravitonic Lamp", "price": 9.5},
+        "not json",
+        {"sku": "NDJ-2", "name": "Gravitonic Desk", "price": 99, "stock_quantity": 2},
+    ]
+    content = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+
+    body = _import(client, auth_headers, "catalog.ndjson", content).json()
+
+    assert (body["created"], body["failed"]) == (2, 1)
+    found = client.get("/api/v1/products/", params={"search": "Gravitonic"}, headers=auth_headers).json()
+    assert {row["sku"] for row in found} == {"NDJ-1", "NDJ-2"}
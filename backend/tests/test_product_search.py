@@ -0,0 +1,43 @@
+def _names(response):
+    assert response.status_code == 200
+    return [row["name"] for row in response.json()]
+
+def test_search_matches_substrings_and_follows_updates(client, auth_headers):
+    created = client.post("/api/v1/products/", json={
+        "sku": "SRCH-001", "name": "Quasarphone Pro", "category": "Audio", "price": 10,
+    }, headers=auth_headers).json()
+    client.post("/api/v1/products/", json={
+        "sku": "SRCH-002", "name": "Quasarphone Lite", "category": "Budget", "price": 5,
+    }, headers=auth_headers)
+
+    assert set(_names(client.get("/api/v1/products/", params={"search": "sarpho"}, headers=auth_headers))) == {
+        "Quasarphone Pro", "Quasarphone Lite",
+    }
+    assert _names(client.get("/api/v1/products/", params={"search": "sarpho", "category": "Audio"}, headers=auth_headers)) == [
+        "Quasarphone Pro",
+    ]
+
+    client.put(f"/api/v1/products/{created['id']}", json={"name": "Nebulaphone Pro"}, headers=auth_headers)
+    assert _names(client.get("/api/v1/products/", params={"search": "Nebula"}, headers=auth_headers)) == ["Nebulaphone Pro"]
+    assert _names(client.get("/api/v1/products/", params={"search": "Quasar"}, headers=auth_headers)) == ["Quasarphone Lite"]
+
+    client.delete(f"/api/v1/products/{created['id']}", headers=auth_headers)
+    assert _names(client.get("/api/v1/products/", params={"search": "Nebula"}, headers=auth_headers)) == []
+
+def test_suggest_ranks_sku_matches_first(client, auth_headers):
+    client.post("/api/v1/products/", json={"sku": "ZEPH-9", "name": "Cable", "price": 1}, headers=auth_headers)
+    client.post("/api/v1/products/", json={"sku": "CBL-9", "name": "Zephyr cable", "price": 1}, headers=auth_headers)
+
+    response = client.get("/api/v1/products/suggest", params={"q": "zeph"}, headers=auth_headers)
+
+    assert [row["sku"] for row in response.json()] == ["ZEPH-9", "CBL-9"]
+    assert set(response.json()[0]) == {"id", "sku", "name", "category"}
+
+def test_suggest_limit_must_be_within_bounds(client, auth_headers):
+    for limit in (-1, 0, 51):
+        response = client.get("/api/v1/products/suggest", params={"q": "zeph", "limit": limit}, headers=auth_headers)
+        assert response.status_code == 422
+
+def test_short_search_falls_back_to_substring(client, auth_headers):
+    client.post("/api/v1/products/", json={"sku": "SHORT-1", "name": "Xq adapter", "price": 1}, headers=auth_headers)
+    assert "Xq adapter" in _names(client.get("/api/v1/products/", params={"search": "Xq"}, headers=auth_headers))
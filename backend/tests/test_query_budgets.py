@@ -0,0 +1,76 @@
+"""SQL statement and latency budgets per endpoint.
+
+Every endpoint is called through the ASGI app against the generated dataset,
+at a small and a large data scale (SCALES in conftest) and at a small and a
+large page size. The number of statements must stay within the endpoint's
+budget at both scales and must not depend on the page size (an N+1 pattern
+shows up as a count that grows with it). Each request must also finish
+under LATENCY_CEILING_SECONDS. Budgets are exact-ish on purpose: when a
+change legitimately needs another query, raise the number here in the same
+change.
+"""
+import time
+import pytest
+from app.core.config import settings
+from app.services import versions
+from tests.conftest import count_statements
+
+PAGE_SIZES = (5, 50)
+LATENCY_CEILING_SECONDS = 0.5
+
+# path -> most statements one request may run. Counts include the ETag version
+# lookup (a memo miss) where there is one; BEGIN statements of the production
+# profile are not counted.
+BUDGETS = {
+    "/api/v1/products/": 2,
+    "/api/v1/products/{product}": 2,
+    "/api/v1/products/suggest?q=Acme": 1,
+    "/api/v1/suppliers/": 2,
+    "/api/v1/customers/": 2,
+    "/api/v1/customers/{customer}": 2,
+    "/api/v1/orders/": 3,
+    "/api/v1/orders/{order}": 3,
+    "/api/v1/inventory/movements": 1,
+    # page, snapshot anchor, snapshot rows, movements since it, and for products
+    # without a snapshot their current stock and movements since the date
+    "/api/v1/inventory/stock-at?date=2030-01-01": 6,
+    # products, demand, and the names of the suggested products and their suppliers
+    "/api/v1/inventory/reorder-suggestions": 4,
+    "/api/v1/reports/dashboard": 1,
+    "/api/v1/reports/sales/timeseries": 1,
+    "/api/v1/reports/sales/top-products": 2,
+    "/api/v1/reports/sales/by-category": 1,
+}
+PAGED = {
+    "/api/v1/products/", "/api/v1/suppliers/", "/api/v1/customers/", "/api/v1/orders/",
+    "/api/v1/inventory/movements", "/api/v1/inventory/stock-at?date=2030-01-01",
+}
+
+def _url(path, ids, limit=None):
+    url = path.format(**ids)
+    if limit is not None:
+        url += ("&" if "?" in url else "?") + f"limit={limit}"
+    return url
+
+@pytest.mark.parametrize("path", sorted(BUDGETS))
+def test_statement_budget(path, seeded, client, auth_headers, monkeypatch):
+    # What the database serves; warm catalog cache reads are covered in tests/test_catalog.py
+    monkeypatch.setattr(settings, "CATALOG_CACHE_ENABLED", False)
+    sizes = PAGE_SIZES if path in PAGED else (None,)
+    client.get(_url(path, seeded, sizes[0]), headers=auth_headers)  # warm the auth cache
+
+    counts = {}
+    for limit in sizes:
+        versions._memo.clear()  # count the version lookup too, as after another process wrote
+        with count_statements() as statements:
+            started = time.perf_counter()
+            response = client.get(_url(path, seeded, limit), headers=auth_headers)
+            elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.text
+        if limit is not None:
+            assert len(response.json()) == limit
+        assert elapsed < LATENCY_CEILING_SECONDS, f"{path} took {elapsed:.3f}s"
+        counts[limit] = len(statements)
+        assert len(statements) <= BUDGETS[path], "\n".join(statements)
+
+    assert len(set(counts.values())) == 1, f"statement count grows with page size: {counts}"
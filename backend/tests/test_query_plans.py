@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import select
+from app import models
+from app.core import query_plans
+from app.core.config import settings
+from tests.test_query_budgets import BUDGETS, PAGED, _url
+
+@pytest.fixture
+def advisor(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_PLAN_ADVISOR", True)
+    query_plans.reset()
+    yield query_plans.findings
+    query_plans.reset()
+
+def test_advisor_flags_a_filter_no_index_serves(advisor, db):
+    db.execute(select(models.StockMovement.id).where(models.StockMovement.notes == "no index on notes")).all()
+    [(statement, tables)] = advisor.items()
+    assert tables == ["stock_movements"]
+
+def test_advisor_leaves_indexed_and_whole_table_reads_alone(advisor, db):
+    db.execute(select(models.StockMovement.id).where(models.StockMovement.product_id == 1)).all()
+    db.execute(select(models.Order.id, models.Order.total_amount).order_by(models.Order.id)).all()
+    assert advisor == {}
+
+def test_endpoints_do_not_scan_large_tables(advisor, seeded, client, auth_headers, make_product, customer):
+    for path in BUDGETS:
+        for limit in (50, None) if path in PAGED else (None,):
+            response = client.get(_url(path, seeded, limit), headers=auth_headers)
+            assert response.status_code == 200, response.text
+    # Paged lists a page further on, by cursor
+    for path in ("/api/v1/orders/", "/api/v1/inventory/movements", "/api/v1/products/"):
+        cursor = client.get(path, params={"limit": 5}, headers=auth_headers).headers["X-Next-Cursor"]
+        assert client.get(path, params={"limit": 5, "cursor": cursor}, headers=auth_headers).status_code == 200
+    assert client.get("/api/v1/inventory/reorder-suggestions", params={"supplier_id": 1}, headers=auth_headers).status_code == 200
+
+    product_id = make_product(stock_quantity=10)
+    assert client.post("/api/v1/orders/", json={
+        "customer_id": customer, "items": [{"product_id": product_id, "quantity": 1}],
+    }, headers=auth_headers).status_code == 200
+    assert client.post("/api/v1/inventory/adjust", json={
+        "product_id": product_id, "change_type": "in", "quantity": 5,
+    }, headers=auth_headers).status_code == 200
+
+    assert advisor == {}, "\n\n".join(f"{tables}: {statement}" for statement, tables in advisor.items())
@@ -0,0 +1,57 @@
+import math
+from datetime import datetime, timedelta
+import pytest
+from app import models
+
+def _sell(db, product_id, quantities):
+    # One OUT movement per day, the last one today.
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    db.add_all([
+        models.StockMovement(product_id=product_id, change_type=models.StockMovementType.OUT,
+                             quantity=quantity, created_at=today - timedelta(days=days_ago))
+        for days_ago, quantity in enumerate(reversed(quantities)) if quantity
+    ])
+    db.commit()
+
+def test_reorder_suggestions(client, auth_headers, make_product, db):
+    supplier = models.Supplier(name="Reorder Supplier")
+    db.add(supplier)
+    db.flush()
+    supplier_id = supplier.id
+    db.commit()
+    steady = make_product(stock_quantity=5, price=2.0, supplier_id=supplier_id)
+    stocked = make_product(stock_quantity=1000, supplier_id=supplier_id)
+    lumpy = make_product(stock_quantity=0)
+    _sell(db, steady, [10] * 10)
+    _sell(db, stocked, [10] * 10)
+    _sell(db, lumpy, [30, 0, 0, 0, 0, 0, 0, 0, 10, 0])
+    # Outside the 10 day window
+    db.add(models.StockMovement(product_id=steady, change_type=models.StockMovementType.OUT,
+                                quantity=500, created_at=datetime.utcnow() - timedelta(days=20)))
+    db.commit()
+
+    response = client.get("/api/v1/inventory/reorder-suggestions", params={
+        "lookback_days": 10, "lead_time_days": 7, "review_days": 14,
+    }, headers=auth_headers)
+    assert response.status_code == 200
+    orders = {order["supplier_id"]: order for order in response.json()}
+    items = {item["product_id"]: item for order in orders.values() for item in order["items"]}
+
+    assert [item["product_id"] for item in orders[supplier_id]["items"]] == [steady]
+    assert orders[supplier_id]["supplier_name"] == "Reorder Supplier"
+    assert items[steady]["daily_demand"] == 10
+    assert items[steady]["demand_std"] == 0
+    assert items[steady]["days_of_cover"] == 0.5
+    assert items[steady]["suggested_quantity"] == 21 * 10 - 5
+    assert orders[supplier_id]["total_cost"] == 205 * 2.0
+
+    std = math.sqrt((30 ** 2 + 10 ** 2) / 10 - 4 ** 2)
+    safety = 1.65 * std * math.sqrt(7)
+    assert items[lumpy]["demand_std"] == pytest.approx(std)
+    assert items[lumpy]["suggested_quantity"] == math.ceil(4 * 21 + safety)
+    assert lumpy in [item["product_id"] for item in orders[None]["items"]]
+
+def test_reorder_suggestions_for_one_supplier(client, auth_headers):
+    response = client.get("/api/v1/inventory/reorder-suggestions", params={"supplier_id": 999999}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == []
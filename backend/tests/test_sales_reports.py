@@ -0,0 +1,61 @@
+from datetime import datetime
+import pytest
+from app import models
+from app.services import sales as sales_service
+
+def _report(client, auth_headers, path, **params):
+    response = client.get(f"/api/v1/reports/sales/{path}", params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _rollups(db):
+    db.expire_all()
+    return {
+        (row.grain, row.bucket, row.dimension, row.key): (row.units, pytest.approx(row.revenue), row.orders)
+        for row in db.query(models.SalesRollup)
+    }
+
+def test_order_creation_updates_rollups(client, auth_headers, customer, make_product, db):
+    bolts = make_product(stock_quantity=100, price=2.0, category="Sales Hardware")
+    nuts = make_product(stock_quantity=100, price=1.0, category="Sales Hardware")
+    glue = make_product(stock_quantity=100, price=5.0, category="Sales Chemicals")
+    today = datetime.utcnow().date().isoformat()
+    before = {row["category"]: row for row in _report(client, auth_headers, "by-category", start=today, end=today)}
+
+    for items in (
+        [{"product_id": bolts, "quantity": 10}, {"product_id": nuts, "quantity": 10}],
+        [{"product_id": glue, "quantity": 3}, {"product_id": bolts, "quantity": 1}],
+    ):
+        response = client.post("/api/v1/orders/", json={"customer_id": customer, "items": items}, headers=auth_headers)
+        assert response.status_code == 200
+
+    categories = {row["category"]: row for row in _report(client, auth_headers, "by-category", start=today, end=today)}
+    hardware = categories["Sales Hardware"]
+    assert hardware["units"] == 21
+    assert hardware["revenue"] == pytest.approx(32.0)
+    # Two orders touched the category, one of them with two of its products.
+    assert hardware["orders"] == 2
+    assert "Sales Hardware" not in before
+
+    top = _report(client, auth_headers, "top-products", start=today, end=today, by="units", limit=100)
+    assert [row["units"] for row in top if row["product_id"] in (bolts, nuts, glue)] == [11, 10, 3]
+
+    series = _report(client, auth_headers, "timeseries", start=today, end=today, bucket="hour", product_id=bolts)
+    assert sum(point["units"] for point in series) == 11
+    month = _report(client, auth_headers, "timeseries", bucket="month", category="Sales Chemicals")
+    assert sum(point["revenue"] for point in month) == pytest.approx(15.0)
+
+def test_maintained_rollups_match_rebuild(client, auth_headers, customer, make_product, db):
+    product_id = make_product(stock_quantity=10, price=4.0)
+    client.post("/api/v1/orders/", json={"customer_id": customer, "items": [{"product_id": product_id, "quantity": 2}]}, headers=auth_headers)
+
+    maintained = _rollups(db)
+    sales_service.rebuild(db)
+    db.commit()
+    assert _rollups(db) == maintained
+
+def test_sales_report_validates_range(client, auth_headers):
+    response = client.get("/api/v1/reports/sales/timeseries", params={"start": "2024-02-01", "end": "2024-01-01"}, headers=auth_headers)
+    assert response.status_code == 400
+    response = client.get("/api/v1/reports/sales/timeseries", params={"start": "2020-01-01", "end": "2024-01-01", "bucket": "hour"}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.database import configure_sqlite
+
+@pytest.fixture
+def engines():
+    path = os.path.join(tempfile.mkdtemp(prefix="inventory-profile-"), "profile.db")
+    writer = create_engine(f"sqlite:///{path}", pool_size=1, max_overflow=0)
+    configure_sqlite(writer, readonly=False)
+    reader = create_engine(f"sqlite:///{path}", pool_size=2, max_overflow=0)
+    configure_sqlite(reader, readonly=True)
+    with writer.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        connection.exec_driver_sql("INSERT INTO items DEFAULT VALUES")
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+def test_production_pragmas_are_applied(engines):
+    writer, reader = engines
+    with reader.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+        assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 1
+    with writer.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 0
+
+def test_read_engine_rejects_writes(engines):
+    _, reader = engines
+    with pytest.raises(OperationalError, match="readonly"):
+        with reader.begin() as connection:
+            connection.execute(text("INSERT INTO items DEFAULT VALUES"))
+
+def test_readers_are_not_blocked_by_an_open_write_transaction(engines):
+    writer, reader = engines
+    with writer.connect() as write_connection:
+        write_connection.execute(text("INSERT INTO items DEFAULT VALUES"))
+        # The writer holds the lock (BEGIN IMMEDIATE) and has not committed yet.
+        with reader.connect() as read_connection:
+            assert read_connection.execute(text("SELECT count(*) FROM items")).scalar() == 1
+        write_connection.commit()
+    with reader.connect() as read_connection:
+        assert read_connection.execute(text("SELECT count(*) FROM items")).scalar() == 2
@@ -0,0 +1,59 @@
+from datetime import date, datetime
+from app import models
+from app.services import snapshots
+
+def _history(db, make_product):
+    # 20 in on Jan 1st, 5 out on the 2nd at noon, 3 adjusted away at midnight starting the 3rd.
+    product_id = make_product(stock_quantity=12, sku="STOCK-AT-1")
+    db.add_all([
+        models.StockMovement(product_id=product_id, change_type=models.StockMovementType.IN,
+                             quantity=20, created_at=datetime(2020, 1, 1, 10)),
+        models.StockMovement(product_id=product_id, change_type=models.StockMovementType.OUT,
+                             quantity=5, created_at=datetime(2020, 1, 2, 12)),
+        models.StockMovement(product_id=product_id, change_type=models.StockMovementType.ADJUSTMENT,
+                             quantity=-3, created_at=datetime(2020, 1, 3)),
+    ])
+    db.commit()
+    return product_id
+
+def _closing(client, auth_headers, **params):
+    response = client.get("/api/v1/inventory/stock-at", params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return [row["quantity"] for row in response.json()]
+
+def test_stock_at_matches_with_and_without_snapshots(client, auth_headers, make_product, db):
+    product_id = _history(db, make_product)
+    expected = {"2019-12-31": 0, "2020-01-01": 20, "2020-01-02": 15, "2020-01-03": 12}
+
+    def check():
+        for day, quantity in expected.items():
+            assert _closing(client, auth_headers, date=day, sku="STOCK-AT-1") == [quantity]
+        # The noon movement itself is not part of the stock at that instant.
+        assert _closing(client, auth_headers, at="2020-01-02T13:00:00+01:00", product_id=product_id) == [20]
+
+    check()
+    written = snapshots.take_snapshots(db, [date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 3), date(2020, 1, 4)])
+    db.commit()
+    assert written == 4 * db.query(models.Product).count()
+    assert db.get(models.StockSnapshot, (datetime(2020, 1, 3), product_id)).quantity == 15
+    check()
+
+def test_stock_at_whole_catalog(client, auth_headers, make_product, db):
+    product_id = make_product(stock_quantity=4, price=2.5)
+    rows, cursor = {}, None
+    while True:
+        params = {"date": "2030-01-01", "limit": 1000, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/inventory/stock-at", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        rows.update((row["product_id"], row) for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(rows) == db.query(models.Product).count()
+    assert rows[product_id]["quantity"] == 4
+    assert rows[product_id]["value"] == 10.0
+
+def test_stock_at_requires_a_moment(client, auth_headers):
+    assert client.get("/api/v1/inventory/stock-at", headers=auth_headers).status_code == 400
+    response = client.get("/api/v1/inventory/stock-at", params={"date": "2020-01-01", "sku": "NO-SUCH-SKU"}, headers=auth_headers)
+    assert response.status_code == 404
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from app.main import app
+from app import models
+
+CLIENTS = 16
+
+def _run_parallel(requests_count, send):
+    # One TestClient per worker thread, all hitting the app at the same time.
+    def worker(_):
+        return send(TestClient(app)).status_code
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        return list(pool.map(worker, range(requests_count)))
+
+def test_parallel_orders_never_oversell(db, auth_headers, customer, make_product):
+    product_id = make_product(stock_quantity=50)
+    order = {"customer_id": customer, "items": [{"product_id": product_id, "quantity": 5}]}
+
+    statuses = _run_parallel(40, lambda c: c.post("/api/v1/orders/", json=order, headers=auth_headers))
+
+    assert set(statuses) <= {200, 400}
+    assert statuses.count(200) == 10
+    product = db.get(models.Product, product_id)
+    assert product.stock_quantity == 0
+    moved = (
+        db.query(models.StockMovement)
+        .filter(models.StockMovement.product_id == product_id)
+        .all()
+    )
+    assert sum(m.quantity for m in moved) == 50
+
+def test_parallel_adjustments_never_go_negative(db, auth_headers, make_product):
+    product_id = make_product(stock_quantity=30)
+    movement = {"product_id": product_id, "change_type": "out", "quantity": 3}
+
+    statuses = _run_parallel(40, lambda c: c.post("/api/v1/inventory/adjust", json=movement, headers=auth_headers))
+
+    assert set(statuses) <= {200, 400}
+    assert statuses.count(200) == 10
+    db.expire_all()
+    assert db.get(models.Product, product_id).stock_quantity == 0
+
+def test_order_with_one_short_item_reserves_nothing(db, auth_headers, customer, make_product):
+    plenty = make_product(stock_quantity=10)
+    short = make_product(stock_quantity=1)
+    order = {
+        "customer_id": customer,
+        "items": [
+            {"product_id": plenty, "quantity": 2},
+            {"product_id": short, "quantity": 2},
+        ],
+    }
+
+    response = TestClient(app).post("/api/v1/orders/", json=order, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert db.get(models.Product, plenty).stock_quantity == 10
+    assert db.get(models.Product, short).stock_quantity == 1